@@ -3,9 +3,13 @@ Utility functions for processing bronze-layer geometries.
 """
 
 import os
-import geopandas as gpd
+import sys
 from pathlib import Path
 
+sys.path.append(str(Path(__file__).parent.parent.parent))  # src/, for medallion
+from medallion.manifest import with_medallion_imports
+from medallion.streaming import STREAM_BATCH_SIZE, geojson_to_geoparquet
+
 
 def clean_name(name):
     """
@@ -30,30 +34,31 @@ def clean_name(name):
     return cleaned
 
 
-def process_geometries(input_geojson_path, output_geoparquet_path):
+def process_geometries(input_geojson_path, output_geoparquet_path, batch_size=STREAM_BATCH_SIZE):
     """
     Process a single GeoJSON file to GeoParquet format.
 
+    The file is streamed in batches of `batch_size` features, so memory use
+    does not grow with the size of the input.
+
     Parameters:
     -----------
     input_geojson_path : str or Path
         Path to input GeoJSON file
     output_geoparquet_path : str or Path
         Path to output GeoParquet file
+    batch_size : int
+        Features read, reprojected and written per batch (one row group each)
     """
-    # Read the GeoJSON file
-    gdf = gpd.read_file(input_geojson_path)
-
-    # Ensure all geometries are in WGS84 (EPSG:4326)
-    if gdf.crs != "EPSG:4326":
-        gdf = gdf.to_crs(epsg=4326)
+    # Stream the GeoJSON into GeoParquet, in WGS84 (EPSG:4326)
+    n_features = geojson_to_geoparquet(
+        input_geojson_path, output_geoparquet_path, crs="EPSG:4326", batch_size=batch_size
+    )
+    print(f"✓ Processed: {Path(input_geojson_path).name} -> {Path(output_geoparquet_path).name} "
+          f"({n_features} features)")
 
-    # Save as GeoParquet
-    gdf.to_parquet(output_geoparquet_path, compression='snappy', index=False)
-    print(f"✓ Processed: {Path(input_geojson_path).name} -> {Path(output_geoparquet_path).name}")
 
-
-def process_all_geometries(input_directory, output_directory):
+def process_all_geometries(input_directory, output_directory, manifest=None, force=False):
     """
     Process all GeoJSON files in a directory to GeoParquet format.
 
@@ -63,6 +68,16 @@ def process_all_geometries(input_directory, output_directory):
         Directory containing GeoJSON files
     output_directory : str or Path
         Directory to save GeoParquet files
+    manifest : medallion.manifest.Manifest, optional
+        If given, files whose GeoJSON and converter code are unchanged since
+        the recorded run (and whose output is untouched) are skipped
+    force : bool
+        Convert every file even if the manifest says it is up to date
+
+    Returns:
+    --------
+    dict
+        Lists of converted and skipped file names
     """
     input_dir = Path(input_directory)
     output_dir = Path(output_directory)
@@ -71,7 +86,8 @@ def process_all_geometries(input_directory, output_directory):
     output_dir.mkdir(parents=True, exist_ok=True)
 
     # Process each GeoJSON file
-    for filename in os.listdir(input_dir):
+    results = {"run": [], "skipped": []}
+    for filename in sorted(os.listdir(input_dir)):
         if filename.endswith(".geojson"):
             # Clean the filename
             base_name = filename.replace(".geojson", "")
@@ -81,5 +97,19 @@ def process_all_geometries(input_directory, output_directory):
             input_path = input_dir / filename
             output_path = output_dir / f"{cleaned_name}.geoparquet"
 
+            # Skip files that have not changed since the last conversion
+            code_files = with_medallion_imports([Path(__file__)])
+            if manifest is not None and not force and manifest.is_current(
+                filename, [input_path], [output_path], code_files
+            ):
+                print(f"↷ Unchanged: {filename}")
+                results["skipped"].append(filename)
+                continue
+
             # Process the file
             process_geometries(input_path, output_path)
+            if manifest is not None:
+                manifest.record(filename, [input_path], [output_path], code_files)
+            results["run"].append(filename)
+
+    return results
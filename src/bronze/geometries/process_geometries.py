@@ -1,14 +1,21 @@
 """
 Convert GeoJSON files to GeoParquet format (Bronze Layer).
 
-This script should only be run once to process the geometry files.
+Reruns only convert files whose GeoJSON changed since the last run (see
+data/bronze/geometries/_manifest.json); pass --force to convert everything.
 """
 
+import argparse
+import sys
 from pathlib import Path
 from _utilities import process_all_geometries
 
+sys.path.append(str(Path(__file__).parent.parent.parent))  # src/, for medallion
+from medallion.manifest import Manifest
+from medallion.runner import layer_manifest_path
 
-def main():
+
+def main(force=False):
     """Convert all GeoJSON files to GeoParquet."""
     # Get project root directory
     script_dir = Path(__file__).parent.parent.parent.parent  # Up to attempt-2/
@@ -21,13 +28,18 @@ def main():
     print(f"Input: {input_directory}")
     print(f"Output: {output_directory}\n")
 
-    process_all_geometries(input_directory, output_directory)
+    manifest = Manifest(layer_manifest_path("bronze"))
+    results = process_all_geometries(input_directory, output_directory, manifest=manifest, force=force)
 
-    print("\n✓ All files converted successfully!")
+    print(f"\n✓ All files converted successfully! ({len(results['run'])} converted, "
+          f"{len(results['skipped'])} unchanged)")
     print("\nNext step: Run silver layer processing")
     print("  cd ../../silver/geometries")
     print("  python process_geometries.py")
+    return results
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--force", action="store_true", help="convert every file, ignoring the manifest")
+    main(force=parser.parse_args().force)
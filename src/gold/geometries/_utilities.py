@@ -0,0 +1,59 @@
+"""
+Utility functions for writing gold-layer geometries.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent.parent))  # src/, for medallion
+from medallion.geoparquet import (
+    GOLD_ROW_GROUP_SIZE,
+    hilbert_sorted,
+    projected_variant,
+    write_sorted_geoparquet,
+)
+
+# CRS of the analysis copies (osmnx_pipeline.config.CRS_PROJECTED)
+ANALYSIS_CRS = "EPSG:26910"
+
+
+def analysis_path(gold_path):
+    """
+    Path of the analysis-CRS copy of a gold file.
+
+    Parameters:
+    -----------
+    gold_path : Path
+        Path of the EPSG:4326 gold GeoParquet
+    """
+    return projected_variant(gold_path, ANALYSIS_CRS)
+
+
+def save_gold(gdf, gold_path, row_group_size=GOLD_ROW_GROUP_SIZE):
+    """
+    Save a gold-layer GeoParquet for fast spatial subset reads.
+
+    Rows are sorted along a Hilbert curve and written with a GeoParquet 1.1
+    bbox covering column in row groups of `row_group_size`, so readers that
+    filter by a bbox or polygon (`medallion.geoparquet.read_geoparquet`, or
+    `gpd.read_parquet(..., bbox=...)`) skip the row groups outside it.
+
+    A second copy in `ANALYSIS_CRS` is written to `analysis_path(gold_path)`
+    with the same row order, so the accessibility pipeline can use projected
+    coordinates without transforming them on every run.
+
+    Parameters:
+    -----------
+    gdf : GeoDataFrame
+        Layer to save
+    gold_path : Path
+        Output GeoParquet path (parent directories are created)
+    row_group_size : int
+        Rows per Parquet row group
+    """
+    gold_path.parent.mkdir(parents=True, exist_ok=True)
+    gdf = hilbert_sorted(gdf)
+    write_sorted_geoparquet(gdf, gold_path, row_group_size=row_group_size, sort=False)
+    write_sorted_geoparquet(
+        gdf.to_crs(ANALYSIS_CRS), analysis_path(gold_path), row_group_size=row_group_size, sort=False
+    )
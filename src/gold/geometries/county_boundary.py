@@ -4,6 +4,12 @@ Process county boundary from silver to gold layer with column renaming.
 
 from pathlib import Path
 import geopandas as gpd
+from _utilities import analysis_path, save_gold
+
+DATA_DIR = Path(__file__).parent.parent.parent.parent / "data"
+INPUTS = [DATA_DIR / "silver" / "geometries" / "county_boundary.geoparquet"]
+GOLD_PATH = DATA_DIR / "gold" / "geometries" / "county_boundary.geoparquet"
+OUTPUTS = [GOLD_PATH, analysis_path(GOLD_PATH)]
 
 
 def process():
@@ -11,8 +17,7 @@ def process():
     print("\nProcessing: County Boundary")
 
     # Load from silver
-    script_dir = Path(__file__).parent.parent.parent.parent
-    silver_path = script_dir / "data" / "silver" / "geometries" / "county_boundary.geoparquet"
+    silver_path = INPUTS[0]
 
     print(f"  Loading from silver...")
     gdf = gpd.read_parquet(silver_path)
@@ -33,12 +38,8 @@ def process():
     print(f"    → Renamed {len(columns_to_rename)} columns")
 
     # Save to gold
-    gold_dir = script_dir / "data" / "gold" / "geometries"
-    gold_dir.mkdir(parents=True, exist_ok=True)
-    gold_path = gold_dir / "county_boundary.geoparquet"
-
-    gdf.to_parquet(gold_path, compression='snappy', index=False)
-    print(f"    → Saved to gold: {gold_path.name}")
+    save_gold(gdf, GOLD_PATH)
+    print(f"    → Saved to gold: {GOLD_PATH.name} (+ {analysis_path(GOLD_PATH).name})")
 
     print("  ✓ County Boundary complete\n")
 
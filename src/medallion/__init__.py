@@ -0,0 +1 @@
+"""Incremental execution of the bronze → silver → gold geometry layers."""
@@ -0,0 +1,37 @@
+"""
+Run the bronze, silver and gold drivers in order, each incrementally.
+
+    python -m medallion [--force] [--workers N]
+
+Each driver runs in its own process from its own directory, because the
+layer scripts import their `_utilities` module by plain name.
+"""
+
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+
+LAYERS = ("bronze", "silver", "gold")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the bronze, silver and gold layers in order.")
+    parser.add_argument("--force", action="store_true", help="rebuild every stage, ignoring the manifests")
+    parser.add_argument("--workers", type=int, default=1, help="process-pool size for silver and gold processors")
+    args = parser.parse_args(argv)
+
+    src_dir = Path(__file__).parent.parent
+    for layer in LAYERS:
+        command = [sys.executable, "process_geometries.py"]
+        if args.force:
+            command.append("--force")
+        if layer != "bronze":
+            command += ["--workers", str(args.workers)]
+        completed = subprocess.run(command, cwd=src_dir / layer / "geometries")
+        if completed.returncode != 0:
+            sys.exit(completed.returncode)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Spatially sorted GeoParquet for the gold layer, and bbox/polygon reads.
+
+Gold files are written in Hilbert-curve order with a GeoParquet 1.1 `bbox`
+covering column and fixed-size row groups. Nearby features then share row
+groups whose min/max bbox statistics are tight, so a filtered read only
+decodes the row groups that can intersect the query window.
+"""
+
+import json
+from pathlib import Path
+
+import geopandas as gpd
+import numpy as np
+import pyarrow.parquet as pq
+import shapely
+
+GOLD_ROW_GROUP_SIZE = 25_000
+
+
+def projected_variant(path, crs: str):
+    """Path of the copy of a gold file in `crs`, e.g. `address_points_epsg26910.geoparquet`."""
+    path = Path(path)
+    return path.with_name(f"{path.stem}_{crs.replace(':', '').lower()}{path.suffix}")
+
+
+def hilbert_sorted(gdf: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
+    """Rows reordered along a Hilbert curve over the layer's extent (bounds midpoints)."""
+    if len(gdf) < 2:
+        return gdf
+    order = np.argsort(gdf.geometry.hilbert_distance().to_numpy(), kind="stable")
+    return gdf.iloc[order]
+
+
+def write_sorted_geoparquet(
+    gdf: gpd.GeoDataFrame,
+    path,
+    row_group_size: int = GOLD_ROW_GROUP_SIZE,
+    compression: str = "snappy",
+    sort: bool = True,
+) -> None:
+    """
+    Write `gdf` Hilbert-sorted, with a bbox covering column and sized row
+    groups. `sort=False` keeps the given (already sorted) row order.
+    """
+    (hilbert_sorted(gdf) if sort else gdf).to_parquet(
+        path,
+        compression=compression,
+        index=False,
+        schema_version="1.1.0",
+        write_covering_bbox=True,
+        row_group_size=row_group_size,
+    )
+
+
+def has_bbox_covering(path) -> bool:
+    geo = json.loads(pq.read_metadata(path).metadata.get(b"geo", b"{}"))
+    column = geo.get("columns", {}).get(geo.get("primary_column"), {})
+    return "bbox" in column.get("covering", {})
+
+
+def read_geoparquet(path, bbox=None, polygon=None, columns=None) -> gpd.GeoDataFrame:
+    """
+    Read the rows of a GeoParquet file that intersect `bbox` or `polygon`.
+
+    Both are in the file's CRS, and the geometry column is always read. The
+    bounding box (of `polygon`, if given) is pushed down to the row-group
+    statistics of the bbox covering column, so only overlapping row groups
+    are read; `polygon` is then applied exactly.
+    Files without a covering column are still filtered correctly, just
+    without row-group skipping.
+    """
+    if polygon is None and bbox is not None:
+        polygon = shapely.box(*bbox)
+    if polygon is None:
+        return gpd.read_parquet(path, columns=columns)
+    if columns is not None and "geometry" not in columns:
+        columns = [*columns, "geometry"]
+
+    if has_bbox_covering(path):
+        gdf = gpd.read_parquet(path, columns=columns, bbox=tuple(shapely.bounds(polygon)))
+    else:
+        gdf = gpd.read_parquet(path, columns=columns)
+    shapely.prepare(polygon)
+    return gdf[shapely.intersects(polygon, gdf.geometry.values)]
@@ -0,0 +1,145 @@
+"""
+Per-layer manifests for incremental bronze → silver → gold runs.
+
+A manifest records, for every stage (one processor, or one bronze file), the
+content hash of its code and inputs, and the hash, row count and schema of
+each output it wrote. A stage is current when all of those still match, so
+reruns skip it; a changed upstream output changes the input hash of every
+stage downstream of it, which then rebuilds.
+"""
+
+import ast
+import hashlib
+import json
+import time
+from pathlib import Path
+
+import pyarrow.parquet as pq
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+DATA_DIR = PROJECT_ROOT / "data"
+MANIFEST_NAME = "_manifest.json"
+
+_HASH_CHUNK = 1 << 20
+
+
+def file_sha256(path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(_HASH_CHUNK):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def with_medallion_imports(files) -> list[Path]:
+    """
+    `files` plus the source of every `medallion` module they import,
+    followed transitively, so that edits to shared modules (streaming,
+    GeoParquet writing, ...) change the code hash of the stages using them.
+    """
+    package = Path(__file__).parent
+    files = [Path(f) for f in files]
+    seen, queue = set(files), list(files)
+    while queue:
+        path = queue.pop()
+        inside = path.parent == package
+        modules = []
+        for node in ast.walk(ast.parse(path.read_text())):
+            if isinstance(node, ast.Import):
+                modules += [a.name for a in node.names]
+            elif isinstance(node, ast.ImportFrom):
+                name = f"medallion.{node.module or ''}" if node.level and inside else node.module or ""
+                modules += [name.rstrip(".")] + [f"{name.rstrip('.')}.{a.name}" for a in node.names]
+        for module in modules:
+            parts = module.split(".")
+            if parts[0] != "medallion" or len(parts) != 2:
+                continue
+            source = package / f"{parts[1]}.py"
+            if source.exists() and source not in seen:
+                seen.add(source)
+                files.append(source)
+                queue.append(source)
+    return files
+
+
+def code_sha256(files) -> str:
+    """Combined hash of the source files that implement a stage."""
+    digest = hashlib.sha256()
+    for path in sorted(Path(p) for p in files):
+        digest.update(path.name.encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def _key(path) -> str:
+    path = Path(path).resolve()
+    try:
+        return path.relative_to(PROJECT_ROOT).as_posix()
+    except ValueError:
+        return path.as_posix()
+
+
+def _parquet_summary(path: Path) -> dict:
+    try:
+        metadata = pq.read_metadata(path)
+    except Exception:
+        return {}
+    return {"rows": metadata.num_rows, "schema": metadata.schema.to_arrow_schema().names}
+
+
+class Manifest:
+    """Stage records for one layer, stored as JSON next to its outputs."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.stages = json.loads(self.path.read_text())["stages"] if self.path.exists() else {}
+
+    def _fingerprint(self, path, recorded=None) -> dict:
+        """Hash of `path`, reusing the recorded one if size and mtime are unchanged."""
+        path = Path(path)
+        stat = path.stat()
+        if recorded and recorded.get("size") == stat.st_size and recorded.get("mtime_ns") == stat.st_mtime_ns:
+            return recorded
+        return {"sha256": file_sha256(path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+    def is_current(self, stage: str, inputs, outputs, code_files) -> bool:
+        """True if `stage` last ran with the same code and inputs and its outputs are untouched."""
+        record = self.stages.get(stage)
+        if record is None or record["code"] != code_sha256(code_files):
+            return False
+        if set(record["inputs"]) != {_key(p) for p in inputs}:
+            return False
+        if set(record["outputs"]) != {_key(p) for p in outputs}:
+            return False
+        for group, paths in (("inputs", inputs), ("outputs", outputs)):
+            for path in paths:
+                recorded = record[group][_key(path)]
+                if not Path(path).exists():
+                    return False
+                if self._fingerprint(path, recorded)["sha256"] != recorded["sha256"]:
+                    return False
+        return True
+
+    def record(self, stage: str, inputs, outputs, code_files) -> dict:
+        """Store the current state of a stage that just ran and save the manifest."""
+        previous = self.stages.get(stage, {})
+        entry = {
+            "code": code_sha256(code_files),
+            "inputs": {
+                _key(p): self._fingerprint(p, previous.get("inputs", {}).get(_key(p)))
+                for p in inputs
+            },
+            "outputs": {
+                _key(p): {**self._fingerprint(p), **_parquet_summary(Path(p))} for p in outputs
+            },
+            "finished_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+        self.stages[stage] = entry
+        self.save()
+        return entry
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"stages": self.stages}, indent=2))
+        tmp.replace(self.path)
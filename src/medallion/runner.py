@@ -0,0 +1,179 @@
+"""
+Incremental runner for the `process_geometries.py` drivers.
+
+Processor modules are discovered the same way the drivers always did (every
+.py file in the layer directory outside the skip list, with a `process()`
+function). A processor that declares module-level `INPUTS` and `OUTPUTS`
+path lists is skipped while its manifest record is current; processors
+without them always run.
+
+With `workers > 1` the stale processors run in a process pool. Each one's
+stdout/stderr is captured and printed as one block when it finishes, and
+only the parent process writes the manifest.
+"""
+
+import contextlib
+import importlib
+import io
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from .manifest import DATA_DIR, MANIFEST_NAME, Manifest, with_medallion_imports
+
+
+def discover_processors(directory, skip_files) -> list[str]:
+    """Module names of the candidate processors in `directory`, sorted."""
+    return sorted(
+        file.stem for file in Path(directory).glob("*.py") if file.name not in skip_files
+    )
+
+
+def stage_code_files(module) -> list[Path]:
+    """
+    A processor's own source, the layer's shared `_utilities.py` (if any)
+    and the `medallion` modules either of them imports.
+    """
+    source = Path(module.__file__)
+    files = [source]
+    utilities = source.parent / "_utilities.py"
+    if utilities.exists():
+        files.append(utilities)
+    return with_medallion_imports(files)
+
+
+class _Tee(io.StringIO):
+    """Capture output while still echoing it (serial runs)."""
+
+    def __init__(self, stream):
+        super().__init__()
+        self.stream = stream
+
+    def write(self, text):
+        self.stream.write(text)
+        return super().write(text)
+
+
+def _add_to_path(directory: str) -> None:
+    if directory not in sys.path:
+        sys.path.insert(0, directory)
+
+
+def _run_processor(directory: str, module_name: str, echo: bool = False):
+    """Import and run one processor; returns (name, seconds, log, error)."""
+    _add_to_path(directory)
+    buffer = _Tee(sys.stdout) if echo else io.StringIO()
+    error = None
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(buffer), contextlib.redirect_stderr(buffer):
+        try:
+            importlib.import_module(module_name).process()
+        except Exception:
+            error = traceback.format_exc()
+    if echo and error is not None:
+        print(f"\n{error}")  # shown, but kept out of the log as in pooled runs
+    return module_name, time.perf_counter() - start, buffer.getvalue(), error
+
+
+def run_processors(directory, skip_files, manifest_path, force: bool = False, workers: int = 1) -> dict:
+    """
+    Run every processor in `directory` whose inputs, outputs or code changed.
+
+    Returns `{"run": [...], "skipped": [...], "errors": [...], "processors": {...}}`
+    where `processors` maps each module name to its `status` ("run", "skipped",
+    "error" or "no_process"), `seconds`, captured `log` and `error` traceback.
+    `force` reruns everything; `workers > 1` runs stale processors in a
+    process pool.
+    """
+    directory = str(Path(directory).resolve())
+    _add_to_path(directory)
+    manifest = Manifest(Path(manifest_path))
+    results = {"run": [], "skipped": [], "errors": [], "processors": {}}
+
+    def record(name, status, seconds=0.0, log="", error=None):
+        results["processors"][name] = {"status": status, "seconds": seconds, "log": log, "error": error}
+
+    stale = {}
+    for module_name in discover_processors(directory, skip_files):
+        try:
+            module = importlib.import_module(module_name)
+        except Exception as e:
+            error_msg = f"✗ Error in {module_name}: {e}"
+            print(f"\n{error_msg}")
+            results["errors"].append(error_msg)
+            record(module_name, "error", error=traceback.format_exc())
+            continue
+        if not hasattr(module, "process"):
+            print(f"⚠ Skipping {module_name}: No process() function found")
+            record(module_name, "no_process")
+            continue
+
+        tracked = hasattr(module, "INPUTS") and hasattr(module, "OUTPUTS")
+        if tracked and not force and manifest.is_current(
+            module_name, module.INPUTS, module.OUTPUTS, stage_code_files(module)
+        ):
+            print(f"  ↷ {module_name}: unchanged, skipping")
+            results["skipped"].append(module_name)
+            record(module_name, "skipped")
+            continue
+        stale[module_name] = module
+
+    def finish(module_name, seconds, log, error):
+        module = stale[module_name]
+        if error is not None:
+            error_msg = f"✗ Error in {module_name}: {error.strip().splitlines()[-1]}"
+            print(f"\n{error_msg}")
+            results["errors"].append(error_msg)
+            record(module_name, "error", seconds, log, error)
+            return
+        if hasattr(module, "INPUTS") and hasattr(module, "OUTPUTS"):
+            manifest.record(module_name, module.INPUTS, module.OUTPUTS, stage_code_files(module))
+        print(f"    → {module_name} finished in {seconds:.1f}s")
+        results["run"].append(module_name)
+        record(module_name, "run", seconds, log)
+
+    if workers > 1 and len(stale) > 1:
+        print(f"\nRunning {len(stale)} processors on {min(workers, len(stale))} workers")
+        with ProcessPoolExecutor(max_workers=min(workers, len(stale))) as pool:
+            futures = [pool.submit(_run_processor, directory, name) for name in stale]
+            for future in as_completed(futures):
+                module_name, seconds, log, error = future.result()
+                print(f"\n{'='*60}")
+                print(f"Finished: {module_name}")
+                print(f"{'='*60}")
+                print(log, end="")
+                finish(module_name, seconds, log, error)
+    else:
+        for module_name in stale:
+            print(f"\n{'='*60}")
+            print(f"Running: {module_name}")
+            print(f"{'='*60}")
+            finish(*_run_processor(directory, module_name, echo=True))
+
+    return results
+
+
+def layer_manifest_path(layer: str) -> Path:
+    return DATA_DIR / layer / "geometries" / MANIFEST_NAME
+
+
+def print_summary(results: dict) -> None:
+    print("\n" + "="*60)
+    print("PROCESSING COMPLETE")
+    print("="*60)
+    print(f"Processors run: {len(results['run'])}")
+    for proc in results["run"]:
+        print(f"  ✓ {proc} ({results['processors'][proc]['seconds']:.1f}s)")
+    if results["skipped"]:
+        print(f"Up to date (skipped): {len(results['skipped'])}")
+        for proc in results["skipped"]:
+            print(f"  ↷ {proc}")
+
+    if results["errors"]:
+        print(f"\nErrors: {len(results['errors'])}")
+        for error in results["errors"]:
+            print(f"  {error}")
+    else:
+        print("\n✓ All processors completed successfully!")
@@ -0,0 +1,105 @@
+"""
+Streaming GeoJSON → GeoParquet conversion.
+
+Features are read in Arrow record batches through pyogrio, each batch is
+reprojected on its own and appended to a single GeoParquet file as one row
+group, so peak memory depends on the batch size rather than the file size.
+The GeoParquet `geo` metadata (CRS, geometry types, bbox) is accumulated
+across batches and written when the file is closed.
+"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+import shapely
+from pyogrio.raw import open_arrow
+from pyproj import CRS, Transformer
+
+STREAM_BATCH_SIZE = 65_536
+
+_GEOMETRY_TYPES = {
+    0: "Point", 1: "LineString", 3: "Polygon", 4: "MultiPoint",
+    5: "MultiLineString", 6: "MultiPolygon", 7: "GeometryCollection",
+}
+
+
+def geo_metadata(crs, geometry_types, bbox) -> dict:
+    """GeoParquet 1.0 file metadata for a single WKB `geometry` column."""
+    column = {
+        "encoding": "WKB",
+        "crs": CRS.from_user_input(crs).to_json_dict(),
+        "geometry_types": sorted(geometry_types),
+    }
+    if bbox is not None:
+        column["bbox"] = [float(v) for v in bbox]
+    return {"version": "1.0.0", "primary_column": "geometry", "columns": {"geometry": column}}
+
+
+def geojson_to_geoparquet(
+    input_path,
+    output_path,
+    crs="EPSG:4326",
+    batch_size: int = STREAM_BATCH_SIZE,
+    compression: str = "snappy",
+) -> int:
+    """
+    Convert a vector file to GeoParquet in `crs`, `batch_size` features at a time.
+
+    The output is written to a temporary file and renamed when complete, and
+    is readable with `gpd.read_parquet`. Returns the number of features.
+    """
+    output_path = Path(output_path)
+    tmp_path = output_path.with_name(output_path.name + ".tmp")
+    writer = None
+    n_rows = 0
+    geometry_types = set()
+    bbox = None
+
+    try:
+        with open_arrow(input_path, batch_size=batch_size, use_pyarrow=True) as (meta, reader):
+            source_crs = meta["crs"] or crs
+            geometry_name = meta["geometry_name"] or "wkb_geometry"
+            transformer = None
+            if not CRS.from_user_input(source_crs).equals(CRS.from_user_input(crs)):
+                transformer = Transformer.from_crs(source_crs, crs, always_xy=True)
+
+            for batch in reader:
+                table = pa.Table.from_batches([batch])
+                geometries = shapely.from_wkb(table[geometry_name].to_numpy(zero_copy_only=False))
+                if transformer is not None:
+                    geometries = shapely.transform(geometries, transformer.transform, interleaved=False)
+
+                present = geometries[~shapely.is_missing(geometries)]
+                if len(present):
+                    geometry_types.update(_GEOMETRY_TYPES[t] for t in np.unique(shapely.get_type_id(present)))
+                    bounds = shapely.total_bounds(present)
+                    bbox = bounds if bbox is None else np.r_[
+                        np.minimum(bbox[:2], bounds[:2]), np.maximum(bbox[2:], bounds[2:])
+                    ]
+
+                table = table.drop_columns([geometry_name]).append_column(
+                    "geometry", pa.array(shapely.to_wkb(geometries), type=pa.binary())
+                )
+                if writer is None:
+                    writer = pq.ParquetWriter(tmp_path, table.schema, compression=compression)
+                writer.write_table(table, row_group_size=batch_size)
+                n_rows += table.num_rows
+
+            if writer is None:
+                # no features: still write a valid, empty file with the source schema
+                fields = [f for f in reader.schema if f.name != geometry_name]
+                schema = pa.schema(fields + [pa.field("geometry", pa.binary())])
+                writer = pq.ParquetWriter(tmp_path, schema, compression=compression)
+
+        writer.add_key_value_metadata({"geo": json.dumps(geo_metadata(crs, geometry_types, bbox))})
+        writer.close()
+        writer = None
+        tmp_path.replace(output_path)
+    finally:
+        if writer is not None:
+            writer.close()
+        tmp_path.unlink(missing_ok=True)
+    return n_rows
@@ -0,0 +1,164 @@
+"""
+Tract-level aggregation of address accessibility.
+
+Every address is assigned to a census tract once, with an STRtree
+point-in-polygon query, and the assignment is cached on disk per version
+of the tract and address layers. Per-tract statistics are then grouped NumPy reductions over integer
+tract codes (`bincount` for counts, means and shares, one lexsort for the
+percentiles), with no per-tract Python loop or pandas groupby.
+"""
+
+import hashlib
+import re
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import shapely
+
+from .config import CACHE_DIR, CRS_PROJECTED, TRACT_ACCESS_PATH
+from .layers import ADDRESSES, TRACTS
+
+TRACT_COLUMNS = ["tract_id", "tract_name"]
+DEFAULT_THRESHOLDS_M = (400, 800, 1600)
+DEFAULT_PERCENTILES = (25, 50, 75, 90)
+
+
+def _tract_assignment_path():
+    h = hashlib.sha256()
+    for layer in (TRACTS, ADDRESSES):
+        source = layer.projected_path or layer.path
+        stat = source.stat()
+        h.update(f"{source.name}|{stat.st_size}|{stat.st_mtime_ns}|".encode())
+    return CACHE_DIR / f"address_tracts_{h.hexdigest()[:16]}.parquet"
+
+
+def assign_tracts(addresses: gpd.GeoDataFrame, tracts: gpd.GeoDataFrame) -> np.ndarray:
+    """
+    Row in `tracts` of the tract containing each projected address (-1 if
+    none). An address on a shared boundary goes to the first tract found.
+    """
+    points = shapely.points(addresses.geometry.x.values, addresses.geometry.y.values)
+    tree = shapely.STRtree(tracts.geometry.values)
+    point_i, tract_i = tree.query(points, predicate="intersects")
+    first, idx = np.unique(point_i, return_index=True)
+    assigned = np.full(len(points), -1, dtype=np.int32)
+    assigned[first] = tract_i[idx]
+    return assigned
+
+
+def cached_tract_assignment(addresses: gpd.GeoDataFrame, tracts: gpd.GeoDataFrame) -> np.ndarray:
+    """
+    `assign_tracts`, reused from disk while the tract and address layers are
+    unchanged and every address id is already in the cached table.
+    """
+    ids = addresses["address_point_id"].to_numpy()
+    path = _tract_assignment_path()
+    if path.exists():
+        table = pd.read_parquet(path)
+        rows = pd.Index(table["address_point_id"]).get_indexer(ids)
+        if (rows >= 0).all():
+            return table["tract_row"].to_numpy()[rows]
+
+    assigned = assign_tracts(addresses, tracts)
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    for stale in CACHE_DIR.glob("address_tracts_*.parquet"):
+        stale.unlink()
+    pd.DataFrame({"address_point_id": ids, "tract_row": assigned}).to_parquet(path, index=False)
+    return assigned
+
+
+def grouped_stats(group, n_groups: int, values, thresholds=(), percentiles=()) -> dict:
+    """
+    Per-group statistics of `values` for integer `group` codes in
+    `[0, n_groups)`; negative codes are ignored.
+
+    Non-finite values (unreachable, or beyond a search cutoff) count as
+    addresses but not in the mean or percentiles. Returns arrays of length
+    `n_groups`: `n`, `n_reached`, `mean`, `p<q>` per percentile and
+    `share_within_<t>` per threshold.
+    """
+    group = np.asarray(group)
+    values = np.asarray(values, dtype=np.float64)
+    inside = group >= 0
+    group, values = group[inside], values[inside]
+    reached = np.isfinite(values)
+
+    n = np.bincount(group, minlength=n_groups)
+    n_reached = np.bincount(group[reached], minlength=n_groups)
+    sums = np.bincount(group[reached], weights=values[reached], minlength=n_groups)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        stats = {"n": n, "n_reached": n_reached, "mean": sums / n_reached}
+        for t in thresholds:
+            within = np.bincount(group[reached & (values <= t)], minlength=n_groups)
+            stats[f"share_within_{t:g}"] = within / n
+
+    # reached values sorted by (group, value): group g occupies one contiguous run
+    order = np.lexsort((values[reached], group[reached]))
+    sorted_values = np.append(values[reached][order], np.nan)  # index -1 for empty groups
+    starts = np.concatenate([[0], np.cumsum(n_reached)[:-1]])
+    empty = n_reached == 0
+    for q in percentiles:
+        # linear interpolation between closest ranks, as np.percentile
+        pos = (n_reached - 1).clip(min=0) * (q / 100)
+        lo = np.where(empty, -1, starts + np.floor(pos).astype(np.int64))
+        hi = np.where(empty, -1, starts + np.ceil(pos).astype(np.int64))
+        frac = pos - np.floor(pos)
+        stats[f"p{q:g}"] = sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * frac
+    return stats
+
+
+def _amenity_keys(result) -> list:
+    keys = []
+    for col in result.columns:
+        match = re.fullmatch(r"dist_(.+)_m", col)
+        if match and not re.search(r"_k\d+$", match.group(1)):
+            keys.append(match.group(1))
+    return keys
+
+
+def aggregate_to_tracts(
+    result: gpd.GeoDataFrame,
+    amenity_keys=None,
+    thresholds_m=DEFAULT_THRESHOLDS_M,
+    percentiles=DEFAULT_PERCENTILES,
+    write: bool = True,
+) -> gpd.GeoDataFrame:
+    """
+    Tract accessibility table from an address-level result (the output of
+    `distances_to_amenities`): per tract and amenity key, the mean and
+    percentiles of `dist_<key>_m` over reached addresses and the share of
+    all addresses within each threshold.
+
+    Columns are `n_addresses`, then per key `n_reached_<key>`,
+    `mean_<key>_m`, `p<q>_<key>_m` and `share_<key>_within_<t>m`. Every
+    tract is kept (tracts without addresses get NaN statistics). With
+    `write`, the table is saved to `TRACT_ACCESS_PATH`.
+    """
+    amenity_keys = _amenity_keys(result) if amenity_keys is None else list(amenity_keys)
+    tracts = TRACTS.read(columns=TRACT_COLUMNS)
+    addresses = result if result.crs.equals(CRS_PROJECTED) else result.to_crs(CRS_PROJECTED)
+    tract_row = cached_tract_assignment(addresses, tracts)
+    n_outside = int((tract_row < 0).sum())
+    if n_outside:
+        print(f"    → {n_outside:,} addresses fall outside every tract and are not aggregated")
+
+    table = tracts.reset_index(drop=True)
+    table["n_addresses"] = np.bincount(tract_row[tract_row >= 0], minlength=len(tracts))
+    for key in amenity_keys:
+        stats = grouped_stats(
+            tract_row, len(tracts), result[f"dist_{key}_m"].to_numpy(),
+            thresholds=thresholds_m, percentiles=percentiles,
+        )
+        table[f"n_reached_{key}"] = stats["n_reached"]
+        table[f"mean_{key}_m"] = stats["mean"]
+        for q in percentiles:
+            table[f"p{q:g}_{key}_m"] = stats[f"p{q:g}"]
+        for t in thresholds_m:
+            table[f"share_{key}_within_{t:g}m"] = stats[f"share_within_{t:g}"]
+
+    if write:
+        TRACT_ACCESS_PATH.parent.mkdir(parents=True, exist_ok=True)
+        table.to_parquet(TRACT_ACCESS_PATH, compression="snappy", index=False)
+        print(f"    → Saved tract table: {TRACT_ACCESS_PATH.name} ({len(table):,} tracts)")
+    return table
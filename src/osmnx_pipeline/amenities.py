@@ -1,11 +1,242 @@
+"""
+Amenity points of interest from a local, partitioned GeoParquet store.
+
+The store holds one partition per key in `OSM_TAGS_HIGH`
+(`amenity_key=<key>/part-0.parquet`). Missing or outdated keys -- whose
+tags, study area or OSM source changed -- are filled with a single bulk
+query for the union of their tags (from Overpass, or from a local OSM
+extract), so adding a key to `OSM_TAGS_HIGH` only fetches that key.
+
+Polygon amenities (most parks, many supermarkets) are turned into access
+points so they can seed the multi-source search like point amenities.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+
+import numpy as np
 import osmnx as ox
-from .config import CRS_LATLON, CRS_PROJECTED, OSM_TAGS_HIGH
+import pandas as pd
+import shapely
+from osmnx._errors import InsufficientResponseError
+from .config import (
+    AMENITY_STORE_DIR,
+    CRS_LATLON,
+    CRS_PROJECTED,
+    OSM_EXTRACT_PATH,
+    OSM_TAGS_HIGH,
+    SMALL_AMENITY_AREA_M2,
+)
 from .network import load_study_area
 import geopandas as gpd
 
-def fetch_amenities(amenity_key: str) -> gpd.GeoDataFrame:
-    tags = OSM_TAGS_HIGH[amenity_key]
-    poly_ll = load_study_area()
-    gdf = ox.features_from_polygon(poly_ll, tags=tags)
-    gdf = gdf.to_crs(CRS_PROJECTED)
-    return gdf[gdf.geometry.type == "Point"]
\ No newline at end of file
+STORE_COLUMNS = ["element", "osmid", "name", "geometry"]
+MANIFEST_PATH = AMENITY_STORE_DIR / "manifest.json"
+
+
+def _tags_hash(tags: dict) -> str:
+    return hashlib.sha256(json.dumps(tags, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def _area_hash(polygon, source) -> str:
+    """Fingerprint of the queried area and OSM source (as for the graph cache key)."""
+    h = hashlib.sha256(f"{source}|".encode())
+    h.update(shapely.to_wkb(shapely.normalize(polygon), output_dimension=2))
+    return h.hexdigest()[:16]
+
+
+def _partition_path(amenity_key: str, store_dir=AMENITY_STORE_DIR) -> Path:
+    return Path(store_dir) / f"amenity_key={amenity_key}" / "part-0.parquet"
+
+
+def _read_manifest(store_dir=AMENITY_STORE_DIR) -> dict:
+    path = Path(store_dir) / MANIFEST_PATH.name
+    return json.loads(path.read_text()) if path.exists() else {}
+
+
+def _merge_tags(tag_dicts) -> dict:
+    """Union of several OSMnx tag queries into one."""
+    merged = {}
+    for tags in tag_dicts:
+        for tag, value in tags.items():
+            if value is True or merged.get(tag) is True:
+                merged[tag] = True
+            else:
+                values = [value] if isinstance(value, str) else list(value)
+                merged[tag] = sorted(set(merged.get(tag, [])) | set(values))
+    return merged
+
+
+def _matches(features: gpd.GeoDataFrame, tags: dict) -> pd.Series:
+    """Features matching any of `tags`, with OSMnx query semantics."""
+    mask = pd.Series(False, index=features.index)
+    for tag, value in tags.items():
+        if tag not in features.columns:
+            continue
+        if value is True:
+            mask |= features[tag].notna()
+        else:
+            values = [value] if isinstance(value, str) else list(value)
+            mask |= features[tag].isin(values)
+    return mask
+
+
+def _download_features(tags: dict, source=None, poly_ll=None) -> gpd.GeoDataFrame:
+    """All features matching `tags` in `poly_ll` (default: the study area), indexed by (element, osmid)."""
+    poly_ll = load_study_area() if poly_ll is None else poly_ll
+    source = OSM_EXTRACT_PATH if source is None else source
+    try:
+        if source is None:
+            gdf = ox.features_from_polygon(poly_ll, tags=tags)
+        elif str(source).endswith(".pbf"):
+            from pyrosm import OSM  # optional, only needed for .pbf extracts
+
+            gdf = OSM(str(source), bounding_box=poly_ll).get_data_by_custom_criteria(
+                custom_filter=tags, keep_nodes=True, keep_ways=True, keep_relations=True
+            )
+            gdf = gdf.rename(columns={"osm_type": "element"}).set_index(["element", "id"])
+        else:
+            gdf = ox.features_from_xml(source, polygon=poly_ll, tags=tags)
+    except InsufficientResponseError:
+        gdf = None
+    if gdf is None or gdf.empty:
+        empty = {"element": pd.Series(dtype=str), "osmid": pd.Series(dtype="int64")}
+        return gpd.GeoDataFrame(empty, geometry=[], crs=CRS_LATLON).set_index(["element", "osmid"])
+    gdf.index = gdf.index.set_names(["element", "osmid"])
+    return gdf.to_crs(CRS_LATLON)
+
+
+def update_amenity_store(
+    amenity_keys=None,
+    source=None,
+    refresh: bool = False,
+    polygon=None,
+    store_dir=AMENITY_STORE_DIR,
+) -> list:
+    """
+    Fetch the keys whose partition is missing, or whose tags, study area
+    (`polygon`, lat/lon, default the configured counties) or OSM source
+    changed (all `amenity_keys` with `refresh`), in one bulk query. Returns
+    the fetched keys.
+    """
+    amenity_keys = list(OSM_TAGS_HIGH) if amenity_keys is None else list(amenity_keys)
+    poly_ll = load_study_area() if polygon is None else polygon
+    source = OSM_EXTRACT_PATH if source is None else source
+    area = _area_hash(poly_ll, source)
+    manifest = _read_manifest(store_dir)
+    stale = [
+        key for key in amenity_keys
+        if refresh
+        or manifest.get(key) != {"tags": _tags_hash(OSM_TAGS_HIGH[key]), "area": area}
+        or not _partition_path(key, store_dir).exists()
+    ]
+    if not stale:
+        return []
+
+    print(f"Fetching amenities for: {', '.join(stale)}")
+    features = _download_features(_merge_tags(OSM_TAGS_HIGH[k] for k in stale), source, poly_ll)
+    if "name" not in features.columns:
+        features["name"] = None
+    features = features.reset_index()
+
+    for key in stale:
+        # stored projected, so reads need no CRS transform
+        part = features.loc[_matches(features, OSM_TAGS_HIGH[key]), STORE_COLUMNS].to_crs(CRS_PROJECTED)
+        path = _partition_path(key, store_dir)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        part.to_parquet(path, compression="snappy", index=False)
+        manifest[key] = {"tags": _tags_hash(OSM_TAGS_HIGH[key]), "area": area}
+        print(f"  ✓ {key}: {len(part):,} features")
+
+    manifest_path = Path(store_dir) / MANIFEST_PATH.name
+    manifest_path.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+    return stale
+
+
+def amenity_access_points(
+    gdf: gpd.GeoDataFrame,
+    edges: gpd.GeoDataFrame | None = None,
+    small_area_m2: float = SMALL_AMENITY_AREA_M2,
+) -> gpd.GeoDataFrame:
+    """
+    One row per access point, keeping each amenity's index.
+
+    Points pass through. Polygons smaller than `small_area_m2`, or with no
+    walkable edge crossing their boundary (or when no `edges` are given), get
+    a representative point. Larger polygons get every point where an edge
+    crosses their boundary, so one park may yield many access points.
+    """
+    geom_type = gdf.geometry.geom_type
+    points = gdf[geom_type == "Point"]
+    polygons = gdf[geom_type.isin(["Polygon", "MultiPolygon"])]
+    if polygons.empty:
+        return points
+
+    index = np.arange(len(polygons))
+    crossing_poly = np.empty(0, dtype=np.int64)
+    crossing_geom = np.empty(0, dtype=object)
+    large = index[polygons.area.to_numpy() >= small_area_m2]
+    if edges is not None and len(large):
+        boundary = shapely.boundary(polygons.geometry.values[large])
+        poly_i, edge_j = edges.sindex.query(boundary, predicate="intersects")
+        hits = shapely.intersection(boundary[poly_i], edges.geometry.values[edge_j])
+        parts, part_i = shapely.get_parts(hits, return_index=True)
+        # overlapping segments (edge running along the boundary) -> one point
+        parts = np.where(
+            shapely.get_type_id(parts) == 0, parts, shapely.point_on_surface(parts)
+        )
+        crossing_poly = large[poly_i[part_i]]
+        crossing_geom = parts
+
+    no_crossing = np.setdiff1d(index, crossing_poly)
+    poly_i = np.concatenate([crossing_poly, no_crossing])
+    geoms = np.concatenate([
+        crossing_geom,
+        shapely.point_on_surface(polygons.geometry.values[no_crossing]),
+    ])
+    # an edge crossing a shared vertex of the boundary is reported twice
+    unique = ~pd.DataFrame({"i": poly_i, "wkb": shapely.to_wkb(geoms)}).duplicated().to_numpy()
+    access = gpd.GeoDataFrame(
+        geometry=geoms[unique], index=polygons.index[poly_i[unique]], crs=gdf.crs
+    )
+    return pd.concat([points, access])
+
+
+def fetch_amenities(
+    amenity_key: str,
+    offline: bool = False,
+    edges: gpd.GeoDataFrame | None = None,
+    include_polygons: bool = True,
+    access_points: bool = True,
+    polygon=None,
+    source=None,
+    store_dir=AMENITY_STORE_DIR,
+) -> gpd.GeoDataFrame:
+    """
+    Amenity access points for `amenity_key`, projected, read from the local
+    store. Polygon amenities become access points (see
+    `amenity_access_points`) unless `include_polygons=False`, or are
+    returned as polygons with `access_points=False` (for callers that
+    derive access points from their own edges, as tiled runs do per tile).
+
+    The key is fetched first if its partition is missing or outdated for
+    `polygon` and `source` (as in `update_amenity_store`), unless `offline`,
+    in which case a missing partition raises.
+    """
+    if not offline:
+        update_amenity_store([amenity_key], source, polygon=polygon, store_dir=store_dir)
+    path = _partition_path(amenity_key, store_dir)
+    if not path.exists():
+        reason = "and offline=True" if offline else "after updating the store"
+        raise FileNotFoundError(f"No stored amenities for {amenity_key!r} {reason}")
+
+    gdf = gpd.read_parquet(path, columns=["element", "osmid", "geometry"])
+    gdf = gdf.set_index(["element", "osmid"])
+    if not gdf.crs.equals(CRS_PROJECTED):
+        gdf = gdf.to_crs(CRS_PROJECTED)  # partitions written before the store was projected
+    if not include_polygons:
+        return gdf[gdf.geometry.type == "Point"]
+    if not access_points:
+        return gdf
+    return amenity_access_points(gdf, edges)
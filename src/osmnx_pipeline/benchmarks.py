@@ -0,0 +1,211 @@
+"""
+Runtime benchmarks for the routing engine on synthetic street grids.
+
+They need no OSM download or gold data, so timings are comparable across
+machines and commits. Run them all with:
+
+    python -m osmnx_pipeline.benchmarks
+"""
+
+import time
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import shapely
+
+from .checks import synthetic_grid_graph, synthetic_stop_times
+from .contraction import collapse_chains
+from .isochrones import walksheds
+from .parallel import parallel_node_distances
+from .routing import CompiledGraph, multi_source_distances
+from .scenarios import ScenarioEngine
+from .snapping import build_edge_table, edge_distances, snap_to_edges, snap_to_nodes
+from .transit import TransitNetwork, raptor, stop_footpaths
+
+
+def _timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def _random_points(cg, n, rng):
+    return (
+        rng.uniform(cg.x.min(), cg.x.max(), n),
+        rng.uniform(cg.y.min(), cg.y.max(), n),
+    )
+
+
+def benchmark_snap_modes(
+    n_rows: int = 200,
+    n_addresses: int = 200_000,
+    n_amenities: int = 200,
+    seed: int = 0,
+) -> dict:
+    """Node snapping vs edge snapping: runtime per stage and distance deltas."""
+    rng = np.random.default_rng(seed)
+    G = synthetic_grid_graph(n_rows, n_rows, seed=seed)
+    cg = CompiledGraph.from_graph(G)
+    addr_x, addr_y = _random_points(cg, n_addresses, rng)
+    amen_x, amen_y = _random_points(cg, n_amenities, rng)
+
+    (addr_pos, _), t_node_snap = _timed(snap_to_nodes, cg, addr_x, addr_y)
+    (amen_pos, _), t_node_amen = _timed(snap_to_nodes, cg, amen_x, amen_y)
+    node_dist, t_node_route = _timed(multi_source_distances, cg, amen_pos)
+    node_dist = node_dist[addr_pos]
+
+    edges, t_edge_table = _timed(build_edge_table, G, cg)
+    addr_snap, t_edge_snap = _timed(snap_to_edges, edges, addr_x, addr_y)
+    amen_snap, t_edge_amen = _timed(snap_to_edges, edges, amen_x, amen_y)
+    (edge_dist, _), t_edge_route = _timed(edge_distances, cg, edges, addr_snap, amen_snap)
+
+    results = {
+        "nodes": cg.n_nodes,
+        "addresses": n_addresses,
+        "node_snap_s": t_node_snap + t_node_amen,
+        "node_route_s": t_node_route,
+        "edge_table_s": t_edge_table,
+        "edge_snap_s": t_edge_snap + t_edge_amen,
+        "edge_route_s": t_edge_route,
+        "mean_abs_diff_m": float(np.mean(np.abs(edge_dist - node_dist))),
+    }
+    print(f"Snap modes on {cg.n_nodes:,} nodes, {n_addresses:,} addresses, {n_amenities} amenities")
+    print(f"  node: snap {results['node_snap_s']:.2f}s, route {results['node_route_s']:.2f}s")
+    print(
+        f"  edge: table {results['edge_table_s']:.2f}s, snap {results['edge_snap_s']:.2f}s, "
+        f"route {results['edge_route_s']:.2f}s"
+    )
+    print(f"  mean |edge - node| distance: {results['mean_abs_diff_m']:.1f} m")
+    return results
+
+
+def benchmark_parallel_scaling(
+    worker_counts=(1, 2, 4),
+    n_rows: int = 300,
+    n_keys: int = 8,
+    n_sources: int = 50,
+    seed: int = 0,
+) -> dict:
+    """Wall time of `n_keys` amenity passes per process-pool size."""
+    rng = np.random.default_rng(seed)
+    cg = CompiledGraph.from_graph(synthetic_grid_graph(n_rows, n_rows, seed=seed))
+    nodes = np.arange(cg.n_nodes)
+    sources_by_key = {f"key_{i}": rng.choice(cg.n_nodes, n_sources) for i in range(n_keys)}
+
+    _, serial = _timed(
+        lambda: {k: multi_source_distances(cg, s) for k, s in sources_by_key.items()}
+    )
+    print(f"Parallel scaling on {cg.n_nodes:,} nodes, {n_keys} amenity keys")
+    print(f"  in-process: {serial:.2f}s")
+    results = {0: serial}
+    for n_workers in worker_counts:
+        _, seconds = _timed(
+            parallel_node_distances, cg, nodes, sources_by_key, n_workers=n_workers
+        )
+        results[n_workers] = seconds
+        print(f"  {n_workers} worker(s): {seconds:.2f}s ({serial / seconds:.2f}x)")
+    return results
+
+
+def benchmark_contraction(
+    n_rows: int = 150, street_nodes: int = 3, n_terminals: int = 20_000, n_sources: int = 50, seed: int = 0
+) -> dict:
+    """Chain collapsing on a grid with sidewalk-like geometry nodes: size and Dijkstra time."""
+    rng = np.random.default_rng(seed)
+    cg = CompiledGraph.from_graph(synthetic_grid_graph(n_rows, n_rows, seed=seed, street_nodes=street_nodes))
+    terminals = rng.choice(cg.n_nodes, n_terminals, replace=False)
+    reduced, t_collapse = _timed(collapse_chains, cg, terminals)
+    sources = terminals[:n_sources]
+    _, t_full = _timed(multi_source_distances, cg, sources)
+    _, t_reduced = _timed(multi_source_distances, reduced, reduced.positions(cg.node_ids[sources]))
+
+    results = {
+        "nodes": cg.n_nodes, "reduced_nodes": reduced.n_nodes,
+        "edges": cg.n_edges, "reduced_edges": reduced.n_edges,
+        "collapse_s": t_collapse, "full_route_s": t_full, "reduced_route_s": t_reduced,
+    }
+    print(f"Contraction with {n_terminals:,} terminals: {cg.n_nodes:,} → {reduced.n_nodes:,} nodes, "
+          f"{cg.n_edges:,} → {reduced.n_edges:,} edges in {t_collapse:.2f}s")
+    print(f"  one multi-source pass: {t_full:.3f}s full, {t_reduced:.3f}s reduced ({t_full / t_reduced:.1f}x)")
+    return results
+
+
+def benchmark_raptor(n_rows: int = 120, every: int = 3, departures=(7 * 3600, 8 * 3600), seed: int = 0) -> dict:
+    """All-stops RAPTOR on a synthetic bus grid: network build and seconds per departure."""
+    cg = CompiledGraph.from_graph(synthetic_grid_graph(n_rows, n_rows, seed=seed))
+    stop_times = synthetic_stop_times(cg, n_rows, every=every, seed=seed)
+    stop_ids = np.unique(stop_times["stop_id"])
+    stop_pos = cg.positions(stop_ids.astype(int))
+
+    def build():
+        return TransitNetwork.from_stop_times(stop_ids, stop_pos, stop_times, stop_footpaths(cg, stop_pos))
+
+    net, t_build = _timed(build)
+    seconds = [_timed(raptor, net, d)[1] for d in departures]
+    results = {"stops": net.n_stops, "trips": net.n_trips, "build_s": t_build, "per_departure_s": float(np.mean(seconds))}
+    print(f"RAPTOR on {net.n_stops:,} stops, {len(net.patterns):,} patterns, {net.n_trips:,} trips")
+    print(f"  build (incl. footpaths): {t_build:.2f}s")
+    print(f"  all stops as origins: {results['per_departure_s']:.2f}s per departure")
+    return results
+
+
+def benchmark_walksheds(
+    worker_counts=(1, 2), n_rows: int = 150, n_amenities: int = 60, thresholds=(400, 800, 1600), seed: int = 0
+) -> dict:
+    """Walkshed polygons for `n_amenities` single-node amenities per process-pool size."""
+    rng = np.random.default_rng(seed)
+    G = synthetic_grid_graph(n_rows, n_rows, seed=seed)
+    cg = CompiledGraph.from_graph(G)
+    edges = build_edge_table(G, cg)
+    sources = rng.choice(cg.n_nodes, n_amenities, replace=False)
+    group = np.arange(n_amenities)
+    print(f"Walksheds on {cg.n_nodes:,} nodes, {n_amenities} amenities × {len(thresholds)} thresholds")
+    results = {}
+    for n_workers in worker_counts:
+        _, seconds = _timed(walksheds, cg, edges, group, sources, thresholds, n_workers=n_workers)
+        results[n_workers] = seconds
+        print(f"  {n_workers} worker(s): {seconds:.2f}s ({seconds / n_amenities * 1000:.1f} ms per amenity)")
+    return results
+
+
+def benchmark_scenarios(
+    n_rows: int = 300, n_addresses: int = 200_000, n_amenities: int = 200, n_runs: int = 5, seed: int = 0
+) -> dict:
+    """Single-site add/remove scenarios vs the full baseline pass they replace."""
+    rng = np.random.default_rng(seed)
+    cg = CompiledGraph.from_graph(synthetic_grid_graph(n_rows, n_rows, seed=seed))
+    addr_x, addr_y = _random_points(cg, n_addresses, rng)
+    addr_pos, _ = snap_to_nodes(cg, addr_x, addr_y)
+    addresses = gpd.GeoDataFrame(
+        {"address_point_id": np.arange(n_addresses), "nearest_node": cg.node_ids[addr_pos]},
+        geometry=shapely.points(addr_x, addr_y),
+    )
+    amenities = gpd.GeoDataFrame(
+        geometry=shapely.points(*_random_points(cg, n_amenities, rng)),
+        index=pd.MultiIndex.from_arrays([["node"] * n_amenities, np.arange(n_amenities)]),
+    )
+    engine = ScenarioEngine(cg, addresses, {"key": amenities})
+    _, t_baseline = _timed(engine.baseline, "key")
+    added = shapely.points(*_random_points(cg, n_runs, rng))
+    t_add = [_timed(engine.run, "key", added=added[i:i + 1])[1] for i in range(n_runs)]
+    t_remove = [_timed(engine.run, "key", removed=amenities.geometry.values[i:i + 1])[1] for i in range(n_runs)]
+
+    results = {"baseline_s": t_baseline, "add_s": float(np.mean(t_add)), "remove_s": float(np.mean(t_remove))}
+    print(f"Scenarios on {cg.n_nodes:,} nodes, {n_addresses:,} addresses, {n_amenities} amenities")
+    print(f"  baseline pass: {t_baseline:.3f}s")
+    print(f"  one site: add {results['add_s']:.3f}s, remove {results['remove_s']:.3f}s")
+    return results
+
+
+def main():
+    benchmark_snap_modes()
+    benchmark_parallel_scaling()
+    benchmark_contraction()
+    benchmark_raptor()
+    benchmark_walksheds()
+    benchmark_scenarios()
+
+
+if __name__ == "__main__":
+    main()
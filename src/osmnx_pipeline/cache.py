@@ -0,0 +1,110 @@
+"""
+On-disk cache for projected OSM graphs.
+
+Each entry is keyed on the study-area polygon, the OSMnx network type and the
+target CRS, and is stored as node/edge GeoParquet tables plus a small JSON
+metadata file. Every OSM attribute is kept, so a reloaded graph looks like a
+freshly downloaded one; reloading takes seconds instead of re-downloading the
+network from Overpass.
+"""
+
+import hashlib
+import json
+import shutil
+from datetime import datetime, timezone
+from functools import partial
+
+import geopandas as gpd
+import networkx as nx
+import osmnx as ox
+import shapely
+
+from .config import GRAPH_CACHE_DIR, GRAPH_CACHE_VERSION
+
+
+
+def graph_cache_key(polygon, network_type: str, crs: str) -> str:
+    """Stable key for a (polygon, network_type, crs) graph build."""
+    h = hashlib.sha256()
+    h.update(f"v{GRAPH_CACHE_VERSION}|{network_type}|{crs}|".encode())
+    h.update(shapely.to_wkb(shapely.normalize(polygon), output_dimension=2))
+    return h.hexdigest()[:16]
+
+
+def _entry_dir(key: str, cache_dir=GRAPH_CACHE_DIR):
+    return cache_dir / key
+
+
+def has_cached_graph(key: str, cache_dir=GRAPH_CACHE_DIR) -> bool:
+    return (_entry_dir(key, cache_dir) / "meta.json").exists()
+
+
+def _python_scalar(value):
+    return value.item()  # numpy scalars inside OSM attribute values
+
+
+def _encode_objects(frame) -> list[str]:
+    """
+    JSON-encode the object columns of `frame` in place (OSM attributes may
+    hold one value or a list of values per row) and return their names.
+    """
+    columns = [c for c in frame.columns if c != frame.geometry.name and frame[c].dtype == object]
+    for c in columns:
+        frame[c] = frame[c].map(partial(json.dumps, default=_python_scalar), na_action="ignore")
+    return columns
+
+
+def save_graph(G: nx.MultiDiGraph, key: str, network_type: str, cache_dir=GRAPH_CACHE_DIR) -> None:
+    """Write a projected graph, with all node and edge attributes, to the cache."""
+    # edges without a geometry attribute stay without one when reloaded
+    nodes, edges = ox.graph_to_gdfs(G, fill_edge_geometry=False)
+    json_columns = {"nodes": _encode_objects(nodes), "edges": _encode_objects(edges)}
+
+    entry = _entry_dir(key, cache_dir)
+    tmp = entry.with_name(entry.name + ".tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+
+    nodes.to_parquet(tmp / "nodes.parquet", compression="snappy")
+    edges.to_parquet(tmp / "edges.parquet", compression="snappy")
+    meta = {
+        "version": GRAPH_CACHE_VERSION,
+        "key": key,
+        "network_type": network_type,
+        "crs": str(G.graph["crs"]),
+        "n_nodes": len(nodes),
+        "n_edges": len(edges),
+        "json_columns": json_columns,
+        "created": datetime.now(timezone.utc).isoformat(),
+    }
+    (tmp / "meta.json").write_text(json.dumps(meta, indent=2))
+
+    # swap in the finished entry so readers never see a partial write
+    shutil.rmtree(entry, ignore_errors=True)
+    tmp.rename(entry)
+
+
+def load_cached_graph(key: str, cache_dir=GRAPH_CACHE_DIR) -> nx.MultiDiGraph:
+    """Rebuild a MultiDiGraph from a cache entry."""
+    entry = _entry_dir(key, cache_dir)
+    meta = json.loads((entry / "meta.json").read_text())
+    if meta["version"] != GRAPH_CACHE_VERSION:
+        raise ValueError(f"Graph cache entry {key} has stale version {meta['version']}")
+
+    nodes = gpd.read_parquet(entry / "nodes.parquet")
+    edges = gpd.read_parquet(entry / "edges.parquet")
+    for frame, columns in [(nodes, meta["json_columns"]["nodes"]), (edges, meta["json_columns"]["edges"])]:
+        for c in columns:
+            frame[c] = frame[c].map(json.loads, na_action="ignore")
+    G = ox.convert.graph_from_gdfs(nodes, edges, graph_attrs={"crs": meta["crs"]})
+    G.graph["cache_key"] = key
+    G.graph["network_type"] = meta["network_type"]
+    return G
+
+
+def invalidate_graph_cache(key: str | None = None, cache_dir=GRAPH_CACHE_DIR) -> None:
+    """Delete one cache entry, or every entry when `key` is None."""
+    if key is None:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+    else:
+        shutil.rmtree(_entry_dir(key, cache_dir), ignore_errors=True)
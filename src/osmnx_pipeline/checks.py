@@ -0,0 +1,1424 @@
+"""
+Self-contained correctness checks for the routing engine.
+
+These run on small synthetic graphs (no OSM download, no gold data) and raise
+AssertionError on mismatch. Run them all with:
+
+    python -m osmnx_pipeline.checks
+"""
+
+import importlib
+import io
+import os
+import sys
+import tempfile
+import zipfile
+from contextlib import ExitStack, contextmanager, redirect_stdout
+from datetime import date as Date
+from functools import partial
+from pathlib import Path
+from unittest import mock
+
+import geopandas as gpd
+import networkx as nx
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+import shapely
+
+from medallion.geoparquet import (
+    has_bbox_covering,
+    projected_variant,
+    read_geoparquet,
+    write_sorted_geoparquet,
+)
+from medallion.manifest import MANIFEST_NAME
+from medallion.runner import run_processors
+from medallion.streaming import geojson_to_geoparquet
+
+from . import amenities as amenities_module
+from . import distances as distances_module
+from . import regional
+from . import transit as transit_module
+from .aggregation import grouped_stats
+from .amenities import amenity_access_points, fetch_amenities, update_amenity_store
+from .cache import graph_cache_key, has_cached_graph, invalidate_graph_cache, load_cached_graph, save_graph
+from .config import (
+    CRS_LATLON,
+    CRS_PROJECTED,
+    MODES,
+    TRANSIT_ACCESS_MAX_M,
+    TRANSIT_ACCESS_STOPS,
+    TRANSIT_SLACK_S,
+    WALK_SPEED_MPS,
+)
+from .contraction import collapse_chains, drop_unreachable, parity_check
+from .distances import distances_to_amenities
+from .impedance import add_travel_times, bike_speed_factor
+from .isochrones import walksheds, write_walksheds
+from .layers import GoldLayer
+from .parallel import parallel_node_distances
+from .routing import (
+    BACKENDS,
+    CompiledGraph,
+    k_nearest_sources,
+    multi_source_distances,
+    nearest_label_table,
+)
+from .scenarios import ScenarioEngine, nearest_source_distances
+from .snapping import build_edge_table, edge_distances, snap_addresses, snap_to_edges, snap_to_nodes
+from .tiling import distances_to_amenities_tiled, make_tiles, tile_node_distances
+from .transit import (
+    UNREACHED,
+    TransitNetwork,
+    active_service_ids,
+    departure_times,
+    load_gtfs,
+    raptor,
+    representative_date,
+    stop_footpaths,
+    transit_times_to_amenities,
+)
+
+
+def synthetic_grid_graph(
+    n_rows: int = 20, n_cols: int = 20, spacing: float = 100.0, seed: int = 0, street_nodes: int = 0
+):
+    """
+    Projected OSMnx-style MultiDiGraph on a jittered street grid.
+
+    Every street is walkable in both directions with the same `length`, and a
+    few parallel edges are added so that edge collapsing is exercised. With
+    `street_nodes`, each street is split by that many geometry-only nodes,
+    as OSM sidewalks are (no parallel edges then).
+    """
+    rng = np.random.default_rng(seed)
+    G = nx.MultiDiGraph(crs=CRS_PROJECTED)
+    for r in range(n_rows):
+        for c in range(n_cols):
+            G.add_node(
+                r * n_cols + c,
+                x=c * spacing + rng.uniform(-10, 10),
+                y=r * spacing + rng.uniform(-10, 10),
+            )
+
+    def add_street(a, b):
+        dx = G.nodes[a]["x"] - G.nodes[b]["x"]
+        dy = G.nodes[a]["y"] - G.nodes[b]["y"]
+        length = float(np.hypot(dx, dy) * rng.uniform(1.0, 1.3))
+        chain = [a]
+        for i in range(1, street_nodes + 1):
+            f = i / (street_nodes + 1)
+            node = G.number_of_nodes()
+            G.add_node(node, x=G.nodes[a]["x"] - f * dx, y=G.nodes[a]["y"] - f * dy)
+            chain.append(node)
+        chain.append(b)
+        for p, q in zip(chain[:-1], chain[1:]):
+            G.add_edge(p, q, length=length / (street_nodes + 1))
+            G.add_edge(q, p, length=length / (street_nodes + 1))
+
+    for r in range(n_rows):
+        for c in range(n_cols):
+            node = r * n_cols + c
+            if c + 1 < n_cols:
+                add_street(node, node + 1)
+            if r + 1 < n_rows:
+                add_street(node, node + n_cols)
+
+    if street_nodes:
+        return G
+    # longer parallel edges must never win
+    for node in rng.choice(n_rows * (n_cols - 1), size=10, replace=False):
+        a = node + node // (n_cols - 1)
+        G.add_edge(a, a + 1, length=G[a][a + 1][0]["length"] * 2)
+    return G
+
+
+def check_backend_parity(G=None, n_sources: int = 5, seed: int = 0, atol: float = 1e-2) -> float:
+    """Every backend returns the networkx reference distances."""
+    G = synthetic_grid_graph() if G is None else G
+    cg = CompiledGraph.from_graph(G)
+    rng = np.random.default_rng(seed)
+    sources = rng.choice(cg.n_nodes, size=n_sources, replace=False)
+
+    reference = multi_source_distances(cg, sources, backend="networkx")
+    worst = 0.0
+    for backend in BACKENDS:
+        dist = multi_source_distances(cg, sources, backend=backend)
+        assert np.array_equal(np.isinf(dist), np.isinf(reference)), backend
+        finite = np.isfinite(reference)
+        diff = float(np.abs(dist[finite] - reference[finite]).max())
+        assert diff <= atol, f"{backend} differs from networkx by {diff:.4f} m"
+        worst = max(worst, diff)
+    return worst
+
+
+def check_graph_cache(G=None, n_sources: int = 3, seed: int = 0) -> int:
+    """
+    A graph saved to the cache loads back with the same nodes, edges
+    (parallel ones included), OSM attributes (lists and missing values too)
+    and distances, tagged with its cache key; invalidating removes it.
+    """
+    G = (synthetic_grid_graph() if G is None else G).copy()
+    for i, (u, v, data) in enumerate(G.edges(data=True)):
+        data["osmid"] = [i, i + 1] if i % 3 == 0 else i
+        data["highway"] = ["residential", "footway"] if i % 2 else "footway"
+        data["oneway"], data["reversed"] = False, [False, True] if i % 4 == 0 else bool(i % 2)
+        if i % 5 == 0:
+            data["name"] = "Main Street"
+        if i % 7 == 0:
+            data["geometry"] = shapely.LineString([(G.nodes[n]["x"], G.nodes[n]["y"]) for n in (u, v)])
+    for node in list(G.nodes)[::9]:
+        G.nodes[node]["highway"] = "crossing"
+
+    key = graph_cache_key(shapely.box(0, 0, 1, 1), "walk", CRS_PROJECTED)
+    with tempfile.TemporaryDirectory() as directory:
+        assert not has_cached_graph(key, Path(directory))
+        save_graph(G, key, "walk", cache_dir=Path(directory))
+        assert has_cached_graph(key, Path(directory))
+        H = load_cached_graph(key, cache_dir=Path(directory))
+        invalidate_graph_cache(key, cache_dir=Path(directory))
+        assert not has_cached_graph(key, Path(directory))
+    assert H.graph["cache_key"] == key and H.graph["network_type"] == "walk"
+    assert dict(H.nodes(data=True)) == dict(G.nodes(data=True))
+    for u, v, k, data in G.edges(keys=True, data=True):
+        reloaded = dict(H[u][v][k])
+        geometry = reloaded.pop("geometry", None)
+        assert (geometry is None) == ("geometry" not in data)
+        assert geometry is None or geometry.equals(data["geometry"])
+        assert reloaded == {a: x for a, x in data.items() if a != "geometry"}, (u, v, k)
+
+    cg, ch = CompiledGraph.from_graph(G), CompiledGraph.from_graph(H)
+    sources = np.random.default_rng(seed).choice(cg.node_ids, size=n_sources, replace=False)
+    expected = multi_source_distances(cg, cg.positions(sources))
+    actual = multi_source_distances(ch, ch.positions(sources))[ch.positions(cg.node_ids)]
+    assert np.allclose(actual, expected), "cached graph changes distances"
+    return H.number_of_edges()
+
+
+def check_cutoff(G=None, limit: float = 500.0, seed: int = 0) -> int:
+    """A bounded search matches the unbounded one inside the cutoff only."""
+    G = synthetic_grid_graph() if G is None else G
+    cg = CompiledGraph.from_graph(G)
+    sources = np.random.default_rng(seed).choice(cg.n_nodes, size=3, replace=False)
+
+    full = multi_source_distances(cg, sources)
+    for backend in BACKENDS:
+        bounded = multi_source_distances(cg, sources, backend=backend, limit=limit)
+        inside = full <= limit
+        assert np.array_equal(np.isfinite(bounded), inside), backend
+        assert np.allclose(bounded[inside], full[inside], atol=1e-2), backend
+    return int(inside.sum())
+
+
+def check_snapping(G=None, n_points: int = 1000, seed: int = 0) -> float:
+    """Chunked KD-tree snapping matches a brute-force nearest-node search."""
+    G = synthetic_grid_graph() if G is None else G
+    cg = CompiledGraph.from_graph(G)
+    rng = np.random.default_rng(seed)
+    x = rng.uniform(cg.x.min(), cg.x.max(), n_points)
+    y = rng.uniform(cg.y.min(), cg.y.max(), n_points)
+
+    positions, distances = snap_to_nodes(cg, x, y, chunk_size=128)
+    brute = np.hypot(x[:, None] - cg.x[None, :], y[:, None] - cg.y[None, :])
+    assert np.array_equal(positions, brute.argmin(axis=1))
+    assert np.allclose(distances, brute.min(axis=1), atol=1e-3)
+    return float(distances.max())
+
+
+def check_edge_snapping(G=None, n_addresses: int = 40, n_amenities: int = 5, seed: int = 0) -> float:
+    """
+    Edge-snapped address -> amenity distances equal networkx distances on a
+    graph where every address and amenity is inserted as a node splitting
+    its edge. Besides points on distinct edges, one two-way and one one-way
+    street each carry an amenity with an address before it and one after it.
+    """
+    G = synthetic_grid_graph() if G is None else G
+    G = G.copy()
+    # make one street (without parallel edges) one-way
+    one_way = next((a, b) for a, b in G.edges() if len(G[a][b]) == 1 and len(G[b][a]) == 1)
+    G.remove_edge(one_way[1], one_way[0])
+    cg = CompiledGraph.from_graph(G)
+    edges = build_edge_table(G, cg)
+    rng = np.random.default_rng(seed)
+
+    # points on distinct edges, away from the intersections, then the shared edges:
+    # (address, amenity, address) at fractions 0.2, 0.6, 0.85 of each
+    u_pos, v_pos = edges["u_pos"].to_numpy(), edges["v_pos"].to_numpy()
+    a, b = cg.positions(list(one_way))
+    one_way_edge = np.flatnonzero((u_pos == a) & (v_pos == b))[0]
+    assert not edges["twoway"].iat[one_way_edge]
+    candidates = np.setdiff1d(np.flatnonzero(edges["twoway"].to_numpy()), [one_way_edge])
+    chosen = rng.choice(candidates, size=n_addresses + n_amenities + 1, replace=False)
+    shared = np.array([chosen[-1], one_way_edge])
+    chosen = chosen[:-1]
+    fraction = rng.uniform(0.05, 0.95, size=len(chosen))
+    addr_edge = np.r_[chosen[:n_addresses], shared, shared]
+    addr_frac = np.r_[fraction[:n_addresses], 0.2, 0.2, 0.85, 0.85]
+    amen_edge = np.r_[chosen[n_addresses:], shared]
+    amen_frac = np.r_[fraction[n_addresses:], 0.6, 0.6]
+
+    def snap(edge, frac):
+        points = shapely.line_interpolate_point(edges.geometry.values[edge], frac, normalized=True)
+        snapped = snap_to_edges(edges, shapely.get_x(points), shapely.get_y(points))
+        assert np.array_equal(snapped["edge"], edge)
+        return snapped
+
+    dist, _ = edge_distances(cg, edges, snap(addr_edge, addr_frac), snap(amen_edge, amen_frac))
+
+    # reference: split each edge at its points
+    n_points = len(addr_edge) + len(amen_edge)
+    point_edge, point_frac = np.r_[addr_edge, amen_edge], np.r_[addr_frac, amen_frac]
+    H = nx.MultiDiGraph(G)
+    for e in np.unique(point_edge):
+        u, v = cg.node_ids[u_pos[e]], cg.node_ids[v_pos[e]]
+        length, twoway = edges["length"].iat[e], edges["twoway"].iat[e]
+        H.remove_edges_from([(u, v, k) for k in list(H[u][v])])
+        if twoway:
+            H.remove_edges_from([(v, u, k) for k in list(H[v][u])])
+        on_edge = np.flatnonzero(point_edge == e)
+        on_edge = on_edge[np.argsort(point_frac[on_edge])]
+        chain = [u, *[("point", i) for i in on_edge], v]
+        at = np.r_[0.0, point_frac[on_edge], 1.0] * length
+        for a, b, w in zip(chain[:-1], chain[1:], np.diff(at)):
+            H.add_edge(a, b, length=w)
+            if twoway:
+                H.add_edge(b, a, length=w)
+    n_addr = len(addr_edge)
+    reference = nx.multi_source_dijkstra_path_length(
+        H.reverse(copy=False), [("point", i) for i in range(n_addr, n_points)], weight="length"
+    )
+    expected = np.array([reference.get(("point", i), np.inf) for i in range(n_addr)])
+    assert np.array_equal(np.isfinite(dist), np.isfinite(expected))
+    # same-edge addresses go straight along the edge, except past the one-way amenity
+    two_way_m, one_way_m = edges["length"].to_numpy()[shared]
+    assert np.allclose(dist[[-4, -3, -2]], [0.4 * two_way_m, 0.4 * one_way_m, 0.25 * two_way_m])
+    assert dist[-1] > 0.25 * one_way_m
+    diff = float(np.abs(dist - expected).max())
+    assert diff <= 0.1, f"edge snapping differs from reference by {diff:.4f} m"
+    return diff
+
+
+def check_k_nearest(G=None, k: int = 3, within=(300.0, 800.0), seed: int = 0) -> int:
+    """
+    The single multi-label pass matches one Dijkstra per amenity, including
+    amenities that are reachable from several nodes.
+    """
+    G = synthetic_grid_graph() if G is None else G
+    cg = CompiledGraph.from_graph(G)
+    rng = np.random.default_rng(seed)
+    sources = rng.choice(cg.n_nodes, size=25, replace=False)
+    source_ids = np.arange(len(sources)) % 20  # some amenities have two access nodes
+
+    labels = k_nearest_sources(cg, sources, source_ids, k=k, keep_within=max(within))
+    dist_k, id_k, counts = nearest_label_table(cg, *labels, k=k, count_within=within)
+
+    per_id = np.array([
+        multi_source_distances(cg, sources[source_ids == i]) for i in range(20)
+    ])
+    expected = np.sort(per_id, axis=0)[:k].T
+    assert np.allclose(dist_k, expected, atol=1e-2)
+    nearest = per_id[id_k[:, 0], np.arange(cg.n_nodes)]
+    assert np.allclose(nearest, expected[:, 0], atol=1e-2)
+    for t, c in zip(within, counts):
+        assert np.array_equal(c, (per_id <= t).sum(axis=0)), t
+    return len(labels[0])
+
+
+def check_parallel_distances(G=None, limit: float = 600.0, n_workers: int = 2, seed: int = 0) -> int:
+    """
+    The process-pool search gives the same distances at the address nodes
+    (and settled-node counts) as `multi_source_distances`, per key, for an
+    empty source set, repeated sources, a `limit` and a directed weight.
+    """
+    G = synthetic_grid_graph() if G is None else G
+    cg = CompiledGraph.from_graph(G)
+    rng = np.random.default_rng(seed)
+    cg.add_weight("time", cg.weights["length"] * rng.uniform(0.5, 2.0, cg.n_edges))  # differs per direction
+    nodes = np.sort(rng.choice(cg.n_nodes, size=150, replace=False))
+    sources_by_key = {
+        "one": rng.choice(cg.n_nodes, size=1),
+        "many": rng.choice(cg.n_nodes, size=8),
+        "repeated": np.repeat(rng.choice(cg.n_nodes, size=3), 2),
+        "empty": np.empty(0, dtype=np.int32),
+    }
+    checked = 0
+    for weight, cutoff in [("length", np.inf), ("length", limit), ("time", limit)]:
+        parallel = parallel_node_distances(
+            cg, nodes, sources_by_key, limit=cutoff, n_workers=n_workers, weight=weight
+        )
+        assert list(parallel) == list(sources_by_key)
+        for key, sources in sources_by_key.items():
+            expected = multi_source_distances(cg, sources, weight=weight, limit=cutoff)
+            dist, n_settled, _ = parallel[key]
+            assert np.array_equal(np.isinf(dist), np.isinf(expected[nodes])), (key, weight, cutoff)
+            assert np.allclose(dist, expected[nodes], rtol=1e-6, atol=1e-2), (key, weight, cutoff)
+            assert n_settled == np.isfinite(expected).sum(), (key, weight, cutoff)
+            checked += 1
+    return checked
+
+
+def check_tiled_parity(
+    n_rows: int = 40, tile_size_m: float = 1_000, max_distance_m: float = 600, seed: int = 0
+) -> int:
+    """
+    `distances_to_amenities_tiled` (buffered tile subgraphs) matches the
+    untiled run exactly, including a large polygon amenity that gets its
+    access points from each tile graph's edges.
+    """
+    G = synthetic_grid_graph(n_rows, n_rows, seed=seed)
+    cg = CompiledGraph.from_graph(G)
+    rng = np.random.default_rng(seed)
+
+    def random_points(n):
+        return gpd.GeoSeries(
+            shapely.points(rng.uniform(cg.x.min(), cg.x.max(), n), rng.uniform(cg.y.min(), cg.y.max(), n)),
+            crs=CRS_PROJECTED,
+        )
+
+    addresses = gpd.GeoDataFrame({"address_point_id": np.arange(2_000)}, geometry=random_points(2_000))
+    parks = gpd.GeoDataFrame(
+        geometry=[shapely.box(1_450, 1_450, 1_750, 1_650), shapely.box(3_020, 520, 3_080, 580)],
+        crs=CRS_PROJECTED,
+    )
+    amenities = {
+        "a": gpd.GeoDataFrame(geometry=random_points(15)),
+        "b": gpd.GeoDataFrame(geometry=random_points(40)),
+        "parks": parks,
+    }
+    assert len(amenity_access_points(parks, build_edge_table(G, cg))) > len(parks)
+    node_points = shapely.points(cg.x, cg.y)
+
+    def subgraph(polygon):
+        inside = shapely.contains_xy(polygon, cg.x, cg.y)
+        return G.subgraph(cg.node_ids[inside].tolist())
+
+    study_area = shapely.box(*shapely.total_bounds(node_points))
+    tiles = make_tiles(method="grid", tile_size_m=tile_size_m, study_area=study_area)
+    tiled = distances_to_amenities_tiled(
+        list(amenities), max_distance_m, tiles=tiles,
+        addresses=addresses, amenities_by_key=amenities, graph_loader=subgraph,
+    )
+    untiled = tile_node_distances(G, addresses, amenities, max_distance_m)
+
+    for col in ["dist_a_m", "dist_b_m", "dist_parks_m"]:
+        assert np.array_equal(tiled[col].isna(), untiled[col].isna()), col
+        assert np.allclose(tiled[col].dropna(), untiled[col].dropna(), atol=1e-3), col
+    return len(tiles)
+
+
+SYNTHETIC_OSM_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<osm version="0.6" generator="checks">
+  <node id="1" lat="37.80" lon="-122.27" version="1"><tag k="shop" v="supermarket"/></node>
+  <node id="2" lat="37.81" lon="-122.26" version="1"><tag k="shop" v="grocery"/></node>
+  <node id="3" lat="37.90" lon="-122.20" version="1"><tag k="shop" v="supermarket"/></node>
+  <node id="4" lat="37.80" lon="-122.26" version="1"><tag k="amenity" v="school"/></node>
+</osm>
+"""
+
+
+SYNTHETIC_ORIGIN = (564_000.0, 4_183_000.0)  # projected, near Oakland
+
+
+def synthetic_study_graph(**kwargs):
+    """`synthetic_grid_graph` moved to `SYNTHETIC_ORIGIN`, so that lat/lon queries work."""
+    G = synthetic_grid_graph(**kwargs)
+    for _, data in G.nodes(data=True):
+        data["x"] += SYNTHETIC_ORIGIN[0]
+        data["y"] += SYNTHETIC_ORIGIN[1]
+    return G
+
+
+def synthetic_osm_xml(points, tags=("shop", "supermarket")) -> str:
+    """OSM XML with one tagged node per projected point (osm ids 1, 2, ...)."""
+    lon, lat = gpd.GeoSeries(points, crs=CRS_PROJECTED).to_crs(CRS_LATLON).get_coordinates().to_numpy().T
+    tag = f'<tag k="{tags[0]}" v="{tags[1]}"/>'
+    nodes = "".join(
+        f'  <node id="{i + 1}" lat="{y:.7f}" lon="{x:.7f}" version="1">{tag}</node>\n'
+        for i, (x, y) in enumerate(zip(lon, lat))
+    )
+    return f'<?xml version="1.0" encoding="UTF-8"?>\n<osm version="0.6" generator="checks">\n{nodes}</osm>\n'
+
+
+class _PointLayer:
+    """Stand-in for a `GoldLayer` of points held in memory (no attributes to join)."""
+
+    def __init__(self, points: gpd.GeoDataFrame):
+        self._points = points
+
+    def points(self) -> gpd.GeoDataFrame:
+        return self._points.copy()
+
+    def join_attributes(self, frame, columns=None):
+        return frame
+
+
+def _subgraph_loader(G):
+    """`build_walk_network` stand-in: the part of `G` inside `polygon` (lat/lon), keyed on it."""
+    def load(network_type="walk", offline=False, polygon=None, **kwargs):
+        area = gpd.GeoSeries([polygon], crs=CRS_LATLON).to_crs(CRS_PROJECTED).iloc[0]
+        nodes = [n for n, d in G.nodes(data=True) if area.contains(shapely.Point(d["x"], d["y"]))]
+        H = G.subgraph(nodes).copy()
+        H.graph["cache_key"] = graph_cache_key(polygon, network_type, CRS_PROJECTED)
+        return H
+    return load
+
+
+@contextmanager
+def synthetic_run(directory, G, addresses, amenity_points, counties=None, area=None):
+    """
+    Patch the loaders of `distances_to_amenities` and
+    `transit_times_to_amenities` so they run offline on `G`:
+    `addresses` as the gold address layer, `amenity_points` as the
+    `grocery_stores` of a local OSM extract, `counties` (a GeoDataFrame with
+    `county_name`) as the county layer and `area` (projected) as the study
+    area. Snap tables, the amenity store and outputs stay in `directory`.
+    """
+    directory = Path(directory)
+    source = directory / "extract.osm"
+    source.write_text(synthetic_osm_xml(amenity_points))
+    store = directory / "store"
+
+    def county_areas(names=None, crs=CRS_LATLON):
+        selected = counties if names is None else counties[counties["county_name"].isin(names)]
+        return selected.to_crs(crs)
+
+    with ExitStack() as stack:
+        for module in (distances_module, transit_module):
+            patch = partial(mock.patch.object, module)
+            stack.enter_context(patch("ADDRESSES", _PointLayer(addresses)))
+            stack.enter_context(patch(
+                "snap_addresses", lambda a, cg, cache_key=None, edges=None: snap_addresses(a, cg, edges=edges)
+            ))
+            stack.enter_context(patch(
+                "update_amenity_store", partial(update_amenity_store, source=source, store_dir=store)
+            ))
+            stack.enter_context(patch(
+                "fetch_amenities", partial(fetch_amenities, source=source, store_dir=store)
+            ))
+        stack.enter_context(mock.patch.object(transit_module, "build_walk_network", lambda **kwargs: G))
+        patch = partial(mock.patch.object, distances_module)
+        stack.enter_context(patch("build_network", lambda mode="walk", **kwargs: G))
+        stack.enter_context(patch(
+            "write_county_partitions",
+            partial(regional.write_county_partitions, directory=directory / "by_county"),
+        ))
+        stack.enter_context(patch("NODE_ACCESS_PATH", directory / "nodes.parquet"))
+        if area is not None:
+            study_area = gpd.GeoSeries([area], crs=CRS_PROJECTED).to_crs(CRS_LATLON).iloc[0]
+            stack.enter_context(mock.patch.object(amenities_module, "load_study_area", lambda: study_area))
+        if counties is not None:
+            stack.enter_context(mock.patch.object(regional, "load_county_areas", county_areas))
+            stack.enter_context(mock.patch.object(regional, "build_walk_network", _subgraph_loader(G)))
+        yield
+
+
+def check_regional(seed: int = 0) -> int:
+    """
+    Two adjacent synthetic counties: their merged graph is the whole network,
+    addresses get their county, and a regional run over the west county
+    finds amenities across the border (they are fetched for the buffered
+    area) with the distances of the full graph. Returns the number of west
+    addresses whose nearest amenity is in the east county.
+    """
+    G = synthetic_study_graph(seed=seed)
+    x0, y0 = SYNTHETIC_ORIGIN
+    counties = gpd.GeoDataFrame(
+        {"county_name": ["West", "East"]},
+        geometry=[
+            shapely.box(x0 - 500, y0 - 500, x0 + 950, y0 + 2400),
+            shapely.box(x0 + 950, y0 - 500, x0 + 2400, y0 + 2400),
+        ],
+        crs=CRS_PROJECTED,
+    )
+    rng = np.random.default_rng(seed)
+    xy = np.column_stack([rng.uniform(x0, x0 + 1900, 300), rng.uniform(y0, y0 + 1900, 300)])
+    addresses = gpd.GeoDataFrame(
+        {"address_point_id": np.arange(len(xy))}, geometry=shapely.points(xy), crs=CRS_PROJECTED
+    )
+    amenity_points = shapely.points([(x0 + 1300, y0 + 900), (x0 + 100, y0 + 1800)])  # east, west
+
+    with (
+        tempfile.TemporaryDirectory() as directory,
+        synthetic_run(directory, G, addresses, amenity_points, counties=counties),
+    ):
+        merged = regional.build_regional_network(["West", "East"], buffer_m=200)
+        assert set(merged.nodes) == set(G.nodes) and merged.number_of_edges() == G.number_of_edges()
+        names = regional.assign_counties(addresses.geometry)
+        assert np.array_equal(names == "West", xy[:, 0] < x0 + 950)
+
+        result = distances_to_amenities(["grocery_stores"], counties=["West"])
+        assert (result["county_name"] == "West").all() and len(result) == (names == "West").sum()
+        assert (Path(directory) / "by_county" / "county_name=West" / "part-0.parquet").exists()
+
+    cg = CompiledGraph.from_graph(G)
+    addr_pos, _ = snap_to_nodes(cg, *xy[names == "West"].T)
+    amen_pos, _ = snap_to_nodes(cg, shapely.get_x(amenity_points), shapely.get_y(amenity_points))
+    expected = multi_source_distances(cg.reversed(), amen_pos)[addr_pos]
+    west_only = multi_source_distances(cg.reversed(), amen_pos[1:])[addr_pos]
+    assert np.allclose(result["dist_grocery_stores_m"].to_numpy(), expected)
+    n_across = int((expected < west_only).sum())
+    assert n_across > 0
+    return n_across
+
+
+def check_distances_end_to_end(n_addresses: int = 300, limit: float = 600.0, seed: int = 0) -> int:
+    """
+    `distances_to_amenities` on a synthetic study area gives the distances
+    of a direct search on the reversed graph, and every option combination
+    (backends, contraction, worker pool, multi-label search, travel-time
+    weights, cutoffs, counties, edge snapping) agrees with that plain run.
+    Returns the number of combinations checked.
+    """
+    G = synthetic_study_graph(n_rows=12, n_cols=12, street_nodes=1, seed=seed)
+    x0, y0 = SYNTHETIC_ORIGIN
+    area = shapely.box(x0 - 100, y0 - 100, x0 + 1200, y0 + 1200)
+    counties = gpd.GeoDataFrame(
+        {"county_name": ["West", "East"]},
+        geometry=[shapely.box(x0 - 100, y0 - 100, x0 + 550, y0 + 1200),
+                  shapely.box(x0 + 550, y0 - 100, x0 + 1200, y0 + 1200)],
+        crs=CRS_PROJECTED,
+    )
+    rng = np.random.default_rng(seed)
+    xy = np.column_stack([rng.uniform(x0, x0 + 1100, n_addresses), rng.uniform(y0, y0 + 1100, n_addresses)])
+    addresses = gpd.GeoDataFrame(
+        {"address_point_id": np.arange(n_addresses)}, geometry=shapely.points(xy), crs=CRS_PROJECTED
+    )
+    amenity_points = shapely.points(rng.uniform([x0, y0], [x0 + 1100, y0 + 1100], (4, 2)))
+    cg = CompiledGraph.from_graph(G)
+    addr_pos, _ = snap_to_nodes(cg, *xy.T)
+    amen_pos, _ = snap_to_nodes(cg, shapely.get_x(amenity_points), shapely.get_y(amenity_points))
+    per_amenity = np.array([multi_source_distances(cg.reversed(), [p])[addr_pos] for p in amen_pos])
+    key, column = "grocery_stores", "dist_grocery_stores_m"
+
+    def run(**kwargs):
+        with redirect_stdout(io.StringIO()):
+            return distances_to_amenities([key], **kwargs)
+
+    with (
+        tempfile.TemporaryDirectory() as directory,
+        synthetic_run(directory, G, addresses, amenity_points, counties=counties, area=area),
+    ):
+        reference = run()[column].to_numpy()
+        same = [
+            {"backend": "networkx"},
+            {"contract": True},
+            {"n_workers": 2},
+            {"contract": True, "n_workers": 2},
+            {"k_nearest": 2, "count_within_m": (limit,)},
+            {"contract": True, "k_nearest": 1},
+            {"counties": ["West", "East"], "write_partitions": False},
+            {"write_node_table": True},
+        ]
+        for kwargs in same:
+            result = run(**kwargs)
+            assert np.allclose(result[column], reference, rtol=1e-6, atol=1e-2, equal_nan=True), kwargs
+        node_table = gpd.read_parquet(Path(directory) / "nodes.parquet")
+        assert node_table["n_addresses"].sum() == n_addresses
+
+        multi = run(k_nearest=2, count_within_m=(limit,))
+        assert (multi[f"dist_{key}_k2_m"] >= multi[column]).all()
+        assert np.array_equal(multi[f"count_{key}_{limit:g}m"], (per_amenity <= limit).sum(axis=0))
+        assert (multi[f"nearest_{key}_id"].isin(range(1, len(amenity_points) + 1))).all()
+
+        times = [
+            {"weight": "walk_time"},
+            {"mode": "bike", "weight": "bike_time"},
+            {"contract": True, "n_workers": 2, "weight": "walk_time"},
+        ]
+        for kwargs in times:
+            seconds = run(**kwargs)[f"{kwargs['weight']}_{key}_s"]
+            speed = MODES[kwargs.get("mode", "walk")]["speed_mps"]  # flat ground without a DEM
+            assert np.allclose(seconds * speed, reference, rtol=1e-5, atol=1e-2), kwargs
+
+        for snap, base in [("node", reference), ("edge", run(snap="edge")[column].to_numpy())]:
+            for kwargs in [{}, {"contract": True}] if snap == "node" else [{}]:
+                capped = run(snap=snap, max_distance_m=limit, **kwargs)
+                beyond = ~(base <= limit)  # unreachable counts as beyond
+                assert np.array_equal(capped[f"beyond_{key}_cutoff"], beyond), (snap, kwargs)
+                assert np.allclose(capped[column][~beyond], base[~beyond], atol=1e-2), (snap, kwargs)
+                assert capped[column][beyond].isna().all(), (snap, kwargs)
+
+    assert np.allclose(reference, per_amenity.min(axis=0))
+    return len(same) + len(times) + 3
+
+
+def check_access_points() -> int:
+    """
+    Large polygons get one access point per street crossing their boundary
+    (edges meeting on the boundary and edges running along it count once);
+    points pass through, small or uncrossed polygons get one point.
+    """
+    index = pd.MultiIndex.from_tuples(
+        [("node", 1), ("way", 2), ("way", 3), ("way", 4)], names=["element", "osmid"]
+    )
+    amenities = gpd.GeoDataFrame(
+        geometry=[
+            shapely.Point(-50, -50),
+            shapely.box(0, 0, 200, 200),  # large, crossed
+            shapely.box(90, 300, 110, 320),  # small, crossed
+            shapely.box(300, 300, 400, 400),  # large, not crossed
+        ],
+        index=index,
+        crs=CRS_PROJECTED,
+    )
+    edges = gpd.GeoDataFrame(
+        geometry=[
+            shapely.LineString([(-20, 100), (220, 100)]),  # through: 2 crossings
+            shapely.LineString([(100, -20), (100, 0)]),  # meet on the boundary: 1
+            shapely.LineString([(100, 0), (100, 50)]),
+            shapely.LineString([(50, 200), (150, 200)]),  # along the boundary: 1
+            shapely.LineString([(100, 250), (100, 350)]),  # crosses the small one
+        ],
+        crs=CRS_PROJECTED,
+    )
+    access = amenity_access_points(amenities, edges, small_area_m2=5_000)
+    counts = access.index.value_counts()
+    assert counts.to_dict() == {("way", 2): 4, ("node", 1): 1, ("way", 3): 1, ("way", 4): 1}, counts
+    crossings = sorted((round(p.x), round(p.y)) for p in access.loc[[("way", 2)]].geometry)
+    along = [p for p in crossings if p[1] == 200]
+    assert [p for p in crossings if p[1] != 200] == [(0, 100), (100, 0), (200, 100)], crossings
+    assert len(along) == 1 and 50 <= along[0][0] <= 150, crossings
+    assert access.loc[[("way", 3)]].geometry.iat[0].within(amenities.geometry.iat[2])
+    assert len(amenity_access_points(amenities)) == 4  # without edges: one point each
+    return len(access)
+
+
+def check_amenity_store() -> int:
+    """
+    The amenity store fetches a key once, serves it from disk afterwards,
+    and refetches it when the study area changes or on `refresh`.
+    """
+    small = shapely.box(-122.30, 37.75, -122.25, 37.85)
+    large = shapely.box(-122.30, 37.75, -122.15, 37.95)
+    with tempfile.TemporaryDirectory() as directory:
+        store, source = Path(directory) / "store", Path(directory) / "extract.osm"
+        source.write_text(SYNTHETIC_OSM_XML)
+
+        def update(polygon, **kwargs):
+            return update_amenity_store(["grocery_stores"], source, polygon=polygon, store_dir=store, **kwargs)
+
+        assert update(small) == ["grocery_stores"]
+        assert update(small) == []
+        assert len(fetch_amenities("grocery_stores", offline=True, store_dir=store)) == 2
+        assert update(large) == ["grocery_stores"]  # a new study area is refetched
+        assert len(fetch_amenities("grocery_stores", offline=True, store_dir=store)) == 3
+        assert update(large, refresh=True) == ["grocery_stores"]
+        try:
+            fetch_amenities("schools", offline=True, store_dir=store)
+        except FileNotFoundError as error:
+            assert "offline=True" in str(error)
+        else:
+            raise AssertionError("a missing partition must raise when offline")
+    return 3
+
+
+def check_streaming(n_features: int = 50, batch_size: int = 7, seed: int = 0) -> int:
+    """
+    Streaming GeoJSON to projected GeoParquet in batches gives the same
+    table as `gpd.read_file` followed by `to_crs`.
+    """
+    rng = np.random.default_rng(seed)
+    x, y = rng.uniform(-122.3, -122.2, n_features), rng.uniform(37.75, 37.85, n_features)
+    geometries = shapely.points(x, y)
+    geometries[::5] = shapely.buffer(geometries[::5], 0.001)  # some polygons too
+    features = gpd.GeoDataFrame(
+        {"name": [f"feature {i}" for i in range(n_features)], "value": rng.integers(0, 100, n_features)},
+        geometry=geometries,
+        crs="EPSG:4326",
+    )
+    with tempfile.TemporaryDirectory() as directory:
+        source, output = Path(directory) / "features.geojson", Path(directory) / "features.parquet"
+        features.to_file(source)
+        n = geojson_to_geoparquet(source, output, crs=CRS_PROJECTED, batch_size=batch_size)
+        streamed = gpd.read_parquet(output)
+        expected = gpd.read_file(source).to_crs(CRS_PROJECTED)
+    assert n == n_features and streamed.crs.equals(expected.crs)
+    pd.testing.assert_frame_equal(
+        pd.DataFrame(streamed.drop(columns="geometry")),
+        pd.DataFrame(expected.drop(columns="geometry")),
+        check_dtype=False,
+    )
+    assert shapely.equals_exact(streamed.geometry.values, expected.geometry.values, tolerance=1e-6).all()
+    return n
+
+
+def check_sorted_geoparquet(n_features: int = 2000, row_group_size: int = 100, seed: int = 0) -> int:
+    """
+    A Hilbert-sorted GeoParquet file read by bbox or polygon returns exactly
+    the intersecting rows, while the covering column's statistics rule out
+    most row groups. Returns the number of row groups read.
+    """
+    rng = np.random.default_rng(seed)
+    geometries = shapely.points(rng.uniform(0, 10_000, (n_features, 2)))
+    geometries[::10] = shapely.buffer(geometries[::10], 200.0)
+    features = gpd.GeoDataFrame({"feature_id": np.arange(n_features)}, geometry=geometries, crs=CRS_PROJECTED)
+    bbox = (2_000.0, 3_000.0, 4_000.0, 4_500.0)
+    polygon = shapely.Polygon([(5_000, 5_000), (9_000, 6_000), (6_000, 9_000)])
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "features.parquet"
+        write_sorted_geoparquet(features, path, row_group_size=row_group_size)
+        assert has_bbox_covering(path)
+        for region, kwargs in [(shapely.box(*bbox), {"bbox": bbox}), (polygon, {"polygon": polygon})]:
+            read = read_geoparquet(path, columns=["feature_id"], **kwargs)
+            expected = features["feature_id"][features.intersects(region)]
+            assert sorted(read["feature_id"]) == sorted(expected), kwargs
+        # row groups whose covering bounds overlap the bbox
+        metadata = pq.read_metadata(path)
+        names = [metadata.schema.column(i).path for i in range(metadata.num_columns)]
+        overlapping = 0
+        for i in range(metadata.num_row_groups):
+            group = metadata.row_group(i)
+            stats = {
+                n: group.column(names.index(f"bbox.{n}")).statistics for n in ("xmin", "ymin", "xmax", "ymax")
+            }
+            overlapping += (
+                stats["xmin"].min <= bbox[2] and stats["xmax"].max >= bbox[0]
+                and stats["ymin"].min <= bbox[3] and stats["ymax"].max >= bbox[1]
+            )
+    assert overlapping < metadata.num_row_groups / 2, f"{overlapping} of {metadata.num_row_groups} row groups"
+    return overlapping
+
+
+def check_gold_layer(n_points: int = 500, seed: int = 0) -> int:
+    """
+    A gold point layer gives the same projected coordinates from the lat/lon
+    file, from its projected copy and from the coordinate cache; the cache
+    is reused by a fresh handle and replaced when the source changes, and a
+    projected copy older than the source is ignored.
+    """
+    rng = np.random.default_rng(seed)
+    x, y = rng.uniform(-122.3, -122.2, n_points), rng.uniform(37.75, 37.85, n_points)
+    gdf = gpd.GeoDataFrame(
+        {
+            "address_point_id": np.arange(n_points) * 7,
+            "street": [f"street {i % 13}" for i in range(n_points)],
+        },
+        geometry=shapely.points(x, y),
+        crs="EPSG:4326",
+    )
+    expected = gdf.to_crs(CRS_PROJECTED)
+    with tempfile.TemporaryDirectory() as directory:
+        path, cache_dir = Path(directory) / "address_points.geoparquet", Path(directory) / "layers"
+        gdf.to_parquet(path)
+
+        def layer_coords():
+            layer = GoldLayer(path, id_column="address_point_id", cache_dir=cache_dir)
+            ids, x, y = layer.coords()
+            assert np.array_equal(ids, gdf["address_point_id"])
+            assert np.allclose(x, expected.geometry.x) and np.allclose(y, expected.geometry.y)
+            (cached,) = cache_dir.glob("*.npz")
+            return layer, cached.name, cached.stat().st_mtime_ns
+
+        layer, transformed, written = layer_coords()
+        assert layer.projected_path is None
+        assert layer_coords()[1:] == (transformed, written)  # a fresh handle reads the cache
+
+        write_sorted_geoparquet(expected, projected_variant(path, CRS_PROJECTED), sort=False)
+        layer, from_copy, _ = layer_coords()
+        assert layer.projected_path is not None and from_copy != transformed  # old entry evicted
+        subset = layer.points().iloc[::50]
+        joined = layer.join_attributes(subset)
+        assert joined["street"].tolist() == gdf["street"].iloc[::50].tolist()
+        assert layer.read(columns=["street"]).crs.equals(CRS_PROJECTED)
+
+        os.utime(path)  # the source is now newer than its projected copy
+        layer, _, _ = layer_coords()
+        assert layer.projected_path is None
+    return n_points
+
+
+def _write_processor(directory, name: str, inputs, outputs, body: str) -> Path:
+    """A processor module in `directory`, as the layer drivers discover them."""
+    path = Path(directory) / f"{name}.py"
+    path.write_text(
+        "from pathlib import Path\n\n"
+        f"INPUTS = [Path(p) for p in {[str(p) for p in inputs]!r}]\n"
+        f"OUTPUTS = [Path(p) for p in {[str(p) for p in outputs]!r}]\n\n\n"
+        f"def process():\n    {body}\n"
+    )
+    importlib.invalidate_caches()
+    return path
+
+
+@contextmanager
+def _processor_modules(*directories):
+    """Forget the processor modules imported from `directories` afterwards."""
+    try:
+        yield
+    finally:
+        for directory in map(str, directories):
+            for name, module in list(sys.modules.items()):
+                if str(Path(getattr(module, "__file__", None) or "/").parent) == directory:
+                    del sys.modules[name]
+            while directory in sys.path:
+                sys.path.remove(directory)
+
+
+def _run_quietly(*args, **kwargs) -> dict:
+    with redirect_stdout(io.StringIO()):
+        return run_processors(*args, **kwargs)
+
+
+def check_manifest() -> int:
+    """
+    A processor is skipped while its manifest record is current, and re-runs
+    when an input's content or its own code changes; a rebuilt upstream
+    output re-runs the downstream layer. Returns the number of runs checked.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        directory = Path(directory).resolve()
+        silver, gold = directory / "silver", directory / "gold"
+        silver.mkdir(), gold.mkdir()
+        source, cleaned, summary = directory / "source.txt", directory / "cleaned.txt", directory / "summary.txt"
+        source.write_text("a\nb\n")
+        code = _write_processor(
+            silver, "_check_clean", [source], [cleaned], "OUTPUTS[0].write_text(INPUTS[0].read_text().upper())"
+        )
+        _write_processor(
+            gold, "_check_summary", [cleaned], [summary],
+            "OUTPUTS[0].write_text(str(len(INPUTS[0].read_text().split())))",
+        )
+
+        def run():
+            ran = []
+            for layer in (silver, gold):
+                results = _run_quietly(layer, set(), layer / MANIFEST_NAME)
+                assert not results["errors"], results["errors"]
+                ran += results["run"]
+            return ran
+
+        with _processor_modules(silver, gold):
+            assert run() == ["_check_clean", "_check_summary"]
+            assert run() == []
+            os.utime(source, ns=(source.stat().st_atime_ns, source.stat().st_mtime_ns + 10**9))
+            assert run() == []  # same content, only the stored fingerprint is refreshed
+            source.write_text("a\nb\nc\n")
+            assert run() == ["_check_clean", "_check_summary"]  # the rebuilt upstream re-runs gold
+            assert summary.read_text() == "3"
+            code.write_text(code.read_text() + "# edited\n")
+            assert run() == ["_check_clean"]  # same output, so gold stays current
+            assert run() == []
+    return 6
+
+
+def check_parallel_processors(workers: int = 2) -> int:
+    """
+    Processors run in a process pool give the same results as a serial run,
+    and a failing processor is reported without stopping the others (and
+    is not recorded, so it runs again). Returns the number of processors.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        directory = Path(directory).resolve()
+        source = directory / "source.txt"
+        source.write_text("value\n")
+        for name in ("_check_first", "_check_second"):
+            _write_processor(
+                directory, name, [source], [directory / f"{name}.txt"],
+                "print('processing'); OUTPUTS[0].write_text(INPUTS[0].read_text())",
+            )
+        _write_processor(
+            directory, "_check_failing", [source], [directory / "failing.txt"],
+            "print('processing'); raise ValueError('bad input')",
+        )
+        manifest_path = directory / MANIFEST_NAME
+
+        def summary(results):
+            processors = {
+                name: (p["status"], p["log"], p["error"] and p["error"].strip().splitlines()[-1])
+                for name, p in results["processors"].items()
+            }
+            return sorted(results["run"]), results["skipped"], sorted(results["errors"]), processors
+
+        with _processor_modules(directory):
+            serial = _run_quietly(directory, set(), manifest_path, force=True)
+            pooled = _run_quietly(directory, set(), manifest_path, force=True, workers=workers)
+            assert summary(pooled) == summary(serial)
+            assert sorted(pooled["run"]) == ["_check_first", "_check_second"]
+            assert pooled["processors"]["_check_failing"]["error"].strip().endswith("ValueError: bad input")
+            assert len(pooled["errors"]) == 1
+            rerun = _run_quietly(directory, set(), manifest_path, workers=workers)
+            assert rerun["skipped"] == ["_check_first", "_check_second"]
+            assert rerun["processors"]["_check_failing"]["status"] == "error"
+    return len(pooled["processors"])
+
+
+def check_travel_time_weights(G=None, seed: int = 0) -> float:
+    """
+    Time weights share the compiled graph: flat-ground times are distances
+    over speed, and on a slope every there-and-back trip gets slower.
+    """
+    G = synthetic_grid_graph() if G is None else G
+    cg = CompiledGraph.from_graph(G)
+    sources = np.random.default_rng(seed).choice(cg.n_nodes, size=3, replace=False)
+    dist = multi_source_distances(cg, sources)
+
+    add_travel_times(cg)
+    for mode in MODES:
+        times = multi_source_distances(cg, sources, weight=f"{mode}_time")
+        assert np.allclose(times, dist / MODES[mode]["speed_mps"], rtol=1e-5), mode
+
+    flat = cg.weights["bike_time"]
+    add_travel_times(cg, ["bike"], elevation=cg.y * 0.04)  # 4% grade to the north
+    u, v = cg.edge_sources(), cg.indices
+    reverse = pd.MultiIndex.from_arrays([u, v]).get_indexer(pd.MultiIndex.from_arrays([v, u]))
+    round_trip = cg.weights["bike_time"] + cg.weights["bike_time"][reverse]
+    assert (round_trip >= (flat + flat[reverse]) * (1 - 1e-6)).all()
+    return float((round_trip / (flat + flat[reverse])).max())
+
+
+def check_travel_direction(G=None, n_addresses: int = 20, seed: int = 0) -> float:
+    """
+    Searches from amenities measure address -> amenity trips: on a slope,
+    nearest-amenity times equal networkx path times from the address (not to
+    it) for the scenario engine and the k-nearest search. Returns how much
+    slower the uphill trip is than the downhill one for the first address.
+    """
+    G = synthetic_grid_graph() if G is None else G
+    cg = CompiledGraph.from_graph(G)
+    add_travel_times(cg, elevation=cg.y * 0.04)  # 4% grade to the north
+    with np.errstate(all="raise"):
+        bike_speed_factor(np.array([-0.2, -0.1, 0.0, 0.1]))  # no division by zero downhill
+
+    # the amenity in the top row, addresses below it: every trip goes uphill
+    amenity = int(np.argmax(cg.y))
+    rng = np.random.default_rng(seed)
+    addr_pos = rng.choice(np.flatnonzero(cg.y < cg.y[amenity] - 500), size=n_addresses, replace=False)
+    D = nx.DiGraph()
+    D.add_weighted_edges_from(zip(cg.edge_sources(), cg.indices, cg.weights["walk_time"].astype(np.float64)))
+    uphill = np.array([nx.dijkstra_path_length(D, a, amenity) for a in addr_pos])
+    downhill = np.array([nx.dijkstra_path_length(D, amenity, a) for a in addr_pos])
+    assert (uphill > downhill).all()
+
+    addresses = gpd.GeoDataFrame(
+        {"address_point_id": np.arange(n_addresses), "nearest_node": cg.node_ids[addr_pos]},
+        geometry=gpd.points_from_xy(cg.x[addr_pos], cg.y[addr_pos]), crs=CRS_PROJECTED,
+    )
+    amenities = gpd.GeoDataFrame(
+        geometry=gpd.points_from_xy(cg.x[[amenity]], cg.y[[amenity]]), crs=CRS_PROJECTED,
+        index=pd.MultiIndex.from_tuples([("node", 1)], names=["element", "osmid"]),
+    )
+    engine = ScenarioEngine(cg, addresses, {"shops": amenities}, weight="walk_time")
+    assert np.allclose(engine.baseline("shops")[0][addr_pos], uphill, rtol=1e-5)
+    node, dist, _ = k_nearest_sources(cg.reversed(), [amenity], [0], weight="walk_time")
+    assert np.allclose(dist[np.searchsorted(node, addr_pos)], uphill, rtol=1e-5)
+    return float(uphill[0] / downhill[0])
+
+
+def check_grouped_stats(n_values: int = 5000, n_groups: int = 40, seed: int = 0) -> int:
+    """
+    Grouped NumPy statistics equal pandas `groupby` means and quantiles, with
+    unreached (inf) values left out, groups without values NaN and negative
+    codes ignored.
+    """
+    rng = np.random.default_rng(seed)
+    group = rng.integers(-1, n_groups - 2, size=n_values)  # the last two groups stay empty
+    values = rng.exponential(500.0, size=n_values)
+    values[rng.random(n_values) < 0.1] = np.inf
+    values[group == 0] = np.inf  # a group with addresses but none reached
+    stats = grouped_stats(group, n_groups, values, thresholds=(400,), percentiles=(10, 50, 90))
+
+    frame = pd.DataFrame({"group": group, "value": values})[group >= 0]
+    reached = frame["value"].replace(np.inf, np.nan)
+    by_group = reached.groupby(frame["group"])
+    index = pd.RangeIndex(n_groups)
+    assert np.array_equal(stats["n"], frame.groupby("group").size().reindex(index, fill_value=0))
+    assert np.array_equal(stats["n_reached"], by_group.count().reindex(index, fill_value=0))
+    assert np.allclose(stats["mean"], by_group.mean().reindex(index), equal_nan=True)
+    for q in (10, 50, 90):
+        expected = by_group.quantile(q / 100).reindex(index)
+        assert np.allclose(stats[f"p{q}"], expected, equal_nan=True), q
+    within = (frame["value"] <= 400).groupby(frame["group"]).mean().reindex(index)
+    assert np.allclose(stats["share_within_400"], within, equal_nan=True)
+    return n_groups
+
+
+def check_contraction(n_rows: int = 30, street_nodes: int = 3, n_terminals: int = 300, seed: int = 0) -> float:
+    """
+    Dropping islands and collapsing chains keeps every terminal-to-terminal
+    distance, in every weight column, and removes most geometry-only nodes.
+    """
+    G = synthetic_grid_graph(n_rows, n_rows, seed=seed, street_nodes=street_nodes)
+    # a disconnected footpath and a one-way dead end
+    island = G.number_of_nodes()
+    G.add_node(island, x=-500.0, y=-500.0)
+    G.add_node(island + 1, x=-450.0, y=-500.0)
+    G.add_edge(island, island + 1, length=50.0)
+    G.add_edge(island + 1, island, length=50.0)
+    G.add_node(island + 2, x=-50.0, y=0.0)
+    G.add_edge(0, island + 2, length=50.0)
+
+    cg = CompiledGraph.from_graph(G)
+    add_travel_times(cg, elevation=cg.y * 0.03)
+    connected = drop_unreachable(cg)
+    assert connected.n_nodes == cg.n_nodes - 3
+    rng = np.random.default_rng(seed)
+    terminals = rng.choice(connected.n_nodes, size=n_terminals, replace=False)
+    reduced = collapse_chains(connected, terminals)
+    assert reduced.n_nodes < connected.n_nodes / 2
+    assert (reduced.positions(connected.node_ids[terminals]) >= 0).all()
+    worst = 0.0
+    for weight in reduced.weights:
+        diff = parity_check(connected, reduced, terminals, n_sources=5, weight=weight, seed=seed)
+        assert diff <= 1e-2, f"{weight} differs by {diff}"
+        worst = max(worst, diff)
+    return 1 - reduced.n_nodes / cg.n_nodes
+
+
+def check_walksheds(G=None, thresholds=(250.0, 500.0), buffer_m: float = 10.0, seed: int = 0) -> int:
+    """
+    Walkshed polygons contain every node within the threshold (networkx
+    cutoff search) and no node more than two buffer widths beyond it, grow
+    with the threshold, and are the same from the process pool. An amenity
+    on an isolated node gets empty walksheds, which are left out on write.
+    """
+    G = (G or synthetic_grid_graph(seed=seed)).copy()
+    isolated = max(G.nodes) + 1
+    G.add_node(isolated, x=-500.0, y=-500.0)
+    cg = CompiledGraph.from_graph(G)
+    edges = build_edge_table(G, cg)
+    rng = np.random.default_rng(seed)
+    sources = np.append(rng.choice(cg.n_nodes - 1, size=5, replace=False), cg.positions([isolated]))
+    group = np.array([0, 1, 1, 2, 2, 3])  # amenities 1 and 2 have two access points
+    polygons, n_edges = walksheds(cg, edges, group, sources, thresholds, buffer_m)
+    pooled, _ = walksheds(cg, edges, group, sources, thresholds, buffer_m, n_workers=2, chunk_size=1)
+    assert shapely.equals(polygons[:3], pooled[:3]).all() and shapely.is_empty(pooled[3]).all()
+    assert (np.diff(shapely.area(polygons[:3]), axis=1) > 0).all() and (np.diff(n_edges, axis=1) >= 0).all()
+    assert shapely.is_empty(polygons[3]).all() and (n_edges[3] == 0).all()
+
+    nodes = shapely.points(cg.x, cg.y)
+    for g in range(3):
+        origins = set(cg.node_ids[sources[group == g]])
+        dist = nx.multi_source_dijkstra_path_length(G, origins, weight="length")
+        d = np.array([dist.get(n, np.inf) for n in cg.node_ids])
+        for i, t in enumerate(thresholds):
+            inside = shapely.intersects(polygons[g, i], nodes)
+            assert inside[d <= t].all(), f"amenity {g}: a node within {t:g} m is outside"
+            assert not inside[d > t + 2 * buffer_m].any(), f"amenity {g}: a node beyond {t:g} m is inside"
+
+    table = gpd.GeoDataFrame(
+        {"amenity": np.repeat(np.arange(4), len(thresholds))}, geometry=polygons.ravel(), crs=CRS_PROJECTED
+    )
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "walksheds.geoparquet"
+        write_walksheds(table, path)
+        assert sorted(gpd.read_parquet(path)["amenity"].unique()) == [0, 1, 2]
+    return polygons.size
+
+
+def check_scenarios(G=None, n_addresses: int = 2000, n_amenities: int = 12, seed: int = 0) -> int:
+    """
+    Incremental what-if runs (add, remove, both) give the same per-address
+    distances as a full recomputation with the changed amenity set.
+    """
+    G = G or synthetic_grid_graph(seed=seed)
+    cg = CompiledGraph.from_graph(G)
+    rng = np.random.default_rng(seed)
+    xy = rng.uniform(0, 1900, (n_addresses + n_amenities + 4, 2))
+    addr_pos, _ = snap_to_nodes(cg, *xy[:n_addresses].T)
+    addresses = gpd.GeoDataFrame(
+        {"address_point_id": np.arange(n_addresses), "nearest_node": cg.node_ids[addr_pos]},
+        geometry=shapely.points(xy[:n_addresses]), crs=CRS_PROJECTED,
+    )
+    # amenity 0 has two access points
+    amenities = gpd.GeoDataFrame(
+        geometry=shapely.points(xy[n_addresses:n_addresses + n_amenities]), crs=CRS_PROJECTED,
+        index=pd.MultiIndex.from_arrays(
+            [["node"] * n_amenities, [0, *range(n_amenities - 1)]], names=["element", "osmid"]
+        ),
+    )
+    engine = ScenarioEngine(cg, addresses, {"shops": amenities})
+    before = engine.baseline("shops")[0][addr_pos]
+    osmid = amenities.index.get_level_values("osmid")
+    new_sites = shapely.points(xy[-4:])
+    n_changed = 0
+    for added, removed_ids in [(new_sites[:1], []), ([], [0]), (new_sites[1:], [3, 5])]:
+        # each removed amenity is picked by (a point at) one of its access points
+        first = np.unique(osmid, return_index=True)[1]
+        removed = amenities.geometry.values[first[removed_ids]]
+        diff = engine.run("shops", added=added, removed=removed)
+
+        kept = amenities[~osmid.isin(removed_ids)]
+        sources = np.concatenate([
+            snap_to_nodes(cg, kept.geometry.x.values, kept.geometry.y.values)[0],
+            snap_to_nodes(cg, shapely.get_x(added), shapely.get_y(added))[0],
+        ])
+        expected = nearest_source_distances(cg.reversed(), sources)[0][addr_pos]
+        changed = np.flatnonzero(~np.isclose(expected, before, rtol=0, atol=1e-6))
+        assert np.array_equal(diff.index.to_numpy(), changed)
+        assert np.allclose(diff["dist_shops_after_m"].to_numpy(), expected[changed])
+        n_changed += len(diff)
+    return n_changed
+
+
+def synthetic_stop_times(cg: CompiledGraph, n_cols: int, every: int = 3, headway_s: int = 600, seed: int = 0):
+    """
+    GTFS-style stop times for bus lines along every `every`-th row and column
+    of a `synthetic_grid_graph`, in both directions, 06:00-10:00. Lines share
+    stops where they cross, and some express trips overtake the local ones.
+    """
+    rng = np.random.default_rng(seed)
+    lines = []
+    for i in range(0, n_cols, every):
+        row = [i * n_cols + c for c in range(0, n_cols, every)]
+        col = [r * n_cols + i for r in range(0, n_cols, every)]
+        lines += [row, row[::-1], col, col[::-1]]
+
+    rows = []
+    for li, line in enumerate(lines):
+        pos = cg.positions(line)
+        hop_s = np.hypot(np.diff(cg.x[pos]), np.diff(cg.y[pos])) / 8.0 + 20
+        starts = range(6 * 3600 + int(rng.integers(headway_s)), 10 * 3600, headway_s)
+        for t, first in enumerate(starts):
+            # every third local trip is followed a minute later by an express
+            for kind, offset, speed in [("l", 0, 1.0), ("x", 60, 0.3)][: 1 + (t % 3 == 0)]:
+                arrival = first + offset + np.r_[0, np.cumsum(hop_s * speed)].astype(int) + 20 * np.arange(len(line))
+                for seq, (stop, a) in enumerate(zip(line, arrival)):
+                    rows.append((f"{li}-{t}{kind}", seq, str(stop), a, a + 10))
+    return pd.DataFrame(rows, columns=["trip_id", "stop_sequence", "stop_id", "arrival_s", "departure_s"])
+
+
+def _connection_scan(stop_times, stop_index, footpaths, origin, departure):
+    """Reference earliest arrival for one origin (connection scan, unlimited trips)."""
+    st = stop_times.sort_values(["trip_id", "stop_sequence"])
+    same_trip = st["trip_id"].to_numpy()[1:] == st["trip_id"].to_numpy()[:-1]
+    stops = stop_index.get_indexer(st["stop_id"])
+    c_from, c_to = stops[:-1][same_trip], stops[1:][same_trip]
+    c_dep, c_arr = st["departure_s"].to_numpy()[:-1][same_trip], st["arrival_s"].to_numpy()[1:][same_trip]
+    c_trip = st["trip_id"].to_numpy()[:-1][same_trip]
+
+    fp_from, fp_to, fp_s = footpaths
+    arrival = np.full(len(stop_index), np.iinfo(np.int64).max)
+    arrival[origin] = departure
+    walk = fp_from == origin
+    arrival[fp_to[walk]] = np.minimum(arrival[fp_to[walk]], departure + fp_s[walk])
+    boarded = set()
+    for c in np.lexsort((c_arr, c_dep)):
+        if c_trip[c] in boarded or arrival[c_from[c]] <= c_dep[c]:
+            boarded.add(c_trip[c])
+            if c_arr[c] < arrival[c_to[c]]:
+                arrival[c_to[c]] = c_arr[c]
+            walk = fp_from == c_to[c]
+            arrival[fp_to[walk]] = np.minimum(arrival[fp_to[walk]], c_arr[c] + fp_s[walk])
+    return arrival
+
+
+def check_raptor(n_cols: int = 16, departures=(7 * 3600, 8 * 3600 + 125), seed: int = 0) -> int:
+    """
+    Multi-origin RAPTOR (all stops at once) matches a connection scan per
+    origin, including overtaking trips and walking transfers.
+    """
+    G = synthetic_grid_graph(n_cols, n_cols, seed=seed)
+    cg = CompiledGraph.from_graph(G)
+    stop_times = synthetic_stop_times(cg, n_cols, seed=seed)
+    stop_ids = np.unique(stop_times["stop_id"])
+    stop_pos = cg.positions(stop_ids.astype(int))
+    footpaths = stop_footpaths(cg, stop_pos, max_m=350)
+    net = TransitNetwork.from_stop_times(stop_ids, stop_pos, stop_times, footpaths)
+    assert len(net.patterns) > 4 * len(range(0, n_cols, 3)), "express trips should split patterns"
+
+    stop_index = pd.Index(stop_ids)
+    for departure in departures:
+        labels = raptor(net, departure, max_rounds=20)
+        for origin in range(net.n_stops):
+            expected = _connection_scan(stop_times, stop_index, footpaths, origin, departure)
+            reached = labels[:, origin] < UNREACHED
+            assert np.array_equal(reached, expected < np.iinfo(np.int64).max), origin
+            assert np.array_equal(labels[reached, origin], expected[reached]), origin
+    return net.n_stops
+
+
+GTFS_WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+
+
+def check_gtfs_calendar() -> int:
+    """
+    Service ids follow calendar.txt weekday ranges plus calendar_dates.txt
+    exceptions (added and removed), and the representative date is the
+    busiest weekday, earliest on ties, never a weekend day. Returns the
+    number of dates checked.
+    """
+    calendar = pd.DataFrame(
+        [("WK", *[1] * 5, 0, 0, 20260302, 20260327), ("SAT", *[0] * 5, 1, 0, 20260302, 20260327)],
+        columns=["service_id", *GTFS_WEEKDAYS, "start_date", "end_date"],
+    )
+    calendar_dates = pd.DataFrame(
+        [
+            ("WK", 20260316, 2),  # holiday Monday: no weekday service...
+            ("SAT", 20260316, 1),  # ...but the Saturday one
+            ("EXTRA", 20260318, 1),  # an event service, only in calendar_dates
+            ("WK", 20260328, 1),  # one Saturday after the calendar range
+        ],
+        columns=["service_id", "date", "exception_type"],
+    )
+    expected = {
+        Date(2026, 3, 2): {"WK"},
+        Date(2026, 3, 7): {"SAT"},
+        Date(2026, 3, 8): set(),
+        Date(2026, 3, 16): {"SAT"},
+        Date(2026, 3, 18): {"WK", "EXTRA"},
+        Date(2026, 3, 28): {"WK"},
+        Date(2026, 4, 1): set(),
+    }
+    for day, services in expected.items():
+        assert active_service_ids(calendar, calendar_dates, day) == services, day
+    assert active_service_ids(None, calendar_dates, Date(2026, 3, 2)) == set()
+
+    # Saturdays run the most trips, but only weekdays are representative
+    trips = pd.DataFrame({"service_id": ["WK"] * 10 + ["SAT"] * 12 + ["EXTRA"] * 3})
+    assert representative_date(trips, calendar, calendar_dates) == Date(2026, 3, 18)
+    without_event = calendar_dates[calendar_dates["service_id"] != "EXTRA"]
+    assert representative_date(trips, calendar, without_event) == Date(2026, 3, 16)
+    assert representative_date(trips, calendar, None) == Date(2026, 3, 2)  # every weekday ties
+    assert representative_date(trips, None, calendar_dates) == Date(2026, 3, 16)
+    assert representative_date(trips, None, None) is None
+    return len(expected)
+
+
+def synthetic_gtfs(cg: CompiledGraph, stop_times: pd.DataFrame) -> io.BytesIO:
+    """In-memory GTFS zip for `synthetic_stop_times` on a projected graph, running on weekdays."""
+    stop_ids = np.unique(stop_times["stop_id"])
+    pos = cg.positions(stop_ids.astype(int))
+    stops = gpd.GeoSeries(shapely.points(cg.x[pos], cg.y[pos]), crs=CRS_PROJECTED).to_crs(CRS_LATLON)
+    lon, lat = stops.get_coordinates().to_numpy().T
+
+    def gtfs_time(seconds):
+        return [f"{s // 3600:02d}:{s // 60 % 60:02d}:{s % 60:02d}" for s in seconds]
+
+    trip_ids = stop_times["trip_id"].unique()
+    tables = {
+        "stops.txt": pd.DataFrame({"stop_id": stop_ids, "stop_lat": lat, "stop_lon": lon}),
+        "trips.txt": pd.DataFrame(
+            {"route_id": [t.split("-")[0] for t in trip_ids], "service_id": "WK", "trip_id": trip_ids}
+        ),
+        "stop_times.txt": pd.DataFrame({
+            "trip_id": stop_times["trip_id"],
+            "arrival_time": gtfs_time(stop_times["arrival_s"]),
+            "departure_time": gtfs_time(stop_times["departure_s"]),
+            "stop_id": stop_times["stop_id"],
+            "stop_sequence": stop_times["stop_sequence"],
+        }),
+        "calendar.txt": pd.DataFrame({
+            "service_id": ["WK"],
+            **{day: [int(i < 5)] for i, day in enumerate(GTFS_WEEKDAYS)},
+            "start_date": [20260302],
+            "end_date": [20260327],
+        }),
+    }
+    feed = io.BytesIO()
+    with zipfile.ZipFile(feed, "w") as archive:
+        for name, table in tables.items():
+            archive.writestr(name, table.to_csv(index=False))
+    return feed
+
+
+def check_transit_times(
+    n_cols: int = 12, n_addresses: int = 150, window=("07:00", "07:30"), seed: int = 0
+) -> int:
+    """
+    `transit_times_to_amenities` on an in-memory GTFS feed matches a direct
+    evaluation per address: RAPTOR from each of its nearest stops, leaving
+    once the walk to the stop, rounded up to the next `TRANSIT_SLACK_S`,
+    is done, then walking to the amenity, or walking all the way. Rounding
+    never gives earlier arrivals than exact walk times (`slack_s=1`).
+    Returns the number of addresses the rounding delays.
+    """
+    G = synthetic_study_graph(n_rows=n_cols, n_cols=n_cols, seed=seed)
+    cg = CompiledGraph.from_graph(G)
+    feed = synthetic_gtfs(cg, synthetic_stop_times(cg, n_cols, seed=seed))
+    x0, y0 = SYNTHETIC_ORIGIN
+    span = (n_cols - 1) * 100.0
+    area = shapely.box(x0 - 100, y0 - 100, x0 + span + 100, y0 + span + 100)
+    rng = np.random.default_rng(seed)
+    xy = rng.uniform([x0, y0], [x0 + span, y0 + span], (n_addresses, 2))
+    addresses = gpd.GeoDataFrame(
+        {"address_point_id": np.arange(n_addresses)}, geometry=shapely.points(xy), crs=CRS_PROJECTED
+    )
+    amenity_points = shapely.points([(x0 + 0.2 * span, y0 + 0.9 * span), (x0 + 0.9 * span, y0 + 0.3 * span)])
+    column = "transit_grocery_stores_min"
+
+    def run(slack_s):
+        with redirect_stdout(io.StringIO()):
+            return transit_times_to_amenities(
+                ["grocery_stores"], gtfs_path=feed, window=window, slack_s=slack_s
+            )
+
+    with (
+        tempfile.TemporaryDirectory() as directory,
+        synthetic_run(directory, G, addresses, amenity_points, area=area),
+    ):
+        rounded, exact = run(TRANSIT_SLACK_S), run(1)
+    with redirect_stdout(io.StringIO()):
+        net = load_gtfs(cg, feed)
+
+    def walk_seconds(dist):
+        return np.where(np.isfinite(dist), np.ceil(dist / WALK_SPEED_MPS), np.inf)
+
+    addr_pos, _ = snap_to_nodes(cg, *xy.T)
+    amen_pos, _ = snap_to_nodes(cg, shapely.get_x(amenity_points), shapely.get_y(amenity_points))
+    amen_dist = multi_source_distances(cg, amen_pos)
+    egress = amen_dist[net.stop_pos]
+    egress_s = walk_seconds(np.where(egress <= TRANSIT_ACCESS_MAX_M, egress, np.inf))
+    stop_dist = np.array([multi_source_distances(cg, [p])[addr_pos] for p in net.stop_pos])
+    departures = departure_times(window)
+    arrivals = {}
+
+    def arrival(stop, leave):
+        if (stop, leave) not in arrivals:
+            labels = raptor(net, int(leave), [stop])[:, 0].astype(np.float64)
+            arrivals[stop, leave] = (np.where(labels < UNREACHED, labels, np.inf) + egress_s).min()
+        return arrivals[stop, leave]
+
+    times = np.empty((n_addresses, len(departures)))
+    for i in range(n_addresses):
+        access = np.argsort(stop_dist[:, i], kind="stable")[:TRANSIT_ACCESS_STOPS]
+        access = access[stop_dist[access, i] <= TRANSIT_ACCESS_MAX_M]
+        offsets = -(-walk_seconds(stop_dist[access, i]) // TRANSIT_SLACK_S) * TRANSIT_SLACK_S
+        for d, departure in enumerate(departures):
+            by_transit = [arrival(s, departure + o) - departure for s, o in zip(access, offsets)]
+            times[i, d] = min([walk_seconds(amen_dist[addr_pos[i]]), *by_transit]) / 60
+    times[~np.isfinite(times)] = np.nan
+    assert np.allclose(rounded[column], np.median(times, axis=1), equal_nan=True)
+    assert np.allclose(rounded["transit_grocery_stores_max_min"], times.max(axis=1), equal_nan=True)
+
+    assert (np.median(times, axis=1) < walk_seconds(amen_dist[addr_pos]) / 60).any(), "no transit trips"
+
+    rounded, exact = rounded[column].fillna(np.inf), exact[column].fillna(np.inf)
+    assert (rounded >= exact).all()
+    delayed = int((rounded > exact).sum())
+    assert delayed > 0
+    return delayed
+
+
+def main():
+    print(f"✓ Backend parity: max abs diff {check_backend_parity():.4f} m")
+    print(f"✓ Graph cache: {check_graph_cache():,} edges round-trip through the cache")
+    print(f"✓ Cutoff search: {check_cutoff():,} nodes within 500 m")
+    print(f"✓ Snapping: max snap distance {check_snapping():.1f} m")
+    print(f"✓ Edge snapping: max abs diff {check_edge_snapping():.4f} m")
+    print(f"✓ K-nearest/counts: {check_k_nearest():,} labels in one pass")
+    print(f"✓ Parallel distances: {check_parallel_distances()} key searches match multi_source_distances")
+    print(f"✓ Tiled parity: {check_tiled_parity()} tiles match the untiled run")
+    print(f"✓ Regional: {check_regional()} addresses reach their nearest amenity across the border")
+    print(f"✓ End to end: {check_distances_end_to_end()} option combinations match the plain run")
+    print(f"✓ Access points: {check_access_points()} access points for 4 amenities")
+    print(f"✓ Amenity store: {check_amenity_store()} fetches, refreshed on a new study area")
+    print(f"✓ Streaming: {check_streaming()} features match read_file + to_crs")
+    print(f"✓ Sorted GeoParquet: exact bbox reads, {check_sorted_geoparquet()} row groups overlap the box")
+    print(f"✓ Gold layer: {check_gold_layer()} points agree across projected copy and coordinate cache")
+    print(f"✓ Manifest: {check_manifest()} incremental runs skip and rebuild the right stages")
+    print(f"✓ Parallel processors: {check_parallel_processors()} processors match the serial run")
+    print(f"✓ Travel-time weights: hills slow bike round trips by up to {check_travel_time_weights():.2f}x")
+    print(f"✓ Travel direction: uphill trips take {check_travel_direction():.2f}x the downhill time")
+    print(f"✓ Grouped stats: {check_grouped_stats()} groups match pandas means and quantiles")
+    print(f"✓ Contraction: {check_contraction():.0%} of nodes removed, terminal distances unchanged")
+    print(f"✓ Walksheds: {check_walksheds()} polygons match the networkx cutoff search")
+    print(f"✓ Scenarios: {check_scenarios():,} changed addresses match full recomputation")
+    print(f"✓ RAPTOR: {check_raptor()} origin stops match the connection scan")
+    print(f"✓ GTFS calendar: {check_gtfs_calendar()} service dates, busiest weekday picked")
+    print(f"✓ Transit times: slack rounding delays {check_transit_times()} addresses, never speeds one up")
+
+
+if __name__ == "__main__":
+    main()
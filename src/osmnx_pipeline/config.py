@@ -18,4 +18,60 @@ OSM_TAGS_HIGH = {
 # Paths to gold geometry files (absolute paths)
 ADDR_PATH = PROJECT_ROOT / "data" / "gold" / "geometries" / "address_points.geoparquet"
 COUNTY_BOUNDARY_PATH = PROJECT_ROOT / "data" / "gold" / "geometries" / "county_boundary.geoparquet"
-TRACTS_PATH = PROJECT_ROOT / "data" / "gold" / "geometries" / "census_tract_boundaries.geoparquet"
\ No newline at end of file
+TRACTS_PATH = PROJECT_ROOT / "data" / "gold" / "geometries" / "census_tract_boundaries.geoparquet"
+
+# Local amenity store (GeoParquet partitioned by amenity key) and an optional
+# offline OSM extract (.osm/.osm.bz2 XML, or .osm.pbf with pyrosm) to fill it from
+AMENITY_STORE_DIR = PROJECT_ROOT / "data" / "gold" / "amenities"
+OSM_EXTRACT_PATH = None
+
+# Polygon amenities smaller than this are reached through one representative
+# point; larger ones through the points where walkable edges cross their edge
+SMALL_AMENITY_AREA_M2 = 5_000
+
+# Tiled runs: tiles get a buffer of the max walk distance plus this margin so
+# that points near the buffer edge still snap to the same node as untiled
+TILE_SNAP_MARGIN_M = 500
+
+# Regional runs: each county's graph is built with this buffer so that paths
+# and amenities across county borders are kept when the graphs are merged
+COUNTY_BORDER_BUFFER_M = 3_000
+
+# Gold accessibility outputs
+ACCESSIBILITY_DIR = PROJECT_ROOT / "data" / "gold" / "accessibility"
+NODE_ACCESS_PATH = ACCESSIBILITY_DIR / "address_nodes_accessibility.geoparquet"
+ADDRESS_ACCESS_DIR = ACCESSIBILITY_DIR / "address_accessibility"  # partitioned by county
+TRACT_ACCESS_PATH = ACCESSIBILITY_DIR / "tract_accessibility.geoparquet"
+WALKSHED_PATH = ACCESSIBILITY_DIR / "amenity_walksheds.geoparquet"
+
+# On-disk caches for derived artifacts (graphs, snap tables, ...)
+CACHE_DIR = PROJECT_ROOT / "data" / "cache"
+GRAPH_CACHE_DIR = CACHE_DIR / "graphs"
+LAYER_CACHE_DIR = CACHE_DIR / "layers"  # projected gold-layer coordinates
+BASELINE_CACHE_DIR = CACHE_DIR / "baselines"  # nearest-amenity distances per node, for scenarios
+GRAPH_CACHE_VERSION = 2  # bump to invalidate every cached graph
+
+# Walk + transit travel times from a static GTFS feed (see transit.py)
+GTFS_PATH = PROJECT_ROOT / "data" / "bronze" / "transit" / "gtfs.zip"
+WALK_SPEED_MPS = 1.33  # ~4.8 km/h
+TRANSFER_MAX_M = 400  # longest walk between two stops when transferring
+TRANSIT_ACCESS_MAX_M = 800  # longest walk to the first stop or from the last one
+TRANSIT_ACCESS_STOPS = 3  # nearest stops considered for boarding per address
+TRANSIT_MAX_ROUNDS = 4  # vehicle trips per journey (3 transfers)
+TRANSIT_DEPARTURE_WINDOW = ("07:00", "09:00")
+TRANSIT_DEPARTURE_STEP_MIN = 15
+TRANSIT_SLACK_S = 180  # walk-to-stop times are rounded up to this step
+
+# Travel modes: OSMnx network type and speed on flat ground (see impedance.py)
+MODES = {
+    "walk": {"network_type": "walk", "speed_mps": WALK_SPEED_MPS},
+    "bike": {"network_type": "bike", "speed_mps": 4.5},  # ~16 km/h
+}
+# Optional local DEM raster (any CRS, meters) for slope penalties; needs rasterio
+DEM_PATH = None
+MAX_GRADE = 0.3  # grades are clipped to this, since DEM noise dominates on short edges
+
+# Amenity walksheds (see isochrones.py)
+WALKSHED_KEYS = ("schools", "grocery_stores", "bus_stops")
+WALKSHED_THRESHOLDS_M = (400, 800, 1600)
+WALKSHED_BUFFER_M = 50  # half-width of the band drawn around reached street segments
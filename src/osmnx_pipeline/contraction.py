@@ -0,0 +1,139 @@
+"""
+Routing-graph reduction before Dijkstra.
+
+Only snapped address and amenity nodes ("terminals") are ever read from a
+distance array, so everything else can go as long as distances between
+terminals are unchanged:
+
+- `drop_unreachable` keeps the largest strongly connected component (run it
+  before snapping, so no address snaps onto an island);
+- `collapse_chains` removes non-terminal nodes with at most two neighbours
+  (chain interiors and dead ends), adding a shortcut for each path through
+  them, in vectorized rounds over an independent set of such nodes.
+
+The reduced graph is an ordinary `CompiledGraph` (without a networkx graph),
+so the scipy searches, k-nearest labels and the process pool run on it
+unchanged.
+"""
+
+import numpy as np
+import pandas as pd
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import connected_components
+
+from .routing import CompiledGraph, multi_source_distances
+
+
+def _subgraph(cg: CompiledGraph, keep, u, v, weights) -> CompiledGraph:
+    """CompiledGraph on the nodes in `keep` from edge arrays in old positions."""
+    position = np.full(cg.n_nodes, -1, dtype=np.int64)
+    position[keep] = np.arange(int(np.sum(keep)))
+    inside = keep[u] & keep[v]
+    return CompiledGraph.from_edges(
+        cg.node_ids[keep], cg.x[keep], cg.y[keep], position[u[inside]], position[v[inside]],
+        {name: w[inside] for name, w in weights.items()},
+    )
+
+
+def drop_unreachable(cg: CompiledGraph) -> CompiledGraph:
+    """The largest strongly connected component: every kept node can reach every other."""
+    structure = csr_matrix((np.ones(cg.n_edges), cg.indices, cg.indptr), shape=(cg.n_nodes, cg.n_nodes))
+    _, labels = connected_components(structure, directed=True, connection="strong")
+    keep = labels == np.bincount(labels).argmax()
+    print(f"    → Dropped {cg.n_nodes - keep.sum():,} nodes outside the largest connected component")
+    return _subgraph(cg, keep, cg.edge_sources().astype(np.int64), cg.indices.astype(np.int64), cg.weights)
+
+
+def collapse_chains(cg: CompiledGraph, terminals, seed: int = 0) -> CompiledGraph:
+    """
+    Remove every non-terminal node with at most two distinct neighbours,
+    repeatedly, adding `p -> q` shortcuts for each `p -> node -> q` path
+    (weights summed per column). Distances between remaining nodes, in every
+    weight column, are unchanged.
+    """
+    n = cg.n_nodes
+    u, v = cg.edge_sources().astype(np.int64), cg.indices.astype(np.int64)
+    weights = {name: w.astype(np.float64) for name, w in cg.weights.items()}
+    protected = np.zeros(n, dtype=bool)
+    protected[np.asarray(terminals, dtype=np.int64)] = True
+    alive = np.ones(n, dtype=bool)
+    priority = np.random.default_rng(seed).permutation(n)
+
+    while True:
+        pairs = np.unique(np.minimum(u, v) * n + np.maximum(u, v))
+        a, b = pairs // n, pairs % n
+        loop = a == b
+        degree = np.bincount(a[~loop], minlength=n) + np.bincount(b[~loop], minlength=n)
+        candidate = alive & (degree <= 2) & ~protected
+        candidate[a[loop]] = False
+        # independent set: of two adjacent candidates, the higher priority waits
+        both = candidate[a] & candidate[b] & ~loop
+        chosen = candidate.copy()
+        chosen[np.where(priority[a[both]] < priority[b[both]], b[both], a[both])] = False
+        if not chosen.any():
+            break
+
+        into, out = chosen[v], chosen[u]  # no edge joins two chosen nodes
+        in_edge, out_edge = np.flatnonzero(into), np.flatnonzero(out)
+        paths = pd.DataFrame({"node": v[in_edge], "in_edge": in_edge}).merge(
+            pd.DataFrame({"node": u[out_edge], "out_edge": out_edge}), on="node"
+        )
+        first, second = paths["in_edge"].to_numpy(), paths["out_edge"].to_numpy()
+        through = u[first] != v[second]
+        first, second = first[through], second[through]
+
+        kept = ~(into | out)
+        u = np.concatenate([u[kept], u[first]])
+        v = np.concatenate([v[kept], v[second]])
+        weights = {
+            name: np.concatenate([w[kept], w[first] + w[second]]) for name, w in weights.items()
+        }
+        alive[chosen] = False
+
+    return _subgraph(cg, alive, u, v, weights)
+
+
+def parity_check(
+    full: CompiledGraph,
+    reduced: CompiledGraph,
+    terminals,
+    n_sources: int = 3,
+    weight: str = "length",
+    seed: int = 0,
+) -> float:
+    """
+    Max abs difference in distances between terminals on `full` vs `reduced`,
+    from `n_sources` random terminals (`terminals` are positions in `full`);
+    inf if the two graphs disagree on reachability.
+    """
+    terminals = np.asarray(terminals)
+    sources = np.random.default_rng(seed).choice(terminals, size=min(n_sources, len(terminals)), replace=False)
+    expected = multi_source_distances(full, sources, weight=weight)[terminals]
+    to_reduced = reduced.positions(full.node_ids)
+    actual = multi_source_distances(reduced, to_reduced[sources], weight=weight)[to_reduced[terminals]]
+    if not np.array_equal(np.isfinite(expected), np.isfinite(actual)):
+        return np.inf
+    finite = np.isfinite(expected)
+    return float(np.abs(actual[finite] - expected[finite]).max(initial=0.0))
+
+
+def contract_graph(cg: CompiledGraph, terminals, verify: bool = True, atol: float = 0.05) -> CompiledGraph:
+    """
+    `collapse_chains` with a one-line size report. With `verify`, distances
+    from a few terminals are compared on both graphs and a RuntimeError is
+    raised if they differ by more than `atol` (float32 rounding of summed
+    shortcut weights stays far below it).
+    """
+    reduced = collapse_chains(cg, terminals)
+    message = (
+        f"    → Contracted graph: {cg.n_nodes:,} → {reduced.n_nodes:,} nodes "
+        f"(-{1 - reduced.n_nodes / cg.n_nodes:.0%}), {cg.n_edges:,} → {reduced.n_edges:,} edges "
+        f"(-{1 - reduced.n_edges / max(cg.n_edges, 1):.0%})"
+    )
+    if verify:
+        diff = parity_check(cg, reduced, terminals)
+        if not diff <= atol:
+            raise RuntimeError(f"Contracted graph changes terminal distances (max abs diff {diff})")
+        message += f", parity max abs diff {diff:.4f}"
+    print(message)
+    return reduced
@@ -1,38 +1,284 @@
-import osmnx as ox
-import networkx as nx
+import time
+import numpy as np
+import pandas as pd
 import geopandas as gpd
-from .config import CRS_PROJECTED, ADDR_PATH
-from .network import build_walk_network
-from .amenities import fetch_amenities
-
-def distance_to_amenity(amenity_key: str) -> gpd.GeoDataFrame:
-    # load data
-    addresses = gpd.read_parquet(ADDR_PATH).to_crs(CRS_PROJECTED)
-    G = build_walk_network()
-    amenities = fetch_amenities(amenity_key)
-
-    # snap to nodes
-    addr_nodes = ox.nearest_nodes(
-        G,
-        addresses.geometry.x.values,
-        addresses.geometry.y.values,
-    )
-    amen_nodes = ox.nearest_nodes(
-        G,
-        amenities.geometry.x.values,
-        amenities.geometry.y.values,
-    )
-    addresses["nearest_node"] = addr_nodes
-    amenities["nearest_node"] = amen_nodes
+from .config import CRS_PROJECTED, MODES, NODE_ACCESS_PATH
+from .layers import ADDRESSES
+from .contraction import contract_graph, drop_unreachable
+from .impedance import add_travel_times
+from .network import build_network
+from .amenities import fetch_amenities, update_amenity_store
+from .parallel import parallel_node_distances
+from .regional import assign_counties, build_regional_network, regional_area, write_county_partitions
+from .routing import (
+    CompiledGraph,
+    k_nearest_sources,
+    multi_source_distances,
+    nearest_label_table,
+)
+from .snapping import (
+    build_edge_table,
+    edge_distances,
+    snap_addresses,
+    snap_to_edges,
+    snap_to_nodes,
+)
+
+NODE_TABLE_BASE_COLUMNS = ("node_id", "n_addresses", "geometry")
+
+
+def _finite_or_nan(values):
+    return np.where(np.isfinite(values), values, np.nan)
+
+
+def _metric_names(weight: str):
+    """Column prefix and unit: `dist_<key>_m` for length, `<weight>_<key>_s` for times."""
+    return ("dist", "m") if weight == "length" else (weight, "s")
+
+
+def distances_to_amenities(
+    amenity_keys,
+    backend: str = "scipy",
+    max_distance_m: float | None = None,
+    snap: str = "node",
+    k_nearest: int | None = None,
+    count_within_m=(),
+    write_node_table: bool = False,
+    n_workers: int | None = None,
+    counties=None,
+    mode: str = "walk",
+    weight: str = "length",
+    contract: bool = False,
+    write_partitions: bool = True,
+) -> gpd.GeoDataFrame:
+    """
+    Network distance from every address to the nearest amenity of each key.
+
+    Addresses, the walk graph and the address snapping are shared across all
+    keys; each key costs one amenity fetch and one multi-source Dijkstra pass
+    on the compiled graph (`backend="networkx"` runs the reference path).
+    Adds one `dist_<key>_m` column per key.
+
+    With `max_distance_m` the search stops at that walking distance; addresses
+    beyond it get NaN and `beyond_<key>_cutoff = True`.
+
+    `snap="edge"` projects addresses and amenities onto their nearest edge and
+    measures exact along-edge distances instead of snapping to nodes.
+
+    `k_nearest` and `count_within_m` switch to a single multi-label traversal
+    per key that also adds `nearest_<key>_element` and `nearest_<key>_id`
+    (OSM element type and id), `dist_<key>_k<i>_m` for the
+    2nd..k-th nearest amenities and `count_<key>_<t>m` for each threshold.
+
+    With node snapping, metrics are computed once per unique snapped node and
+    broadcast to addresses by integer index; `write_node_table` also saves
+    that node-level table (with `n_addresses` weights) to `NODE_ACCESS_PATH`.
+
+    `n_workers > 1` runs the per-key nearest-distance passes in a process
+    pool over memory-mapped graph arrays (node snapping only).
+
+    `counties` runs over the merged graph of those counties (see
+    `regional.build_regional_network`) with the amenities of the same
+    buffered area, so amenities across a county border count. Only the
+    addresses inside the counties are kept, with a `county_name` column;
+    with `write_partitions` the table is also saved partitioned by county
+    (see `regional.write_county_partitions`).
+
+    `mode` picks the network (see `config.MODES`) and `weight` any weight
+    column of the compiled graph: "length", or a travel time in seconds such
+    as "walk_time"/"bike_time" (see `impedance.add_travel_times`), in which
+    case columns are `<weight>_<key>_s` and `max_distance_m` is in seconds.
 
-    # multi-source dijkstra
-    dest_nodes = amenities["nearest_node"].unique().tolist()
-    lengths = nx.multi_source_dijkstra_path_length(
-        G, dest_nodes, weight="length"
+    `contract` routes on a reduced graph (see `contraction`): nodes outside
+    the largest connected component are dropped before snapping, then chains
+    and dead ends without a snapped address or amenity are collapsed, with a
+    size report and a distance parity check.
+    """
+    if snap not in ("node", "edge"):
+        raise ValueError(f"Unknown snap mode {snap!r}; expected 'node' or 'edge'")
+    multi_label = k_nearest is not None or len(count_within_m) > 0
+    if (multi_label or write_node_table) and snap != "node":
+        raise ValueError("k_nearest/count_within_m/write_node_table require snap='node'")
+    parallel = n_workers is not None and n_workers > 1
+    if parallel and (multi_label or snap != "node"):
+        raise ValueError("n_workers > 1 supports node-snapped nearest distances only")
+    if weight != "length" and (snap != "node" or backend != "scipy"):
+        raise ValueError("Travel-time weights need snap='node' and backend='scipy'")
+    if contract and (snap != "node" or backend != "scipy"):
+        raise ValueError("contract=True needs snap='node' and backend='scipy'")
+    prefix, unit = _metric_names(weight)
+    limit = np.inf if max_distance_m is None else float(max_distance_m)
+
+    # load data once: ids and cached projected coordinates only; the other
+    # address attributes are joined at the end (index = row in ADDR_PATH)
+    addresses = ADDRESSES.points()
+    area = None  # amenities of the study area
+    if counties is None:
+        G = build_network(mode)
+    else:
+        G = build_regional_network(counties, network_type=MODES[mode]["network_type"])
+        area = regional_area(counties)
+        addresses["county_name"] = assign_counties(addresses.geometry, counties)
+        addresses = addresses[addresses["county_name"].notna()]
+    cg = CompiledGraph.from_graph(G)
+    if weight.endswith("_time"):
+        add_travel_times(cg, [weight.removesuffix("_time")])
+    if weight not in cg.weights:
+        raise ValueError(f"Unknown weight {weight!r}; expected 'length' or '<mode>_time'")
+
+    edges = build_edge_table(G, cg)
+    cache_key = G.graph.get("cache_key")
+    if contract:
+        # before snapping, so that no address snaps onto an island
+        cg = drop_unreachable(cg)
+        cache_key = cache_key and f"{cache_key}-scc"
+
+    # snap addresses once (reused from disk while the graph cache key matches)
+    snaps = snap_addresses(addresses, cg, cache_key)
+    addresses["nearest_node"] = snaps["node_id"].to_numpy()
+    addresses["snap_distance_m"] = snaps["snap_distance_m"].to_numpy()
+    addr_pos = cg.positions(addresses["nearest_node"].values)
+    if snap == "edge":
+        addr_snap = snap_addresses(addresses, cg, cache_key, edges=edges)
+        addresses["snap_distance_m"] = addr_snap["snap_distance_m"].to_numpy()
+
+    # one row per unique snapped node; addresses join back through addr_row
+    nodes, addr_row = np.unique(addr_pos, return_inverse=True)
+    node_table = gpd.GeoDataFrame(
+        {"node_id": cg.node_ids[nodes], "n_addresses": np.bincount(addr_row)},
+        geometry=gpd.points_from_xy(cg.x[nodes], cg.y[nodes]),
+        crs=CRS_PROJECTED,
     )
 
-    col = f"dist_{amenity_key}_m"
-    addresses[col] = addresses["nearest_node"].map(lengths)
+    # one bulk fetch for any keys missing from the amenity store
+    update_amenity_store(amenity_keys, polygon=area)
+    amenities_by_key = {key: fetch_amenities(key, edges=edges, polygon=area) for key in amenity_keys}
+
+    if snap == "node":
+        sources_by_key = {
+            key: snap_to_nodes(cg, a.geometry.x.values, a.geometry.y.values)[0]
+            for key, a in amenities_by_key.items()
+            if not a.empty
+        }
+    if contract:
+        terminals = np.unique(np.concatenate([nodes, *sources_by_key.values()]))
+        reduced = contract_graph(cg, terminals)
+        nodes = reduced.positions(cg.node_ids[nodes])
+        sources_by_key = {key: reduced.positions(cg.node_ids[s]) for key, s in sources_by_key.items()}
+        cg = reduced
+
+    # searches start at the amenities, so they run on the reversed graph to
+    # measure address -> amenity trips (one-way streets, uphill vs downhill)
+    search = cg.reversed()
+
+    if parallel:
+        start = time.perf_counter()
+        precomputed = parallel_node_distances(
+            search, nodes, sources_by_key, limit=limit, n_workers=n_workers, weight=weight
+        )
+        print(
+            f"    → {len(sources_by_key)} keys on {n_workers} workers "
+            f"in {time.perf_counter() - start:.2f}s"
+        )
+
+    for amenity_key, amenities in amenities_by_key.items():
+        col = f"{prefix}_{amenity_key}_{unit}"
+        flag_col = f"beyond_{amenity_key}_cutoff"
+        target = addresses if snap == "edge" else node_table
+        target[col] = np.nan
+        if amenities.empty:
+            if max_distance_m is not None:
+                target[flag_col] = True
+            continue
+
+        # multi-source dijkstra, unreachable addresses stay NaN
+        start = time.perf_counter()
+        amen_x = amenities.geometry.x.values
+        amen_y = amenities.geometry.y.values
+        if snap == "edge":
+            amen_snap = snap_to_edges(edges, amen_x, amen_y)
+            dist, node_dist = edge_distances(cg, edges, addr_snap, amen_snap, limit)
+            n_settled = np.isfinite(node_dist).sum()
+        elif multi_label:
+            k = k_nearest or 1
+            amen_pos = sources_by_key[amenity_key]
+            # (element, osmid): a node and a way may share a numeric osmid
+            amen_codes, amen_ids = pd.factorize(amenities.index)
+            labels = k_nearest_sources(
+                search, amen_pos, amen_codes, k=k, limit=limit,
+                keep_within=max(count_within_m, default=0.0), weight=weight,
+            )
+            n_settled = len(np.unique(labels[0]))
+            dist_k, id_k, counts = nearest_label_table(
+                cg, *labels, k=k, count_within=count_within_m, nodes=nodes
+            )
+            dist = dist_k[:, 0]
+
+            nearest = id_k[:, 0]
+            found = nearest >= 0
+            element = np.full(len(nearest), None, dtype=object)
+            element[found] = amen_ids.get_level_values(0)[nearest[found]]
+            osmid = np.full(len(nearest), -1, dtype=np.int64)
+            osmid[found] = amen_ids.get_level_values(-1)[nearest[found]]
+            node_table[f"nearest_{amenity_key}_element"] = element
+            node_table[f"nearest_{amenity_key}_id"] = osmid
+            for i in range(1, k):
+                node_table[f"{prefix}_{amenity_key}_k{i + 1}_{unit}"] = _finite_or_nan(dist_k[:, i])
+            for t, c in zip(count_within_m, counts):
+                node_table[f"count_{amenity_key}_{t:g}{unit}"] = c
+        elif parallel:
+            dist, n_settled, worker_seconds = precomputed[amenity_key]
+        else:
+            amen_pos = sources_by_key[amenity_key]
+            node_dist = multi_source_distances(
+                search, amen_pos, weight=weight, backend=backend, limit=limit
+            )
+            n_settled = np.isfinite(node_dist).sum()
+            dist = node_dist[nodes]
+        elapsed = worker_seconds if parallel else time.perf_counter() - start
+        print(
+            f"    → {amenity_key}: settled {n_settled:,}/{cg.n_nodes:,} nodes "
+            f"({n_settled / cg.n_nodes:.1%}) in {elapsed:.2f}s"
+        )
+
+        target[col] = _finite_or_nan(dist)
+        if max_distance_m is not None:
+            target[flag_col] = ~np.isfinite(dist)
+
+    if snap == "node":
+        # broadcast node-level metrics to addresses with one integer-index join
+        for c in node_table.columns.drop(list(NODE_TABLE_BASE_COLUMNS)):
+            addresses[c] = node_table[c].to_numpy()[addr_row]
+
+    addresses = ADDRESSES.join_attributes(addresses)
+    if counties is not None and write_partitions:
+        write_county_partitions(addresses)
+
+    if write_node_table:
+        NODE_ACCESS_PATH.parent.mkdir(parents=True, exist_ok=True)
+        node_table.to_parquet(NODE_ACCESS_PATH, compression="snappy", index=False)
+        print(f"    → Saved node table: {NODE_ACCESS_PATH.name} ({len(node_table):,} nodes)")
+
     return addresses
 
 
+def distance_to_amenity(
+    amenity_key: str,
+    backend: str = "scipy",
+    max_distance_m: float | None = None,
+    snap: str = "node",
+    k_nearest: int | None = None,
+    count_within_m=(),
+    mode: str = "walk",
+    weight: str = "length",
+) -> gpd.GeoDataFrame:
+    return distances_to_amenities(
+        [amenity_key],
+        backend=backend,
+        max_distance_m=max_distance_m,
+        snap=snap,
+        k_nearest=k_nearest,
+        count_within_m=count_within_m,
+        mode=mode,
+        weight=weight,
+    )
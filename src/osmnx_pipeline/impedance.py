@@ -0,0 +1,89 @@
+"""
+Per-edge travel-time weights for the walk and bike modes.
+
+Times are computed once, vectorized over the compiled graph's edge arrays:
+edge length over the mode's flat-ground speed (`MODES`), adjusted by a
+slope factor when node elevations are available from a DEM. They are stored
+as an extra weight column, `<mode>_time` in seconds, next to `length`, so
+every routine that takes a `weight` name routes on time over the same CSR
+structure without touching the networkx edge attributes.
+"""
+
+import numpy as np
+from pyproj import CRS, Transformer
+
+from .config import CRS_PROJECTED, DEM_PATH, MAX_GRADE, MODES
+from .routing import CompiledGraph
+
+
+def node_elevations(cg: CompiledGraph, dem_path=DEM_PATH) -> np.ndarray:
+    """
+    DEM elevation (m) at every node, NaN outside the raster or on nodata.
+    The raster may be in any CRS; it is read once as a whole band.
+    """
+    import rasterio  # optional, only needed for slope penalties
+    from rasterio.transform import rowcol
+
+    with rasterio.open(dem_path) as src:
+        x, y = cg.x, cg.y
+        if src.crs is not None and not CRS.from_user_input(src.crs.to_wkt()).equals(CRS_PROJECTED):
+            x, y = Transformer.from_crs(CRS_PROJECTED, src.crs.to_wkt(), always_xy=True).transform(x, y)
+        rows, cols = (np.asarray(a) for a in rowcol(src.transform, x, y))
+        band = src.read(1, masked=True)
+
+    elevation = np.full(cg.n_nodes, np.nan)
+    inside = (rows >= 0) & (rows < band.shape[0]) & (cols >= 0) & (cols < band.shape[1])
+    values = band[rows[inside], cols[inside]]
+    elevation[inside] = np.ma.filled(values.astype(np.float64), np.nan)
+    return elevation
+
+
+def edge_grades(cg: CompiledGraph, elevation) -> np.ndarray:
+    """Rise over length of every edge, clipped to `MAX_GRADE`; 0 where an elevation is missing."""
+    rise = elevation[cg.indices] - elevation[cg.edge_sources()]
+    length = cg.weights["length"].astype(np.float64)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        grade = np.where(length > 0, rise / length, 0.0)
+    return np.clip(np.nan_to_num(grade, nan=0.0), -MAX_GRADE, MAX_GRADE)
+
+
+def walk_speed_factor(grade) -> np.ndarray:
+    """Tobler's hiking function relative to flat ground (fastest on a slight descent)."""
+    return np.exp(-3.5 * (np.abs(grade + 0.05) - 0.05))
+
+
+def bike_speed_factor(grade) -> np.ndarray:
+    """Climbs slow down in proportion to grade; descents speed up by at most 50%."""
+    grade = np.asarray(grade)
+    return np.where(grade > 0, 1 / (1 + 10 * np.maximum(grade, 0)), np.minimum(1 - 1.5 * grade, 1.5))
+
+
+SPEED_FACTORS = {"walk": walk_speed_factor, "bike": bike_speed_factor}
+
+
+def add_travel_times(cg: CompiledGraph, modes=None, dem_path=DEM_PATH, elevation=None) -> list[str]:
+    """
+    Add a `<mode>_time` weight (seconds) per mode (default: all of `MODES`)
+    and return the new weight names.
+
+    Slopes come from `elevation` (per node position) if given, else from
+    `dem_path` if set; without either, travel times are length over the
+    flat-ground speed.
+    """
+    modes = list(MODES) if modes is None else list(modes)
+    unknown = set(modes) - set(MODES)
+    if unknown:
+        raise ValueError(f"Unknown modes {sorted(unknown)}; expected some of {list(MODES)}")
+    if elevation is None and dem_path is not None:
+        elevation = node_elevations(cg, dem_path)
+    grade = None if elevation is None else edge_grades(cg, np.asarray(elevation, dtype=np.float64))
+
+    length = cg.weights["length"].astype(np.float64)
+    names = []
+    for mode in modes:
+        speed = MODES[mode]["speed_mps"]
+        if grade is not None:
+            speed = speed * SPEED_FACTORS[mode](grade)
+        cg.add_weight(f"{mode}_time", length / speed)
+        names.append(f"{mode}_time")
+    return names
@@ -0,0 +1,269 @@
+"""
+Walkshed polygons around amenities.
+
+Every amenity gets one bounded Dijkstra search (up to the largest
+threshold, from all of its access points) on the compiled graph. The
+reached part of each street segment is then cut out per threshold:
+segments reachable end to end are kept whole, the others are trimmed to
+the distance left at their reached end(s). The pieces are buffered in one
+vectorized `shapely.buffer` call (whole segments reuse a per-worker cache of
+buffered edges) and unioned per (amenity, threshold). This is several times
+faster than buffering each walkshed as one MultiLineString, which makes GEOS
+node the whole network.
+
+Amenities are processed in chunks; with `n_workers > 1` the chunks run in a
+process pool over memory-mapped graph and edge arrays (as in `parallel`).
+"""
+
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import shapely
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import dijkstra
+
+from medallion.geoparquet import write_sorted_geoparquet
+
+from .amenities import fetch_amenities, update_amenity_store
+from .config import (
+    CACHE_DIR,
+    CRS_PROJECTED,
+    WALKSHED_BUFFER_M,
+    WALKSHED_KEYS,
+    WALKSHED_PATH,
+    WALKSHED_THRESHOLDS_M,
+)
+from .network import build_network
+from .parallel import share_arrays
+from .routing import CompiledGraph
+from .snapping import build_edge_table, snap_to_nodes
+
+WALKSHED_CHUNK = 8  # amenities per task (one dense distance row per amenity)
+
+_shared = {}
+
+
+def line_prefixes(lines, distances) -> np.ndarray:
+    """The first `distances` (CRS units, > 0) of each line, vectorized over all lines."""
+    lines = np.asarray(lines, dtype=object)
+    if len(lines) == 0:
+        return lines
+    distances = np.asarray(distances, dtype=np.float64)
+    coords, line = shapely.get_coordinates(lines, return_index=True)
+    along = np.cumsum(np.r_[0.0, np.hypot(*np.diff(coords, axis=0).T)])
+    first = np.r_[True, line[1:] != line[:-1]]
+    along -= along[first][np.cumsum(first) - 1]
+    keep = along < distances[line]
+    ends = shapely.get_coordinates(shapely.line_interpolate_point(lines, distances))
+    line = np.concatenate([line[keep], np.arange(len(lines))])
+    order = np.argsort(line, kind="stable")  # kept vertices, then the cut point
+    return shapely.linestrings(np.concatenate([coords[keep], ends])[order], indices=line[order])
+
+
+def _attach(directory: str) -> None:
+    """Worker initializer: memory-map the graph and edge arrays, rebuild edge lines."""
+    arrays = {p.stem: np.load(p, mmap_mode="r") for p in Path(directory).glob("*.npy")}
+    n = len(arrays["indptr"]) - 1
+    _shared.update(arrays)
+    _shared["graph"] = csr_matrix(
+        (arrays["weights"], arrays["indices"], arrays["indptr"]), shape=(n, n), copy=False
+    )
+    _shared["lines"] = shapely.linestrings(arrays["coords"], indices=arrays["coord_line"])
+    _shared["scale"] = shapely.length(_shared["lines"]) / np.maximum(arrays["edge_length"], 1e-9)
+    _shared["buffered"] = {}
+
+
+def _buffered_edges(buffer_m: float) -> np.ndarray:
+    cache = _shared["buffered"]
+    if buffer_m not in cache:
+        cache[buffer_m] = shapely.buffer(_shared["lines"], buffer_m)
+    return cache[buffer_m]
+
+
+def _chunk_walksheds(task):
+    """Walkshed polygons for one chunk: `(n_amenities, n_thresholds)` geometries and edge counts."""
+    group, sources, thresholds, buffer_m = task
+    u, v = _shared["edge_u"], _shared["edge_v"]
+    length, twoway = _shared["edge_length"], _shared["edge_twoway"]
+    lines, scale = _shared["lines"], _shared["scale"]
+
+    # sources are sorted by amenity: one multi-source search (and row) per amenity
+    starts = np.flatnonzero(np.r_[True, group[1:] != group[:-1]])
+    dist = np.stack([
+        dijkstra(_shared["graph"], directed=True, indices=s, min_only=True, limit=max(thresholds))
+        for s in np.split(sources, starts[1:])
+    ])
+    n_groups, n_thresholds = len(starts), len(thresholds)
+
+    row, edge = np.nonzero(np.isfinite(dist[:, u]) | (twoway & np.isfinite(dist[:, v])))
+    d_u, d_v = dist[row, u[edge]], dist[row, v[edge]]
+    lines, edge_length, tw = lines[edge], length[edge], twoway[edge]
+    buffered = _buffered_edges(buffer_m)[edge]
+
+    parts, labels = [], []
+    for i, t in enumerate(thresholds):
+        reached = (d_u <= t) | (tw & (d_v <= t))
+        # length covered from each end (one-way edges are only walked from u)
+        from_u = np.where(d_u <= t, np.minimum(t - d_u, edge_length), 0.0)
+        from_v = np.where(tw & (d_v <= t), np.minimum(t - d_v, edge_length), 0.0)
+        whole = reached & (from_u + from_v >= edge_length)
+        head = reached & ~whole & (from_u > 0)
+        tail = reached & ~whole & (from_v > 0)
+        label = row * n_thresholds + i
+        cut = np.concatenate([
+            line_prefixes(lines[head], from_u[head] * scale[edge[head]]),
+            line_prefixes(shapely.reverse(lines[tail]), from_v[tail] * scale[edge[tail]]),
+        ])
+        parts += [buffered[whole], shapely.buffer(cut, buffer_m)]
+        labels += [label[whole], label[head], label[tail]]
+
+    parts, labels = np.concatenate(parts), np.concatenate(labels)
+    order = np.argsort(labels, kind="stable")
+    present, first = np.unique(labels[order], return_index=True)
+    polygons = np.full(n_groups * n_thresholds, shapely.Polygon(), dtype=object)
+    polygons[present] = [shapely.union_all(p) for p in np.split(parts[order], first[1:])]
+    n_edges = np.bincount(labels, minlength=n_groups * n_thresholds)
+    return (
+        polygons.reshape(n_groups, n_thresholds),
+        n_edges.reshape(n_groups, n_thresholds),
+    )
+
+
+def walksheds(
+    cg: CompiledGraph,
+    edges: gpd.GeoDataFrame,
+    group,
+    sources,
+    thresholds_m=WALKSHED_THRESHOLDS_M,
+    buffer_m: float = WALKSHED_BUFFER_M,
+    n_workers: int | None = None,
+    chunk_size: int = WALKSHED_CHUNK,
+    weight: str = "length",
+):
+    """
+    Walkshed polygons of `n_groups = group.max() + 1` amenities.
+
+    `sources` are graph positions and `group[i]` the amenity (0..n_groups-1)
+    of `sources[i]`; every amenity needs at least one source. `edges` is the
+    `snapping.build_edge_table` of the same graph. Returns
+    `(polygons, n_edges)`, both `(n_groups, len(thresholds_m))`; `n_edges`
+    counts the whole or partial segments in each walkshed.
+    """
+    thresholds = tuple(float(t) for t in thresholds_m)
+    pairs = np.unique(np.column_stack([group, sources]).astype(np.int64), axis=0)
+    group, sources = pairs[:, 0], pairs[:, 1].astype(np.int32)
+    n_groups = int(group.max()) + 1 if len(group) else 0
+    bounds = np.searchsorted(group, np.arange(0, n_groups + chunk_size, chunk_size).clip(max=n_groups))
+    tasks = [
+        (group[a:b], sources[a:b], thresholds, buffer_m)
+        for a, b in zip(bounds[:-1], bounds[1:])
+        if b > a
+    ]
+
+    coords, coord_line = shapely.get_coordinates(edges.geometry.values, return_index=True)
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=CACHE_DIR, prefix="shared-") as directory:
+        share_arrays(
+            Path(directory),
+            indptr=cg.indptr,
+            indices=cg.indices,
+            weights=cg.weights[weight].astype(np.float64),
+            edge_u=edges["u_pos"].to_numpy(np.int64),
+            edge_v=edges["v_pos"].to_numpy(np.int64),
+            edge_length=edges["length"].to_numpy(np.float64),
+            edge_twoway=edges["twoway"].to_numpy(bool),
+            coords=coords,
+            coord_line=coord_line,
+        )
+        if n_workers is None or n_workers <= 1:
+            _attach(directory)
+            results = [_chunk_walksheds(task) for task in tasks]
+            _shared.clear()  # drop the maps before the directory goes
+        else:
+            with ProcessPoolExecutor(
+                max_workers=n_workers, initializer=_attach, initargs=(directory,)
+            ) as pool:
+                results = list(pool.map(_chunk_walksheds, tasks))
+
+    n_thresholds = len(thresholds)
+    if not results:
+        return np.empty((0, n_thresholds), dtype=object), np.empty((0, n_thresholds), dtype=np.int64)
+    return np.concatenate([r[0] for r in results]), np.concatenate([r[1] for r in results])
+
+
+def amenity_walksheds(
+    amenity_keys=WALKSHED_KEYS,
+    thresholds_m=WALKSHED_THRESHOLDS_M,
+    buffer_m: float = WALKSHED_BUFFER_M,
+    mode: str = "walk",
+    n_workers: int | None = None,
+    write: bool = True,
+) -> gpd.GeoDataFrame:
+    """
+    Walkshed polygon per amenity of each key and per threshold, on the
+    cached `mode` network.
+
+    One row per (`amenity_key`, `element`, `osmid`, `threshold_m`), with
+    `n_edges`, `area_m2` and the projected polygon (empty if the amenity
+    reaches no street). Polygon amenities search from all of their access
+    points. With `write`, the table is saved with `write_walksheds`.
+    """
+    G = build_network(mode)
+    cg = CompiledGraph.from_graph(G)
+    edges = build_edge_table(G, cg)
+    update_amenity_store(amenity_keys)
+
+    frames, sources, group = [], [], []
+    for key in amenity_keys:
+        amenities = fetch_amenities(key, edges=edges)
+        if amenities.empty:
+            continue
+        codes, ids = pd.factorize(amenities.index)
+        pos, _ = snap_to_nodes(cg, amenities.geometry.x.values, amenities.geometry.y.values)
+        offset = sum(len(f) for f in frames)
+        frame = pd.MultiIndex.from_tuples(ids, names=amenities.index.names).to_frame(index=False)
+        frame.insert(0, "amenity_key", key)
+        frames.append(frame)
+        sources.append(pos)
+        group.append(codes + offset)
+    if not frames:
+        raise ValueError(f"No amenities found for {list(amenity_keys)}")
+    table = pd.concat(frames, ignore_index=True)
+
+    start = time.perf_counter()
+    polygons, n_edges = walksheds(
+        cg, edges, np.concatenate(group), np.concatenate(sources),
+        thresholds_m=thresholds_m, buffer_m=buffer_m, n_workers=n_workers,
+    )
+    print(
+        f"    → {len(table):,} amenities × {len(thresholds_m)} thresholds "
+        f"in {time.perf_counter() - start:.2f}s"
+    )
+
+    result = table.loc[table.index.repeat(len(thresholds_m))].reset_index(drop=True)
+    result["threshold_m"] = np.tile(np.asarray(thresholds_m), len(table))
+    result["n_edges"] = n_edges.ravel()
+    result = gpd.GeoDataFrame(result, geometry=polygons.ravel(), crs=CRS_PROJECTED)
+    result["area_m2"] = result.area
+
+    if write:
+        write_walksheds(result)
+    return result
+
+
+def write_walksheds(result: gpd.GeoDataFrame, path=WALKSHED_PATH) -> None:
+    """
+    Save walkshed polygons Hilbert-sorted, without the empty ones (amenities
+    that reach no street within a threshold), which cannot be sorted.
+    """
+    empty = result.geometry.is_empty.to_numpy()
+    if empty.any():
+        print(f"    → Skipped {empty.sum():,} empty walksheds (amenities that reach no street)")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    write_sorted_geoparquet(result[~empty], path)
+    print(f"    → Saved walksheds: {path.name} ({(~empty).sum():,} polygons)")
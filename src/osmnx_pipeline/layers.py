@@ -0,0 +1,148 @@
+"""
+Lazy, column-projected access to the gold geometry layers.
+
+Routing only needs ids and projected coordinates, so a `GoldLayer` handle
+reads nothing until asked and then reads only the columns it needs. The
+gold stage also writes a `CRS_PROJECTED` copy of each layer
+(`<name>_epsg26910.geoparquet`, same row order); when it is present and
+up to date it is read instead, so no CRS transform runs at all. Point
+coordinates are additionally cached as float64 arrays, in memory and on
+disk (keyed on the source file's size and mtime), so later runs also skip
+the geometry decode. The full attribute table is only read by
+`join_attributes` when results are assembled.
+"""
+
+import hashlib
+import json
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+import shapely
+from pyproj import CRS, Transformer
+
+from medallion.geoparquet import projected_variant
+
+from .config import ADDR_PATH, COUNTY_BOUNDARY_PATH, CRS_PROJECTED, LAYER_CACHE_DIR, TRACTS_PATH
+
+
+class GoldLayer:
+    """Handle on one gold GeoParquet file; nothing is read on construction."""
+
+    def __init__(self, path, id_column: str | None = None, cache_dir=LAYER_CACHE_DIR):
+        self.path = path
+        self.id_column = id_column
+        self.cache_dir = cache_dir
+        self._geo = None
+        self._coords = None
+
+    def _geo_metadata(self) -> dict:
+        if self._geo is None:
+            self._geo = json.loads(pq.read_metadata(self.path).metadata[b"geo"])
+        return self._geo
+
+    @property
+    def projected_path(self):
+        """The gold stage's `CRS_PROJECTED` copy of this layer, if it is current."""
+        path = projected_variant(self.path, CRS_PROJECTED)
+        if path.exists() and path.stat().st_mtime_ns >= self.path.stat().st_mtime_ns:
+            return path
+        return None
+
+    @property
+    def geometry_column(self) -> str:
+        return self._geo_metadata()["primary_column"]
+
+    @property
+    def crs(self) -> CRS:
+        crs = self._geo_metadata()["columns"][self.geometry_column].get("crs", "OGC:CRS84")
+        return CRS.from_user_input(crs)
+
+    @property
+    def columns(self) -> list[str]:
+        """Data columns in file order (from the schema; covering columns excluded)."""
+        covering = self._geo_metadata()["columns"][self.geometry_column].get("covering", {})
+        hidden = {part[0] for part in covering.get("bbox", {}).values()}
+        return [c for c in pq.read_schema(self.path).names if c not in hidden]
+
+    def read(self, columns=None, crs=CRS_PROJECTED) -> gpd.GeoDataFrame:
+        """Only `columns` (plus the geometry), in `crs` (from the projected copy if possible)."""
+        if columns is not None and self.geometry_column not in columns:
+            columns = [*columns, self.geometry_column]
+        path = self.path
+        if crs is not None and CRS.from_user_input(crs).equals(CRS_PROJECTED) and self.projected_path:
+            path = self.projected_path
+        gdf = gpd.read_parquet(path, columns=columns)
+        if crs is None or gdf.crs.equals(crs):
+            return gdf
+        return gdf.to_crs(crs)
+
+    def _coords_cache_path(self, source):
+        stat = source.stat()
+        key = hashlib.sha256(
+            f"{source.resolve()}|{stat.st_size}|{stat.st_mtime_ns}|{CRS_PROJECTED}".encode()
+        ).hexdigest()[:16]
+        return self.cache_dir / f"{self.path.stem}_{key}.npz"
+
+    def coords(self):
+        """`(ids, x, y)` of a point layer in `CRS_PROJECTED`, as NumPy arrays."""
+        if self._coords is not None:
+            return self._coords
+
+        source = self.projected_path or self.path
+        cache_path = self._coords_cache_path(source)
+        if cache_path.exists():
+            with np.load(cache_path, allow_pickle=False) as cached:
+                self._coords = cached["ids"], cached["x"], cached["y"]
+            return self._coords
+
+        table = pq.read_table(source, columns=[self.id_column, self.geometry_column])
+        ids = table[self.id_column].to_numpy(zero_copy_only=False)
+        if ids.dtype == object:
+            ids = ids.astype(str)  # stored without pickling
+        points = shapely.from_wkb(table[self.geometry_column].to_numpy(zero_copy_only=False))
+        x, y = shapely.get_x(points), shapely.get_y(points)
+        if source == self.path and not self.crs.equals(CRS_PROJECTED):
+            transformer = Transformer.from_crs(self.crs, CRS_PROJECTED, always_xy=True)
+            x, y = transformer.transform(x, y)
+        self._coords = ids, np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64)
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        for stale in self.cache_dir.glob(f"{self.path.stem}_*.npz"):
+            stale.unlink()
+        tmp = cache_path.with_name(cache_path.stem + ".tmp.npz")
+        np.savez(tmp, ids=ids, x=self._coords[1], y=self._coords[2])
+        tmp.replace(cache_path)
+        return self._coords
+
+    def points(self) -> gpd.GeoDataFrame:
+        """Id column plus projected point geometry, built from the cached coordinates."""
+        ids, x, y = self.coords()
+        return gpd.GeoDataFrame(
+            {self.id_column: ids}, geometry=gpd.points_from_xy(x, y), crs=CRS_PROJECTED
+        )
+
+    def join_attributes(self, frame: pd.DataFrame, columns=None) -> gpd.GeoDataFrame:
+        """
+        Add the layer's attribute columns to `frame`, whose index holds file
+        row positions (as returned by `points`, possibly filtered). Columns
+        already in `frame` are kept from `frame`; file columns come first.
+        """
+        columns = self.columns if columns is None else columns
+        missing = [c for c in columns if c not in frame.columns and c != self.geometry_column]
+        if not missing:
+            return frame
+        rows = frame.index.to_numpy()
+        # same file the coordinates came from, so rows line up
+        source = self.projected_path or self.path
+        attributes = pd.read_parquet(source, columns=missing).iloc[rows].set_index(frame.index)
+        joined = pd.concat([attributes, frame], axis=1)
+        ordered = [c for c in self.columns if c in joined.columns]
+        ordered += [c for c in joined.columns if c not in ordered]
+        return gpd.GeoDataFrame(joined[ordered], geometry=self.geometry_column, crs=frame.crs)
+
+
+ADDRESSES = GoldLayer(ADDR_PATH, id_column="address_point_id")
+TRACTS = GoldLayer(TRACTS_PATH, id_column="tract_id")
+COUNTIES = GoldLayer(COUNTY_BOUNDARY_PATH, id_column="county_name")
@@ -1,14 +1,80 @@
+from functools import lru_cache
+
 import osmnx as ox
 import geopandas as gpd
-from .config import CRS_LATLON, CRS_PROJECTED, COUNTY_BOUNDARY_PATH
+from .config import CRS_LATLON, CRS_PROJECTED, COUNTY_BOUNDARY_PATH, MODES
+from .cache import graph_cache_key, has_cached_graph, load_cached_graph, save_graph
+from .layers import COUNTIES
+
+@lru_cache(maxsize=8)
+def _county_boundaries(crs, mtime_ns: int) -> gpd.GeoDataFrame:
+    # keyed on the file's mtime so a rebuilt gold layer is picked up
+    return COUNTIES.read(crs=crs)
+
+def load_county_areas(counties=None, crs=CRS_LATLON) -> gpd.GeoDataFrame:
+    """County boundaries in `crs`, optionally limited to `counties` (names)."""
+    boundary = _county_boundaries(crs, COUNTY_BOUNDARY_PATH.stat().st_mtime_ns)
+    if counties is not None:
+        missing = set(counties) - set(boundary["county_name"])
+        if missing:
+            raise ValueError(f"Counties not in {COUNTY_BOUNDARY_PATH.name}: {sorted(missing)}")
+        boundary = boundary[boundary["county_name"].isin(counties)]
+    return boundary.copy()
+
+@lru_cache(maxsize=16)
+def _study_area(counties, crs, mtime_ns: int):
+    boundary = load_county_areas(None if counties is None else list(counties), crs)
+    if len(boundary) == 1:
+        return boundary.geometry.iloc[0]
+    return boundary.geometry.union_all()
 
-def load_study_area():
-    boundary = gpd.read_parquet(COUNTY_BOUNDARY_PATH)
-    boundary_ll = boundary.to_crs(CRS_LATLON)
-    return boundary_ll.geometry.iloc[0]
+def load_study_area(counties=None, crs=CRS_LATLON):
+    """
+    Study-area polygon (the union of the selected counties) in `crs`,
+    read and unioned once per process.
+    """
+    key = None if counties is None else tuple(sorted(counties))
+    return _study_area(key, crs, COUNTY_BOUNDARY_PATH.stat().st_mtime_ns)
 
-def build_walk_network():
-    poly_ll = load_study_area()
-    G = ox.graph_from_polygon(poly_ll, network_type="walk")
+def build_walk_network(
+    network_type: str = "walk",
+    use_cache: bool = True,
+    refresh: bool = False,
+    offline: bool = False,
+    polygon=None,
+):
+    """
+    Build (or reload from the graph cache) the projected study-area network.
+
+    `polygon` (lat/lon) overrides the study area, e.g. for one tile.
+    `refresh` rebuilds and overwrites the cache entry; `offline` never touches
+    the network and raises if no cache entry exists.
+    """
+    poly_ll = load_study_area() if polygon is None else polygon
+    key = graph_cache_key(poly_ll, network_type, CRS_PROJECTED)
+
+    if use_cache and not refresh and has_cached_graph(key):
+        return load_cached_graph(key)
+    if offline:
+        raise FileNotFoundError(
+            f"No cached {network_type} graph for this study area (key {key}) and offline=True"
+        )
+
+    G = ox.graph_from_polygon(poly_ll, network_type=network_type)
     G_proj = ox.project_graph(G, to_crs=CRS_PROJECTED)
-    return G_proj
\ No newline at end of file
+    G_proj.graph["cache_key"] = key
+    G_proj.graph["network_type"] = network_type
+    if use_cache:
+        save_graph(G_proj, key, network_type)
+    return G_proj
+
+def build_network(mode: str = "walk", **kwargs):
+    """
+    `build_walk_network` for a travel mode in `MODES` (e.g. "bike"); each
+    mode's OSMnx network type is cached separately.
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unknown mode {mode!r}; expected one of {list(MODES)}")
+    G = build_walk_network(network_type=MODES[mode]["network_type"], **kwargs)
+    G.graph["mode"] = mode
+    return G
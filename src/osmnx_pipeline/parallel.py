@@ -0,0 +1,84 @@
+"""
+Process-pool execution of per-amenity shortest paths.
+
+The compiled graph arrays and the snapped address-node array are written
+once to memory-mapped .npy files; workers attach to them read-only, so no
+networkx graph is pickled and the OS shares the pages between processes.
+Each task computes one amenity key's distances.
+"""
+
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import dijkstra
+
+from .config import CACHE_DIR
+from .routing import CompiledGraph
+
+_shared = {}
+
+
+def share_arrays(directory: Path, **arrays) -> None:
+    for name, values in arrays.items():
+        np.save(directory / f"{name}.npy", values)
+
+
+def _attach(directory: str) -> None:
+    """Worker initializer: memory-map the shared arrays."""
+    directory = Path(directory)
+    arrays = {p.stem: np.load(p, mmap_mode="r") for p in directory.glob("*.npy")}
+    n = len(arrays["indptr"]) - 1
+    # float64 weights let scipy use the mapped arrays without converting them
+    _shared["graph"] = csr_matrix(
+        (arrays["weights"], arrays["indices"], arrays["indptr"]), shape=(n, n), copy=False
+    )
+    _shared["nodes"] = arrays["nodes"]
+
+
+def _node_distances(task):
+    key, sources, limit = task
+    start = time.perf_counter()
+    if len(sources) == 0:
+        return key, np.full(len(_shared["nodes"]), np.inf), 0, 0.0
+    dist = dijkstra(
+        _shared["graph"], directed=True, indices=sources, min_only=True, limit=limit
+    )
+    n_settled = int(np.isfinite(dist).sum())
+    return key, dist[_shared["nodes"]], n_settled, time.perf_counter() - start
+
+
+def parallel_node_distances(
+    cg: CompiledGraph,
+    nodes,
+    sources_by_key: dict,
+    limit: float = np.inf,
+    n_workers: int = 2,
+    weight: str = "length",
+) -> dict:
+    """
+    Nearest-source distance at `nodes` for each key's source positions.
+
+    Returns `{key: (dist_at_nodes, n_settled, seconds)}`.
+    """
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=CACHE_DIR, prefix="shared-") as directory:
+        share_arrays(
+            Path(directory),
+            indptr=cg.indptr,
+            indices=cg.indices,
+            weights=cg.weights[weight].astype(np.float64),
+            nodes=np.asarray(nodes, dtype=np.int64),
+        )
+        tasks = [
+            (key, np.unique(np.asarray(sources, dtype=np.int32)), limit)
+            for key, sources in sources_by_key.items()
+        ]
+        with ProcessPoolExecutor(
+            max_workers=n_workers, initializer=_attach, initargs=(directory,)
+        ) as pool:
+            results = list(pool.map(_node_distances, tasks))
+    return {key: (dist, n_settled, seconds) for key, dist, n_settled, seconds in results}
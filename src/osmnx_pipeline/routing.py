@@ -0,0 +1,296 @@
+"""
+Compiled CSR graph and multi-source shortest-path backends.
+
+`CompiledGraph` converts a projected MultiDiGraph once into CSR arrays
+(int32 indices, float32 weights) so that repeated shortest-path queries run in
+compiled code and return NumPy arrays indexed by node position instead of
+Python dicts keyed by OSM id.
+"""
+
+import heapq
+
+import networkx as nx
+import numpy as np
+import pandas as pd
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import dijkstra
+from scipy.spatial import cKDTree
+
+BACKENDS = ("scipy", "networkx")
+
+
+class CompiledGraph:
+    """
+    CSR arrays for a directed graph, addressed by node position.
+
+    `node_ids[i]` is the original node id of position `i`. Parallel edges are
+    collapsed to the smallest weight, since scipy would otherwise sum them.
+    """
+
+    def __init__(self, node_ids, x, y, indptr, indices, weights, graph=None):
+        self.node_ids = node_ids
+        self.x = x
+        self.y = y
+        self.indptr = indptr
+        self.indices = indices
+        self.weights = weights
+        self.graph = graph
+        self._index = pd.Index(node_ids)
+        self._csr = {}
+        self._tree = None
+        self._reversed = None
+
+    @classmethod
+    def from_graph(cls, G: nx.MultiDiGraph, weight: str = "length") -> "CompiledGraph":
+        node_ids = np.asarray(list(G.nodes))
+        x = np.array([d.get("x", np.nan) for _, d in G.nodes(data=True)], dtype=np.float64)
+        y = np.array([d.get("y", np.nan) for _, d in G.nodes(data=True)], dtype=np.float64)
+
+        index = pd.Index(node_ids)
+        edges = list(G.edges(data=weight, default=np.nan))
+        u = index.get_indexer([e[0] for e in edges])
+        v = index.get_indexer([e[1] for e in edges])
+        w = np.array([e[2] for e in edges], dtype=np.float32)
+
+        return cls.from_edges(node_ids, x, y, u, v, {weight: w}, graph=G)
+
+    @classmethod
+    def from_edges(cls, node_ids, x, y, u, v, weights: dict, graph=None) -> "CompiledGraph":
+        """
+        CSR arrays from `u -> v` edge arrays (node positions) with one array
+        per weight column; parallel edges keep the smallest value per column.
+        """
+        u, v = np.asarray(u, dtype=np.int64), np.asarray(v, dtype=np.int64)
+        order = np.lexsort((v, u))
+        u, v = u[order], v[order]
+        # first edge of each (u, v) run; fmin also skips missing (NaN) weights
+        first = np.flatnonzero(np.diff(u, prepend=-1) | np.diff(v, prepend=-1))
+        weights = {
+            name: np.fmin.reduceat(np.asarray(w, dtype=np.float32)[order], first)
+            for name, w in weights.items()
+        } if len(first) else {name: np.empty(0, dtype=np.float32) for name in weights}
+        u, v = u[first], v[first]
+
+        indptr = np.zeros(len(node_ids) + 1, dtype=np.int32)
+        np.cumsum(np.bincount(u, minlength=len(node_ids)), out=indptr[1:])
+        return cls(node_ids, x, y, indptr, v.astype(np.int32), weights, graph=graph)
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.node_ids)
+
+    @property
+    def n_edges(self) -> int:
+        return len(self.indices)
+
+    def positions(self, node_ids) -> np.ndarray:
+        """Node positions for an array of node ids (-1 for unknown ids)."""
+        return self._index.get_indexer(np.asarray(node_ids)).astype(np.int32)
+
+    def node_tree(self) -> cKDTree:
+        """KD-tree over projected node coordinates, built on first use."""
+        if self._tree is None:
+            self._tree = cKDTree(np.column_stack([self.x, self.y]))
+        return self._tree
+
+    def add_weight(self, name: str, values) -> None:
+        """Add (or replace) a per-edge weight column, aligned with `indices`."""
+        values = np.asarray(values, dtype=np.float32)
+        if values.shape != self.indices.shape:
+            raise ValueError(f"Weight {name!r} has {len(values)} values for {self.n_edges} edges")
+        self.weights[name] = values
+        self._csr.pop(name, None)
+        self._reversed = None
+
+    def edge_sources(self) -> np.ndarray:
+        """Source node position of every edge (the CSR row of each entry)."""
+        return np.repeat(np.arange(self.n_nodes, dtype=np.int32), np.diff(self.indptr))
+
+    def reversed(self) -> "CompiledGraph":
+        """
+        The same nodes (and positions) with every edge reversed, built on
+        first use. A search from amenities on it gives each node's distance
+        *to* its nearest amenity, which differs from the distance from it on
+        one-way streets and with slope-dependent travel times.
+        """
+        if self._reversed is None:
+            graph = None if self.graph is None else self.graph.reverse(copy=False)
+            self._reversed = CompiledGraph.from_edges(
+                self.node_ids, self.x, self.y, self.indices, self.edge_sources(), self.weights, graph=graph
+            )
+            self._reversed._index = self._index
+        return self._reversed
+
+    def csr(self, weight: str = "length") -> csr_matrix:
+        if weight not in self._csr:
+            n = self.n_nodes
+            self._csr[weight] = csr_matrix(
+                (self.weights[weight], self.indices, self.indptr), shape=(n, n)
+            )
+        return self._csr[weight]
+
+
+def _scipy_distances(cg, sources, weight, limit):
+    return dijkstra(
+        cg.csr(weight), directed=True, indices=sources, min_only=True, limit=limit
+    )
+
+
+def _seeded_distances(cg, sources, offsets, weight, limit):
+    # a virtual super-source at position n with one edge per seed, weighted by
+    # the seed's starting offset; duplicate seeds keep their smallest offset
+    n = cg.n_nodes
+    order = np.lexsort((offsets, sources))
+    sources, offsets = sources[order], offsets[order]
+    first = np.ones(len(sources), dtype=bool)
+    first[1:] = sources[1:] != sources[:-1]
+    sources, offsets = sources[first], offsets[first]
+
+    indptr = np.append(cg.indptr, cg.indptr[-1] + len(sources)).astype(np.int32)
+    indices = np.concatenate([cg.indices, sources]).astype(np.int32)
+    data = np.concatenate([cg.weights[weight], offsets.astype(np.float32)])
+    graph = csr_matrix((data, indices, indptr), shape=(n + 1, n + 1))
+    dist = dijkstra(graph, directed=True, indices=n, limit=limit)
+    return dist[:n]
+
+
+def _networkx_distances(cg, sources, weight, limit):
+    # reference implementation on the original graph
+    lengths = nx.multi_source_dijkstra_path_length(
+        cg.graph,
+        cg.node_ids[sources].tolist(),
+        cutoff=None if np.isinf(limit) else limit,
+        weight=weight,
+    )
+    dist = np.full(cg.n_nodes, np.inf)
+    dist[cg.positions(list(lengths))] = list(lengths.values())
+    return dist
+
+
+def multi_source_distances(
+    cg: CompiledGraph,
+    sources,
+    weight: str = "length",
+    backend: str = "scipy",
+    limit: float = np.inf,
+    offsets=None,
+) -> np.ndarray:
+    """
+    Shortest distance from the nearest source to every node.
+
+    `sources` are node positions. The search stops at `limit`, so only nodes
+    within that distance are settled. `offsets`, if given, are starting
+    distances per source (e.g. the along-edge distance from an edge-snapped
+    amenity to the node). Returns a float64 array indexed by node position,
+    with `inf` for nodes no source reaches within `limit`.
+    """
+    sources = np.asarray(sources, dtype=np.int32)
+    if len(sources) == 0:
+        return np.full(cg.n_nodes, np.inf)
+    if offsets is not None:
+        if backend != "scipy":
+            raise ValueError("Seeding sources with offsets requires backend='scipy'")
+        return _seeded_distances(
+            cg, sources, np.asarray(offsets, dtype=np.float64), weight, limit
+        )
+
+    sources = np.unique(sources)
+    if backend == "scipy":
+        return _scipy_distances(cg, sources, weight, limit)
+    if backend == "networkx":
+        return _networkx_distances(cg, sources, weight, limit)
+    raise ValueError(f"Unknown backend {backend!r}; expected one of {BACKENDS}")
+
+
+def k_nearest_sources(
+    cg: CompiledGraph,
+    sources,
+    source_ids,
+    k: int = 1,
+    limit: float = np.inf,
+    keep_within: float = 0.0,
+    weight: str = "length",
+):
+    """
+    The `k` nearest distinct sources of every node, from a single bounded
+    multi-label Dijkstra pass.
+
+    Each node keeps one label per distinct source id, in distance order, and
+    stops accepting labels once it has `k` of them and the distance exceeds
+    `keep_within` -- so every source within `keep_within` is also kept, which
+    is what cumulative-opportunity counts need. `sources` are node positions
+    and `source_ids` their amenity ids (several positions may share an id).
+
+    Returns `(node, dist, source_id)` arrays, one row per accepted label,
+    sorted by node then distance.
+    """
+    ids, sid = np.unique(np.asarray(source_ids), return_inverse=True)
+    n_ids = len(ids)
+    indptr = cg.indptr.tolist()
+    indices = cg.indices.tolist()
+    weights = cg.weights[weight].astype(np.float64).tolist()
+
+    count = [0] * cg.n_nodes
+    done = set()
+    out_node, out_dist, out_sid = [], [], []
+    heap = [(0.0, int(s), int(p)) for p, s in zip(np.asarray(sources), sid)]
+    heapq.heapify(heap)
+
+    while heap:
+        d, s, node = heapq.heappop(heap)
+        key = node * n_ids + s
+        if key in done or (count[node] >= k and d > keep_within):
+            continue
+        done.add(key)
+        count[node] += 1
+        out_node.append(node)
+        out_dist.append(d)
+        out_sid.append(s)
+
+        for e in range(indptr[node], indptr[node + 1]):
+            nb = indices[e]
+            nd = d + weights[e]
+            if nd > limit or (count[nb] >= k and nd > keep_within):
+                continue
+            if nb * n_ids + s not in done:
+                heapq.heappush(heap, (nd, s, nb))
+
+    node = np.asarray(out_node, dtype=np.int64)
+    dist = np.asarray(out_dist, dtype=np.float64)
+    order = np.lexsort((dist, node))
+    return node[order], dist[order], ids[np.asarray(out_sid, dtype=np.int64)[order]]
+
+
+def nearest_label_table(
+    cg: CompiledGraph, node, dist, source_id, k: int, count_within=(), nodes=None
+):
+    """
+    Reshape `k_nearest_sources` labels into per-node arrays.
+
+    Returns `(dist_k, id_k, counts)`: `(n, k)` distances (inf when missing)
+    and source ids, plus one per-node count array per threshold. Rows are
+    all node positions, or only the sorted positions in `nodes` if given.
+    """
+    if nodes is None:
+        n = cg.n_nodes
+    else:
+        n = len(nodes)
+        row = np.full(cg.n_nodes, -1, dtype=np.int64)
+        row[nodes] = np.arange(n)
+        keep = row[node] >= 0
+        node, dist, source_id = row[node[keep]], dist[keep], source_id[keep]
+
+    starts = np.searchsorted(node, np.arange(n))
+    rank = np.arange(len(node)) - starts[node]
+    top = rank < k
+
+    dist_k = np.full((n, k), np.inf)
+    dist_k[node[top], rank[top]] = dist[top]
+    if np.issubdtype(source_id.dtype, np.integer):
+        id_k = np.full((n, k), -1, dtype=np.int64)
+    else:
+        id_k = np.full((n, k), None, dtype=object)
+    id_k[node[top], rank[top]] = source_id[top]
+
+    counts = [np.bincount(node[dist <= t], minlength=n) for t in count_within]
+    return dist_k, id_k, counts
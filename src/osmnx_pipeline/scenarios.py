@@ -0,0 +1,233 @@
+"""
+What-if scenarios: nearest-amenity distances after adding or removing amenities.
+
+The baseline for each amenity key -- the distance from every graph node to
+its nearest amenity, and which source node that is -- comes from one full
+multi-source Dijkstra pass and is cached on disk per graph and amenity set.
+A scenario only searches where the answer can change:
+
+- removing amenities re-solves the nodes whose nearest source was removed,
+  seeded from the unaffected nodes around them (whose distances stand);
+- adding amenities runs a bounded search from the new sites and keeps the
+  nodes it reaches sooner than today. Those nodes form a shortest-path tree
+  around the new sites, so the bound is doubled until no improved node lies
+  within one edge of it.
+
+The result is a per-address diff: only addresses whose distance changed.
+"""
+
+import hashlib
+import time
+
+import geopandas as gpd
+import numpy as np
+import shapely
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import dijkstra
+
+from .amenities import fetch_amenities, update_amenity_store
+from .config import BASELINE_CACHE_DIR, CRS_PROJECTED
+from .impedance import add_travel_times
+from .layers import ADDRESSES
+from .network import build_network
+from .routing import CompiledGraph, multi_source_distances
+from .snapping import build_edge_table, snap_addresses, snap_to_nodes
+
+
+def nearest_source_distances(cg: CompiledGraph, sources, weight: str = "length"):
+    """Distance to the nearest of `sources` and that source's position (-1 if unreached), per node."""
+    sources = np.unique(np.asarray(sources, dtype=np.int32))
+    if len(sources) == 0:
+        return np.full(cg.n_nodes, np.inf), np.full(cg.n_nodes, -1, dtype=np.int32)
+    dist, _, nearest = dijkstra(
+        cg.csr(weight), directed=True, indices=sources, min_only=True, return_predecessors=True
+    )
+    return dist, np.where(nearest >= 0, nearest, -1).astype(np.int32)
+
+
+def region_distances(cg: CompiledGraph, region, dist, weight: str = "length") -> np.ndarray:
+    """
+    Shortest distances inside the boolean node mask `region` when `dist`
+    holds correct distances everywhere outside it: a search over the
+    region's edges from a virtual source joined to every entry node.
+    Returns the distances of `np.flatnonzero(region)`.
+    """
+    nodes = np.flatnonzero(region)
+    m = len(nodes)
+    position = np.full(cg.n_nodes, -1, dtype=np.int64)
+    position[nodes] = np.arange(m)
+    u, v, w = cg.edge_sources(), cg.indices, cg.weights[weight].astype(np.float64)
+    inner = region[u] & region[v]
+    entry = ~region[u] & region[v] & np.isfinite(dist[u])
+    # several edges may enter the same node: keep the cheapest entry
+    seed = np.full(m, np.inf)
+    np.minimum.at(seed, position[v[entry]], dist[u[entry]] + w[entry])
+    seeded = np.flatnonzero(np.isfinite(seed))
+
+    rows = np.concatenate([position[u[inner]], np.full(len(seeded), m)])
+    cols = np.concatenate([position[v[inner]], seeded])
+    data = np.concatenate([w[inner], seed[seeded]])
+    graph = csr_matrix((data, (rows, cols)), shape=(m + 1, m + 1))
+    return dijkstra(graph, directed=True, indices=m)[:m]
+
+
+def improved_distances(cg: CompiledGraph, sources, current, weight: str = "length"):
+    """
+    Distances from `sources` at the nodes where they beat `current` (a
+    nearest-source distance array), as `(dist, improved_mask)`.
+
+    Every node on the new shortest path to an improved node is improved too,
+    so an improved node beyond the search limit implies one within an edge
+    length of it; the limit doubles until there is none.
+    """
+    sources = np.unique(np.asarray(sources, dtype=np.int32))
+    longest = float(cg.weights[weight].max(initial=0.0))
+    limit = float(current[sources].max(initial=0.0)) + longest
+    while True:
+        dist = multi_source_distances(cg, sources, weight=weight, limit=limit)
+        improved = dist < current
+        if np.isinf(limit) or not (improved & (dist > limit - longest)).any():
+            return dist, improved
+        limit *= 2
+
+
+class ScenarioEngine:
+    """
+    Baselines and what-if runs for one network.
+
+    `addresses` needs `address_point_id`, point geometry and `nearest_node`
+    (node id of its snap); `amenities_by_key` maps each key to its access
+    points (see `amenities.fetch_amenities`). Baselines are computed on first
+    use per key and, with a graph `cache_key`, reused from disk. Searches run
+    on the reversed graph, so distances are address -> amenity trips.
+    """
+
+    def __init__(
+        self,
+        cg: CompiledGraph,
+        addresses: gpd.GeoDataFrame,
+        amenities_by_key: dict,
+        weight: str = "length",
+        cache_key: str | None = None,
+    ):
+        self.cg = cg
+        self.addresses = addresses
+        self.addr_pos = cg.positions(addresses["nearest_node"].to_numpy())
+        self.amenities_by_key = amenities_by_key
+        self.weight = weight
+        self.cache_key = cache_key
+        self._sources = {}
+        self._baselines = {}
+
+    @classmethod
+    def from_network(cls, amenity_keys, mode: str = "walk", weight: str = "length"):
+        """Engine over the cached `mode` network, the gold addresses and the stored amenities."""
+        addresses = ADDRESSES.points()
+        G = build_network(mode)
+        cg = CompiledGraph.from_graph(G)
+        if weight.endswith("_time"):
+            add_travel_times(cg, [weight.removesuffix("_time")])
+        if weight not in cg.weights:
+            raise ValueError(f"Unknown weight {weight!r}; expected 'length' or '<mode>_time'")
+        cache_key = G.graph.get("cache_key")
+        addresses["nearest_node"] = snap_addresses(addresses, cg, cache_key)["node_id"].to_numpy()
+
+        edges = build_edge_table(G, cg)
+        update_amenity_store(amenity_keys)
+        amenities_by_key = {key: fetch_amenities(key, edges=edges) for key in amenity_keys}
+        return cls(cg, addresses, amenities_by_key, weight=weight, cache_key=cache_key)
+
+    def sources(self, amenity_key: str) -> np.ndarray:
+        """Snapped node position of every access point of `amenity_key`."""
+        if amenity_key not in self._sources:
+            amenities = self.amenities_by_key[amenity_key]
+            self._sources[amenity_key] = snap_to_nodes(
+                self.cg, amenities.geometry.x.values, amenities.geometry.y.values
+            )[0]
+        return self._sources[amenity_key]
+
+    def _baseline_path(self, amenity_key: str, sources):
+        h = hashlib.sha256(f"{self.cache_key}|{amenity_key}|{self.weight}|to|".encode())
+        h.update(np.unique(sources).tobytes())
+        return BASELINE_CACHE_DIR / f"{self._baseline_prefix(amenity_key)}{h.hexdigest()[:16]}.npz"
+
+    def _baseline_prefix(self, amenity_key: str) -> str:
+        return f"{self.cache_key}_{amenity_key}_{self.weight}_"
+
+    def baseline(self, amenity_key: str):
+        """`(dist, nearest)` per node for today's amenities (see `nearest_source_distances`)."""
+        if amenity_key in self._baselines:
+            return self._baselines[amenity_key]
+        sources = self.sources(amenity_key)
+        path = self._baseline_path(amenity_key, sources) if self.cache_key else None
+        if path is not None and path.exists():
+            with np.load(path) as cached:
+                result = cached["dist"], cached["nearest"]
+        else:
+            result = nearest_source_distances(self.cg.reversed(), sources, self.weight)
+            if path is not None:
+                BASELINE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+                # only this graph's baselines: other networks keep theirs
+                for stale in BASELINE_CACHE_DIR.glob(f"{self._baseline_prefix(amenity_key)}*.npz"):
+                    stale.unlink()
+                np.savez(path, dist=result[0], nearest=result[1])
+        self._baselines[amenity_key] = result
+        return result
+
+    def removed_sources(self, amenity_key: str, removed) -> np.ndarray:
+        """
+        Source positions that disappear when the amenities nearest to the
+        `removed` points are removed (every access point of each, except
+        nodes that another amenity also snaps to).
+        """
+        amenities = self.amenities_by_key[amenity_key]
+        _, nearest = amenities.sindex.nearest(np.asarray(removed, dtype=object))
+        gone = amenities.index.isin(amenities.index[nearest])
+        sources = self.sources(amenity_key)
+        return np.setdiff1d(sources[gone], sources[~gone])
+
+    def run(self, amenity_key: str, added=(), removed=()) -> gpd.GeoDataFrame:
+        """
+        Addresses whose nearest-`amenity_key` distance changes when amenities
+        are built at the `added` points and the existing amenities nearest to
+        the `removed` points close (shapely points in `CRS_PROJECTED`).
+
+        Columns are `address_point_id`, `<metric>_<key>_before_<unit>`,
+        `<metric>_<key>_after_<unit>` and `change_<unit>` (negative is
+        closer), with NaN for unreachable; metric and unit are `dist`/`m`
+        for length and `<weight>`/`s` for travel times. The index holds the
+        address rows, as for `ADDRESSES.join_attributes`.
+        """
+        start = time.perf_counter()
+        cg, weight = self.cg.reversed(), self.weight
+        before, nearest = self.baseline(amenity_key)
+        after = before.copy()
+
+        n_updated = 0
+        if len(removed):
+            region = np.isin(nearest, self.removed_sources(amenity_key, removed))
+            after[region] = region_distances(cg, region, before, weight)
+            n_updated += int(region.sum())
+        if len(added):
+            added = np.asarray(added, dtype=object)
+            pos, _ = snap_to_nodes(cg, shapely.get_x(added), shapely.get_y(added))
+            dist, improved = improved_distances(cg, pos, after, weight)
+            after[improved] = dist[improved]
+            n_updated += int(improved.sum())
+
+        changed = ~np.isclose(after, before, rtol=0, atol=1e-6)  # inf == inf
+        rows = np.flatnonzero(changed[self.addr_pos])
+        node = self.addr_pos[rows]
+        prefix, unit = ("dist", "m") if weight == "length" else (weight, "s")
+        old = np.where(np.isfinite(before[node]), before[node], np.nan)
+        new = np.where(np.isfinite(after[node]), after[node], np.nan)
+        diff = self.addresses.iloc[rows][["address_point_id", "geometry"]].copy()
+        diff[f"{prefix}_{amenity_key}_before_{unit}"] = old
+        diff[f"{prefix}_{amenity_key}_after_{unit}"] = new
+        diff[f"change_{unit}"] = new - old
+        print(
+            f"    → {amenity_key} scenario: {n_updated:,} nodes updated, "
+            f"{int(changed.sum()):,} changed, {len(diff):,} addresses in "
+            f"{time.perf_counter() - start:.3f}s"
+        )
+        return gpd.GeoDataFrame(diff, geometry="geometry", crs=CRS_PROJECTED)
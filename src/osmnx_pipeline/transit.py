@@ -0,0 +1,468 @@
+"""
+Walk + transit travel times from a static GTFS feed (RAPTOR over arrays).
+
+Trips with the same stop sequence are grouped into patterns (split where one
+trip would overtake another) whose departure and arrival times are dense
+int32 matrices, so boarding the earliest catchable trip is one
+`searchsorted` per pattern stop. Every stop is an origin at once: labels are
+a `(n_stops, n_origins)` matrix of arrival times, and each RAPTOR round scans
+each marked pattern once for all origins. Footpaths between stops are walk
+graph distances within `TRANSFER_MAX_M`.
+
+Addresses reach their nearest stops on foot (one multi-label Dijkstra from
+the stop nodes) and stops reach amenities on foot (one multi-source Dijkstra
+per key). Instead of one RAPTOR run per address, each departure time is run
+at stop-departure offsets `TRANSIT_SLACK_S` apart and an address's walk to a
+stop is rounded up to the next offset, i.e. at most that much extra waiting.
+"""
+
+import io
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date as Date
+from datetime import timedelta
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+from pyproj import Transformer
+from scipy.sparse.csgraph import dijkstra
+
+from .amenities import fetch_amenities, update_amenity_store
+from .config import (
+    CRS_LATLON,
+    CRS_PROJECTED,
+    GTFS_PATH,
+    TRANSFER_MAX_M,
+    TRANSIT_ACCESS_MAX_M,
+    TRANSIT_ACCESS_STOPS,
+    TRANSIT_DEPARTURE_STEP_MIN,
+    TRANSIT_DEPARTURE_WINDOW,
+    TRANSIT_MAX_ROUNDS,
+    TRANSIT_SLACK_S,
+    WALK_SPEED_MPS,
+)
+from .layers import ADDRESSES
+from .network import build_walk_network
+from .routing import CompiledGraph, k_nearest_sources, multi_source_distances, nearest_label_table
+from .snapping import build_edge_table, snap_addresses, snap_to_nodes
+
+UNREACHED = np.int32(2**29)  # "infinite" time; two of them still fit in int32
+FOOTPATH_CHUNK = 16_384  # footpaths relaxed per block (bounds the temporary matrix)
+ORIGIN_CHUNK = 2_048  # origin stops per RAPTOR pass (bounds the label matrices)
+STOP_DIJKSTRA_CHUNK = 64
+
+
+def parse_gtfs_time(values) -> np.ndarray:
+    """'HH:MM[:SS]' (hours may exceed 24) to seconds after midnight; blanks become NaN."""
+    parts = pd.Series(values, dtype="string").str.strip().str.split(":", expand=True)
+    parts = parts.reindex(columns=range(3)).apply(pd.to_numeric, errors="coerce")
+    parts[2] = parts[2].where(parts[1].isna(), parts[2].fillna(0))
+    return (parts[0] * 3600 + parts[1] * 60 + parts[2]).to_numpy(dtype=np.float64)
+
+
+def departure_times(window=TRANSIT_DEPARTURE_WINDOW, step_min: float = TRANSIT_DEPARTURE_STEP_MIN) -> np.ndarray:
+    """Sampled departure times (seconds) from the start to the end of `window`, inclusive."""
+    start, end = parse_gtfs_time(list(window))
+    return np.arange(start, end + 1, step_min * 60).astype(np.int32)
+
+
+def _read_csv(feed: zipfile.ZipFile, name: str, **kwargs) -> pd.DataFrame | None:
+    names = {n.rsplit("/", 1)[-1]: n for n in feed.namelist()}
+    if name not in names:
+        return None
+    with feed.open(names[name]) as f:
+        return pd.read_csv(io.TextIOWrapper(f, encoding="utf-8-sig"), **kwargs)
+
+
+def active_service_ids(calendar, calendar_dates, date) -> set:
+    """GTFS service ids running on `date` (calendar ranges plus date exceptions)."""
+    day = int(date.strftime("%Y%m%d"))
+    active = set()
+    if calendar is not None:
+        weekday = date.strftime("%A").lower()
+        running = (calendar[weekday] == 1) & (calendar["start_date"] <= day) & (calendar["end_date"] >= day)
+        active.update(calendar.loc[running, "service_id"])
+    if calendar_dates is not None:
+        today = calendar_dates[calendar_dates["date"] == day]
+        active.update(today.loc[today["exception_type"] == 1, "service_id"])
+        active.difference_update(today.loc[today["exception_type"] == 2, "service_id"])
+    return active
+
+
+def representative_date(trips, calendar, calendar_dates) -> Date | None:
+    """
+    The weekday (Monday to Friday) in the feed's service period on which the
+    most trips run, earliest first on ties; None for a feed with neither
+    `calendar.txt` nor `calendar_dates.txt`.
+    """
+    days = []
+    if calendar is not None and len(calendar):
+        days += [calendar["start_date"].min(), calendar["end_date"].max()]
+    if calendar_dates is not None and len(calendar_dates):
+        days += [calendar_dates["date"].min(), calendar_dates["date"].max()]
+    if not days:
+        return None
+    first, last = (pd.to_datetime(str(d), format="%Y%m%d").date() for d in (min(days), max(days)))
+    trips_per_service = trips["service_id"].value_counts()
+    best, best_trips = None, -1
+    for offset in range((last - first).days + 1):
+        day = first + timedelta(days=offset)
+        if day.weekday() >= 5:
+            continue
+        n = trips_per_service.reindex(list(active_service_ids(calendar, calendar_dates, day))).sum()
+        if n > best_trips:
+            best, best_trips = day, n
+    return best
+
+
+def _split_overtaking(dep, arr):
+    """
+    Partition trips (sorted by first departure) into groups in which no trip
+    overtakes another, so each stop's departures are sorted within a group.
+    """
+    groups = []
+    for t in range(len(dep)):
+        for g in groups:
+            last = g[-1]
+            if (dep[t] >= dep[last]).all() and (arr[t] >= arr[last]).all():
+                g.append(t)
+                break
+        else:
+            groups.append([t])
+    return groups
+
+
+class TransitNetwork:
+    """
+    RAPTOR arrays for one service day.
+
+    Patterns are `(stops, dep, arr)` with `stops` the stop positions along the
+    pattern and `dep`/`arr` `(n_stops_on_pattern, n_trips)` seconds, trips in
+    boarding order (`arr` has one extra `UNREACHED` column). Footpaths are stop-to-stop walks sorted by target stop.
+    """
+
+    def __init__(self, stop_ids, stop_pos, patterns, fp_from, fp_to, fp_seconds):
+        self.stop_ids = stop_ids
+        self.stop_pos = stop_pos  # walk-graph node position of each stop
+        self.patterns = patterns
+        self.fp_from = fp_from
+        self.fp_to = fp_to
+        self.fp_seconds = fp_seconds
+
+    @property
+    def n_stops(self) -> int:
+        return len(self.stop_ids)
+
+    @property
+    def n_trips(self) -> int:
+        return sum(dep.shape[1] for _, dep, _ in self.patterns)
+
+    @classmethod
+    def from_stop_times(cls, stop_ids, stop_pos, stop_times, footpaths) -> "TransitNetwork":
+        """
+        Build from a `trip_id, stop_sequence, stop_id, arrival_s, departure_s`
+        table (times in seconds; NaN times between timed stops are
+        interpolated) and `(from_stop, to_stop, seconds)` footpath arrays in
+        stop positions.
+        """
+        st = stop_times.sort_values(["trip_id", "stop_sequence"], kind="stable")
+        stop_index = pd.Index(stop_ids)
+        stop = stop_index.get_indexer(st["stop_id"])
+        if (stop < 0).any():
+            raise ValueError("stop_times refers to stops missing from stops.txt")
+        # first and last stops of a trip are always timed, so a global
+        # interpolation never crosses trips
+        arr = st["arrival_s"].interpolate().to_numpy()
+        dep = st["departure_s"].fillna(st["arrival_s"]).interpolate().to_numpy()
+        arr = np.where(np.isnan(arr), dep, arr)
+
+        _, trip_start = np.unique(st["trip_id"].to_numpy(), return_index=True)
+        bounds = np.append(np.sort(trip_start), len(st))
+        by_sequence = {}
+        for a, b in zip(bounds[:-1], bounds[1:]):
+            if b - a >= 2:
+                by_sequence.setdefault(stop[a:b].tobytes(), []).append((a, b))
+
+        patterns = []
+        for runs in by_sequence.values():
+            a0, b0 = runs[0]
+            stops = stop[a0:b0].astype(np.int32)
+            dep_m = np.array([dep[a:b] for a, b in runs], dtype=np.int32)
+            arr_m = np.array([arr[a:b] for a, b in runs], dtype=np.int32)
+            order = np.lexsort((arr_m[:, -1], dep_m[:, 0]))
+            dep_m, arr_m = dep_m[order], arr_m[order]
+            for group in _split_overtaking(dep_m, arr_m):
+                # a trailing UNREACHED arrival for "not on a trip" (trip index n_trips)
+                arr_g = np.column_stack([arr_m[group].T, np.full(len(stops), UNREACHED, dtype=np.int32)])
+                patterns.append((stops, np.ascontiguousarray(dep_m[group].T), arr_g))
+
+        fp_from, fp_to, fp_seconds = (np.asarray(a) for a in footpaths)
+        order = np.lexsort((fp_from, fp_to))
+        return cls(
+            np.asarray(stop_ids), np.asarray(stop_pos, dtype=np.int32), patterns,
+            fp_from[order].astype(np.int32), fp_to[order].astype(np.int32),
+            fp_seconds[order].astype(np.int32),
+        )
+
+
+def stop_footpaths(cg: CompiledGraph, stop_pos, max_m: float = TRANSFER_MAX_M, speed_mps: float = WALK_SPEED_MPS):
+    """Walk times between distinct stops within `max_m` on the walk graph, as `(from, to, seconds)`."""
+    stop_pos = np.asarray(stop_pos)
+    graph = cg.csr()
+    from_stop, to_stop, seconds = [], [], []
+    for start in range(0, len(stop_pos), STOP_DIJKSTRA_CHUNK):
+        # one bounded search per stop; only the columns of stop nodes are kept
+        dist = dijkstra(graph, directed=True, indices=stop_pos[start:start + STOP_DIJKSTRA_CHUNK], limit=max_m)
+        dist = dist[:, stop_pos]
+        src, dst = np.nonzero(np.isfinite(dist))
+        keep = src + start != dst
+        from_stop.append(src[keep] + start)
+        to_stop.append(dst[keep])
+        seconds.append(np.ceil(dist[src[keep], dst[keep]] / speed_mps))
+    if not from_stop:
+        return (np.empty(0, dtype=np.int32),) * 3
+    return tuple(np.concatenate(a).astype(np.int32) for a in (from_stop, to_stop, seconds))
+
+
+def load_gtfs(
+    cg: CompiledGraph,
+    gtfs_path=GTFS_PATH,
+    date: Date | None = None,
+    transfer_max_m: float = TRANSFER_MAX_M,
+    speed_mps: float = WALK_SPEED_MPS,
+) -> TransitNetwork:
+    """
+    Read a static GTFS zip into a `TransitNetwork` linked to the walk graph.
+
+    Only trips running on `date` are kept (from `calendar.txt` and
+    `calendar_dates.txt`). Without a date, the busiest weekday of the feed
+    is used (see `representative_date`), so weekend and holiday services do
+    not count as extra departures; only a feed without calendar files keeps
+    every trip. Stops are snapped to their nearest walk-graph node.
+    `frequencies.txt` is not expanded.
+    """
+    with zipfile.ZipFile(gtfs_path) as feed:
+        stops = _read_csv(feed, "stops.txt", dtype={"stop_id": str})
+        trips = _read_csv(feed, "trips.txt", dtype={"trip_id": str, "service_id": str})
+        stop_times = _read_csv(
+            feed, "stop_times.txt",
+            usecols=["trip_id", "arrival_time", "departure_time", "stop_id", "stop_sequence"],
+            dtype={"trip_id": str, "stop_id": str, "arrival_time": str, "departure_time": str},
+        )
+        calendar = _read_csv(feed, "calendar.txt", dtype={"service_id": str})
+        calendar_dates = _read_csv(feed, "calendar_dates.txt", dtype={"service_id": str})
+    if stops is None or trips is None or stop_times is None:
+        raise ValueError(f"{gtfs_path} is missing stops.txt, trips.txt or stop_times.txt")
+
+    if date is None:
+        date = representative_date(trips, calendar, calendar_dates)
+        if date is not None:
+            print(f"    → GTFS: no service date given, using {date:%a %Y-%m-%d} (busiest weekday)")
+    if date is not None:
+        running = trips.loc[trips["service_id"].isin(active_service_ids(calendar, calendar_dates, date)), "trip_id"]
+        stop_times = stop_times[stop_times["trip_id"].isin(running)]
+    stop_times = stop_times.assign(
+        arrival_s=parse_gtfs_time(stop_times["arrival_time"]),
+        departure_s=parse_gtfs_time(stop_times["departure_time"]),
+    )
+
+    # only stops that are served (parent stations and entrances have no times)
+    stops = stops[stops["stop_id"].isin(stop_times["stop_id"])].reset_index(drop=True)
+    transformer = Transformer.from_crs(CRS_LATLON, CRS_PROJECTED, always_xy=True)
+    x, y = transformer.transform(stops["stop_lon"].to_numpy(), stops["stop_lat"].to_numpy())
+    stop_pos, _ = snap_to_nodes(cg, x, y)
+    footpaths = stop_footpaths(cg, stop_pos, transfer_max_m, speed_mps)
+    net = TransitNetwork.from_stop_times(stops["stop_id"].to_numpy(), stop_pos, stop_times, footpaths)
+    print(
+        f"    → GTFS: {net.n_stops:,} stops, {len(net.patterns):,} patterns, "
+        f"{net.n_trips:,} trips, {len(net.fp_to):,} footpaths"
+    )
+    return net
+
+
+def _relax_footpaths(net: TransitNetwork, arrivals, labels) -> None:
+    """`labels[to] = min(labels[to], arrivals[from] + walk)` over every footpath."""
+    fp_to = net.fp_to
+    for start in range(0, len(fp_to), FOOTPATH_CHUNK):
+        block = slice(start, start + FOOTPATH_CHUNK)
+        to = fp_to[block]
+        candidate = arrivals[net.fp_from[block]] + net.fp_seconds[block, None]
+        # footpaths are sorted by target: one reduction per target stop
+        first = np.flatnonzero(np.r_[True, to[1:] != to[:-1]])
+        targets = to[first]
+        labels[targets] = np.minimum(labels[targets], np.minimum.reduceat(candidate, first, axis=0))
+
+
+def _scan_pattern(stops, dep, arr, first, prev, by_trip) -> None:
+    """Ride one pattern from its first marked stop, for every origin at once."""
+    trip = np.full(prev.shape[1], dep.shape[1])  # n_trips = not on a trip yet
+    for i in range(first, len(stops)):
+        s = stops[i]
+        if i > first:
+            np.minimum(by_trip[s], arr[i][trip], out=by_trip[s])
+        if i + 1 < len(stops):
+            # earliest trip leaving s no earlier than the previous round's arrival
+            np.minimum(trip, np.searchsorted(dep[i], prev[s]), out=trip)
+
+
+def raptor(net: TransitNetwork, departure_s: int, origins=None, max_rounds: int = TRANSIT_MAX_ROUNDS) -> np.ndarray:
+    """
+    Earliest arrival at every stop from each origin stop, leaving at `departure_s`.
+
+    Returns an int32 `(n_stops, n_origins)` matrix of arrival times in
+    seconds (`UNREACHED` if not reached) using at most `max_rounds` trips,
+    with a footpath allowed before the first trip and after each trip.
+    """
+    origins = np.arange(net.n_stops) if origins is None else np.asarray(origins)
+    best = np.full((net.n_stops, len(origins)), UNREACHED, dtype=np.int32)
+    best[origins, np.arange(len(origins))] = departure_s
+    _relax_footpaths(net, best.copy(), best)
+
+    marked = (best < UNREACHED).any(axis=1)
+    for _ in range(max_rounds):
+        prev = best.copy()
+        by_trip = np.full_like(best, UNREACHED)
+        for stops, dep, arr in net.patterns:
+            hit = np.flatnonzero(marked[stops[:-1]])
+            if len(hit):
+                _scan_pattern(stops, dep, arr, hit[0], prev, by_trip)
+        np.minimum(best, by_trip, out=best)
+        _relax_footpaths(net, by_trip, best)
+        marked = (best < prev).any(axis=1)
+        if not marked.any():
+            break
+    return best
+
+
+def _walk_seconds(dist_m, speed_mps):
+    return np.where(np.isfinite(dist_m), np.ceil(dist_m / speed_mps), UNREACHED).astype(np.int32)
+
+
+_worker = {}
+
+
+def _init_worker(net, origins, egress_s, max_rounds):
+    _worker.update(net=net, origins=origins, egress_s=egress_s, max_rounds=max_rounds)
+
+
+def _arrivals_at(departure):
+    net, origins, egress_s = _worker["net"], _worker["origins"], _worker["egress_s"]
+    out = {key: np.empty(len(origins), dtype=np.int32) for key in egress_s}
+    for start in range(0, len(origins), ORIGIN_CHUNK):
+        chunk = slice(start, start + ORIGIN_CHUNK)
+        labels = raptor(net, int(departure), origins[chunk], _worker["max_rounds"])
+        for key, egress in egress_s.items():
+            out[key][chunk] = np.minimum((labels + egress[:, None]).min(axis=0), UNREACHED)
+    return out
+
+
+def transit_arrivals(
+    net: TransitNetwork,
+    origins,
+    egress_s: dict,
+    departures,
+    max_rounds: int = TRANSIT_MAX_ROUNDS,
+    n_workers: int | None = None,
+) -> dict:
+    """
+    Earliest arrival at the nearest amenity of each key from each origin stop.
+
+    `egress_s[key]` is the walk time from every stop to that key's nearest
+    amenity. Returns `{key: (n_departures, n_origins) int32}` for origins
+    leaving their stop at each time in `departures`. `n_workers > 1` runs the
+    departures in a process pool.
+    """
+    args = (net, np.asarray(origins), egress_s, max_rounds)
+    if n_workers is None or n_workers <= 1:
+        _init_worker(*args)
+        results = [_arrivals_at(d) for d in departures]
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker, initargs=args) as pool:
+            results = list(pool.map(_arrivals_at, departures))
+    return {key: np.stack([r[key] for r in results]) for key in egress_s}
+
+
+def transit_times_to_amenities(
+    amenity_keys,
+    gtfs_path=GTFS_PATH,
+    date: Date | None = None,
+    window=TRANSIT_DEPARTURE_WINDOW,
+    step_min: float = TRANSIT_DEPARTURE_STEP_MIN,
+    access_stops: int = TRANSIT_ACCESS_STOPS,
+    max_rounds: int = TRANSIT_MAX_ROUNDS,
+    slack_s: int = TRANSIT_SLACK_S,
+    speed_mps: float = WALK_SPEED_MPS,
+    n_workers: int | None = None,
+) -> gpd.GeoDataFrame:
+    """
+    Walk + transit travel time from every address to the nearest amenity of
+    each key, for departures sampled every `step_min` minutes over `window`.
+
+    A journey walks to one of the address's `access_stops` nearest stops
+    (within `TRANSIT_ACCESS_MAX_M`), rides at most `max_rounds` trips with
+    walking transfers and walks to the amenity (again within
+    `TRANSIT_ACCESS_MAX_M`); walking the whole way is always an option.
+    Adds `transit_<key>_min` (median over the departures) and
+    `transit_<key>_max_min` (worst departure); NaN if unreachable.
+
+    Trips are those running on `date`, or on the feed's busiest weekday
+    without one (see `load_gtfs`). Walk legs are computed once; RAPTOR runs
+    once per distinct stop-departure time for all boarding stops together,
+    in `n_workers` processes.
+    """
+    addresses = ADDRESSES.points()
+    G = build_walk_network()
+    cg = CompiledGraph.from_graph(G)
+    snaps = snap_addresses(addresses, cg, G.graph.get("cache_key"))
+    nodes, addr_row = np.unique(cg.positions(snaps["node_id"].values), return_inverse=True)
+    net = load_gtfs(cg, gtfs_path, date, speed_mps=speed_mps)
+
+    # walk legs: address nodes -> nearest stops, stops -> nearest amenity
+    start = time.perf_counter()
+    labels = k_nearest_sources(
+        cg, net.stop_pos, np.arange(net.n_stops), k=access_stops, limit=TRANSIT_ACCESS_MAX_M
+    )
+    access_m, access_stop, _ = nearest_label_table(cg, *labels, k=access_stops, nodes=nodes)
+    access_s = _walk_seconds(access_m, speed_mps)
+    edges = build_edge_table(G, cg)
+    update_amenity_store(amenity_keys)
+    walk_s, egress_s = {}, {}
+    for key in amenity_keys:
+        amenities = fetch_amenities(key, edges=edges)
+        amen_pos, _ = snap_to_nodes(cg, amenities.geometry.x.values, amenities.geometry.y.values)
+        dist = multi_source_distances(cg, amen_pos)
+        walk_s[key] = _walk_seconds(dist[nodes], speed_mps)
+        egress = dist[net.stop_pos]
+        egress_s[key] = _walk_seconds(np.where(egress <= TRANSIT_ACCESS_MAX_M, egress, np.inf), speed_mps)
+    print(f"    → Walk legs for {len(nodes):,} nodes in {time.perf_counter() - start:.2f}s")
+
+    # RAPTOR from every stop used for access, at each departure plus the
+    # rounded-up walk to the stop; offsets shared across departures run once
+    departures = departure_times(window, step_min)
+    origins, origin_row = np.unique(access_stop[access_stop >= 0], return_inverse=True)
+    row = np.full(access_stop.shape, -1)
+    row[access_stop >= 0] = origin_row
+    offset = -(-access_s // slack_s) * slack_s
+    run_times = np.unique(departures[:, None] + np.unique(offset[access_stop >= 0])[None, :])
+    start = time.perf_counter()
+    arrivals = transit_arrivals(net, origins, egress_s, run_times, max_rounds, n_workers)
+    print(
+        f"    → RAPTOR: {len(origins):,} origin stops x {len(run_times)} departures "
+        f"in {time.perf_counter() - start:.2f}s"
+    )
+
+    for key in amenity_keys:
+        times = np.empty((len(departures), len(nodes)))
+        for d, departure in enumerate(departures):
+            best = walk_s[key].astype(np.int64)
+            for j in range(access_stops):
+                ok = row[:, j] >= 0
+                run = np.searchsorted(run_times, departure + offset[ok, j])
+                arrival = arrivals[key][run, row[ok, j]].astype(np.int64)
+                best[ok] = np.where(arrival < UNREACHED, np.minimum(best[ok], arrival - departure), best[ok])
+            times[d] = np.where(best < UNREACHED, best / 60, np.nan)
+        addresses[f"transit_{key}_min"] = np.median(times, axis=0)[addr_row]
+        addresses[f"transit_{key}_max_min"] = times.max(axis=0)[addr_row]
+    return ADDRESSES.join_attributes(addresses)
@@ -3,9 +3,30 @@ Utility functions for processing bronze-layer geometries.
 """
 
 import os
+import sys
 import geopandas as gpd
 from pathlib import Path
 
+sys.path.append(str(Path(__file__).parent.parent.parent))  # src/, for medallion
+from medallion.streaming import STREAM_BATCH_SIZE, geojson_to_geoparquet
+
+
+DATA_DIR = Path(__file__).parent.parent.parent.parent / "data"  # Up to attempt-2/data
+
+
+def geometry_path(layer, filename):
+    """
+    Path of a geometry file in a data layer.
+
+    Parameters:
+    -----------
+    layer : str
+        Layer name (e.g., "bronze")
+    filename : str
+        File name inside the layer's geometries directory
+    """
+    return DATA_DIR / layer / "geometries" / filename
+
 
 def clean_name(name):
     """
@@ -56,7 +77,7 @@ def read_and_process_geojson(input_geojson_path, output_geoparquet_path):
 
 # We should instead assume that the input and output directories are known and then the file names are passed in, no?
 
-def process_geometry(filename, input_layer, output_layer):
+def process_geometry(filename, input_layer, output_layer, batch_size=STREAM_BATCH_SIZE):
     """
     Process a geometry file from one layer to another.
 
@@ -68,13 +89,15 @@ def process_geometry(filename, input_layer, output_layer):
         Source layer name (e.g., "bronze")
     output_layer : str
         Destination layer name (e.g., "silver")
+    batch_size : int
+        Features read, reprojected and written per batch; peak memory
+        scales with this rather than with the file size
     """
     # Build full paths
-    script_dir = Path(__file__).parent.parent.parent.parent  # Up to attempt-2/
-    input_path = script_dir / "data" / input_layer / "geometries" / filename
+    input_path = geometry_path(input_layer, filename)
 
     # Create output directory
-    output_dir = script_dir / "data" / output_layer / "geometries"
+    output_dir = geometry_path(output_layer, "")
     output_dir.mkdir(parents=True, exist_ok=True)
 
     # Create cleaned output filename
@@ -82,18 +105,10 @@ def process_geometry(filename, input_layer, output_layer):
     cleaned_name = clean_name(base_name)
     output_path = output_dir / f"{cleaned_name}.geoparquet"
 
-    # Read GeoJSON
+    # Stream GeoJSON → parquet in batches, converting to EPSG:4326 on the way
     print(f"  Reading: {filename}")
-    gdf = gpd.read_file(input_path)
-    print(f"    → Loaded {len(gdf)} features")
-
-    # Convert CRS if needed
-    if gdf.crs != "EPSG:4326":
-        gdf = gdf.to_crs(epsg=4326)
-        print("    → Converted to EPSG:4326")
-
-    # Save as parquet
-    gdf.to_parquet(output_path, compression='snappy', index=False)
+    n_features = geojson_to_geoparquet(input_path, output_path, crs="EPSG:4326", batch_size=batch_size)
+    print(f"    → Streamed {n_features} features in EPSG:4326")
     print(f"    → Saved: {cleaned_name}.geoparquet")
 
 
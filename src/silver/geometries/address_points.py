@@ -2,7 +2,13 @@
 Process address points from bronze to silver layer.
 """
 
-from _utilities import process_geometry
+from _utilities import geometry_path, process_geometry
+
+SOURCE_FILE = "Address_Points_5658052068094417558.geojson"
+
+# Tracked by the incremental runner: rerun only when these change
+INPUTS = [geometry_path("bronze", SOURCE_FILE)]
+OUTPUTS = [geometry_path("silver", "address_points.geoparquet")]
 
 
 def process():
@@ -16,7 +22,7 @@ def process():
     # For now, just pass through the data
 
     # Save to silver
-    process_geometry("Address_Points_5658052068094417558.geojson", "bronze", "silver")
+    process_geometry(SOURCE_FILE, "bronze", "silver")
 
     print("  ✓ Address Points complete\n")
 
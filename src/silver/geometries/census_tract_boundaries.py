@@ -2,7 +2,12 @@
 Process census tract boundaries from bronze to silver layer.
 """
 
-from _utilities import process_geometry
+from _utilities import geometry_path, process_geometry
+
+SOURCE_FILE = "Census_Tract_Boundaries_7506545346012929933.geojson"
+
+INPUTS = [geometry_path("bronze", SOURCE_FILE)]
+OUTPUTS = [geometry_path("silver", "census_tract_boundaries.geoparquet")]
 
 
 def process():
@@ -10,7 +15,7 @@ def process():
     print("\nProcessing: Census Tract Boundaries")
 
     # Convert from bronze GeoJSON to silver geoparquet
-    process_geometry("Census_Tract_Boundaries_7506545346012929933.geojson", "bronze", "silver")
+    process_geometry(SOURCE_FILE, "bronze", "silver")
 
     print("  ✓ Census Tract Boundaries complete\n")
 
@@ -2,7 +2,12 @@
 Process county boundary from bronze to silver layer.
 """
 
-from _utilities import process_geometry
+from _utilities import geometry_path, process_geometry
+
+SOURCE_FILE = "County_Boundary_-7887526420565696345.geojson"
+
+INPUTS = [geometry_path("bronze", SOURCE_FILE)]
+OUTPUTS = [geometry_path("silver", "county_boundary.geoparquet")]
 
 
 def process():
@@ -10,7 +15,7 @@ def process():
     print("\nProcessing: County Boundary")
 
     # Convert from bronze GeoJSON to silver geoparquet
-    process_geometry("County_Boundary_-7887526420565696345.geojson", "bronze", "silver")
+    process_geometry(SOURCE_FILE, "bronze", "silver")
 
     print("  ✓ County Boundary complete\n")
 
@@ -2,13 +2,20 @@
 Master script to process all geometry files from bronze to silver layer.
 
 This script automatically discovers and runs all processor files in this directory.
+Processors whose inputs, outputs and code are unchanged since the last run
+(see data/silver/geometries/_manifest.json) are skipped; pass --force to rerun all
+and --workers N to run processors in parallel.
 """
 
-import importlib
+import argparse
+import sys
 from pathlib import Path
 
+sys.path.append(str(Path(__file__).parent.parent.parent))  # src/, for medallion
+from medallion.runner import layer_manifest_path, print_summary, run_processors
 
-def main():
+
+def main(force=False, workers=1):
     """Run all geometry processors."""
     # print("="*60)
     # print("SILVER LAYER: PROCESSING ALL GEOMETRIES")
@@ -75,64 +82,22 @@ def main():
 
 
     # I want this to run all of the .py files in this directory except for _utilities.py and this file.
-    print("This is a placeholder for the main processing function.")
     # Get current directory
     current_dir = Path(__file__).parent
 
-    # Find all .py files
-    processor_files = current_dir.glob("*.py")
-
     # Files to skip
     skip_files = {"_utilities.py", "process_geometries.py", "__init__.py"}
 
-    # Track results
-    processors_run = []
-    errors = []
-
-    for file in processor_files:
-        # Skip utility files and this file
-        if file.name in skip_files:
-            continue
-
-        # Get module name (filename without .py)
-        module_name = file.stem
-
-        try:
-            # Import the module
-            module = importlib.import_module(module_name)
-
-            # Check if it has a process() function
-            if hasattr(module, 'process'):
-                print(f"\n{'='*60}")
-                print(f"Running: {module_name}")
-                print(f"{'='*60}")
-
-                # Run the process function
-                module.process()
-
-                processors_run.append(module_name)
-            else:
-                print(f"⚠ Skipping {module_name}: No process() function found")
-
-        except Exception as e:
-            error_msg = f"✗ Error in {module_name}: {e}"
-            print(f"\n{error_msg}")
-            errors.append(error_msg)
-
-    # Summary
-    print("\n" + "="*60)
-    print("PROCESSING COMPLETE")
-    print("="*60)
-    print(f"Processors run: {len(processors_run)}")
-    for proc in processors_run:
-        print(f"  ✓ {proc}")
-
-    if errors:
-        print(f"\nErrors: {len(errors)}")
-        for error in errors:
-            print(f"  {error}")
-    else:
-        print("\n✓ All processors completed successfully!")
+    # Run the processors whose inputs or code changed since the last run
+    results = run_processors(current_dir, skip_files, layer_manifest_path("silver"), force=force, workers=workers)
+    print_summary(results)
+    return results
+
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--force", action="store_true", help="rerun every processor, ignoring the manifest")
+    parser.add_argument("--workers", type=int, default=1, help="run processors in a pool of this many processes")
+    args = parser.parse_args()
+    results = main(force=args.force, workers=args.workers)
+    sys.exit(1 if results["errors"] else 0)
@@ -2,7 +2,12 @@
 Process street centerlines from bronze to silver layer.
 """
 
-from _utilities import process_geometry
+from _utilities import geometry_path, process_geometry
+
+SOURCE_FILE = "Street_Centerlines_-8203296818607454791.geojson"
+
+INPUTS = [geometry_path("bronze", SOURCE_FILE)]
+OUTPUTS = [geometry_path("silver", "street_centerlines.geoparquet")]
 
 
 def process():
@@ -10,7 +15,7 @@ def process():
     print("\nProcessing: Street Centerlines")
 
     # Convert from bronze GeoJSON to silver geoparquet
-    process_geometry("Street_Centerlines_-8203296818607454791.geojson", "bronze", "silver")
+    process_geometry(SOURCE_FILE, "bronze", "silver")
 
     print("  ✓ Street Centerlines complete\n")
 